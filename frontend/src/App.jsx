@@ -6,7 +6,7 @@ import { EAITrendChart, StatusDistributionChart, RegionComparisonChart } from '.
 import DataTable from './components/DataTable';
 import CalculatorPage from './components/CalculatorPage';
 import PredictionPage from './components/PredictionPage';
-import { fetchRegions, fetchStations, fetchEAI } from './api';
+import { fetchRegions, fetchStations, fetchEAI, fetchEAIRollups } from './api';
 
 function App() {
     const [activeTab, setActiveTab] = useState('statistics');
@@ -16,6 +16,9 @@ function App() {
     const [regions, setRegions] = useState([]);
     const [stations, setStations] = useState([]);
     const [eaiData, setEaiData] = useState(null);
+    const [trendGranularity, setTrendGranularity] = useState('month');
+    const [rollups, setRollups] = useState(null);
+    const [appliedFilters, setAppliedFilters] = useState({});
 
     const [filters, setFilters] = useState({
         region: '',
@@ -36,18 +39,25 @@ function App() {
         loadStations();
     }, [filters.region]);
 
+    // Reload the trend series when switching between monthly and yearly
+    useEffect(() => {
+        if (eaiData) loadRollups(appliedFilters);
+    }, [trendGranularity]);
+
     const loadInitialData = async () => {
         try {
             setLoading(true);
             setError(null);
 
-            const [regionsData, eaiResult] = await Promise.all([
+            const [regionsData, eaiResult, rollupsResult] = await Promise.all([
                 fetchRegions(),
                 fetchEAI({ limit: 1000 }),
+                fetchEAIRollups({ granularity: trendGranularity }),
             ]);
 
             setRegions(regionsData.regions || []);
             setEaiData(eaiResult);
+            setRollups(rollupsResult);
         } catch (err) {
             setError('Failed to load data. Make sure the API server is running on http://localhost:8000');
             console.error(err);
@@ -65,13 +75,27 @@ function App() {
         }
     };
 
+    // Pre-aggregated monthly / yearly averages (no raw sample scan)
+    const loadRollups = async (activeFilters) => {
+        try {
+            setRollups(await fetchEAIRollups({ ...activeFilters, granularity: trendGranularity }));
+        } catch (err) {
+            console.error('Failed to load EAI rollups:', err);
+        }
+    };
+
     const handleApplyFilters = async () => {
         try {
             setLoading(true);
             setError(null);
 
-            const eaiResult = await fetchEAI({ ...filters, limit: 1000 });
+            const [eaiResult, rollupsResult] = await Promise.all([
+                fetchEAI({ ...filters, limit: 1000 }),
+                fetchEAIRollups({ ...filters, granularity: trendGranularity }),
+            ]);
             setEaiData(eaiResult);
+            setRollups(rollupsResult);
+            setAppliedFilters(filters);
         } catch (err) {
             setError('Failed to apply filters. Please try again.');
             console.error(err);
@@ -128,7 +152,11 @@ function App() {
                     </div>
 
                     <div className="charts-section">
-                        <EAITrendChart data={eaiData.eai_scores} />
+                        <EAITrendChart
+                            series={rollups?.series}
+                            granularity={trendGranularity}
+                            onGranularityChange={setTrendGranularity}
+                        />
                         <StatusDistributionChart distribution={eaiData.status_distribution} />
                     </div>
 
@@ -36,6 +36,21 @@ export const fetchEAI = async (filters = {}) => {
     return response.data;
 };
 
+export const fetchEAIRollups = async (filters = {}) => {
+    const params = { granularity: filters.granularity || 'month' };
+
+    if (filters.group_by) params.group_by = filters.group_by;
+    if (filters.region) params.region = filters.region;
+    if (filters.station) params.station = filters.station;
+    if (filters.sample_type) params.sample_type = filters.sample_type;
+    if (filters.water_layer) params.water_layer = filters.water_layer;
+    if (filters.start_date) params.start_date = filters.start_date;
+    if (filters.end_date) params.end_date = filters.end_date;
+
+    const response = await api.get('/eai/rollups', { params, paramsSerializer: { indexes: null } });
+    return response.data;
+};
+
 export const fetchStatistics = async (filters = {}) => {
     const params = {};
     if (filters.region) params.region = filters.region;
@@ -35,24 +35,36 @@ const chartColors = {
     secondary: '#8b5cf6',
 };
 
-// EAI Trend Line Chart
-export function EAITrendChart({ data }) {
-    if (!data || data.length === 0) {
-        return <div className="chart-card"><p>No data available</p></div>;
-    }
+// EAI Trend Line Chart (monthly / yearly rollups from /eai/rollups)
+export function EAITrendChart({ series, granularity, onGranularityChange }) {
+    const header = (
+        <div className="table-header">
+            <h3> EAI Trend Over Time</h3>
+            <div>
+                {[['month', 'Monthly'], ['year', 'Yearly']].map(([value, label]) => (
+                    <button
+                        key={value}
+                        className={`page-btn ${granularity === value ? 'active' : ''}`}
+                        onClick={() => onGranularityChange(value)}
+                    >
+                        {label}
+                    </button>
+                ))}
+            </div>
+        </div>
+    );
 
-    // Sort by date and take last 50 points
-    const sortedData = [...data]
-        .filter(d => d.date && d.eai !== null)
-        .sort((a, b) => new Date(a.date) - new Date(b.date))
-        .slice(-50);
+    const points = (series || []).filter(p => p.average_eai !== null);
+    if (points.length === 0) {
+        return <div className="chart-card">{header}<p>No data available</p></div>;
+    }
 
     const chartData = {
-        labels: sortedData.map(d => d.date),
+        labels: points.map(p => p.period),
         datasets: [
             {
-                label: 'EAI Score',
-                data: sortedData.map(d => d.eai),
+                label: 'Average EAI',
+                data: points.map(p => p.average_eai),
                 borderColor: chartColors.primary,
                 backgroundColor: 'rgba(59, 130, 246, 0.1)',
                 fill: true,
@@ -62,7 +74,7 @@ export function EAITrendChart({ data }) {
             },
             {
                 label: 'Good Threshold (80)',
-                data: sortedData.map(() => 80),
+                data: points.map(() => 80),
                 borderColor: chartColors.good,
                 borderDash: [5, 5],
                 borderWidth: 2,
@@ -71,7 +83,7 @@ export function EAITrendChart({ data }) {
             },
             {
                 label: 'Warning Threshold (50)',
-                data: sortedData.map(() => 50),
+                data: points.map(() => 50),
                 borderColor: chartColors.warning,
                 borderDash: [5, 5],
                 borderWidth: 2,
@@ -106,7 +118,7 @@ export function EAITrendChart({ data }) {
 
     return (
         <div className="chart-card">
-            <h3> EAI Trend Over Time</h3>
+            {header}
             <div style={{ height: '300px' }}>
                 <Line data={chartData} options={options} />
             </div>
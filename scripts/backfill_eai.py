@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import argparse
+
+from pymongo import MongoClient, ASCENDING, DESCENDING, UpdateOne
+from dotenv import load_dotenv
+
+# EAI scoring lives in the server package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+from eai_calculator import calculate_records_eai, eai_document, EAI_PROFILE_VERSION  # noqa: E402
+from eai_rollups import ROLLUP_COLLECTION, rebuild_rollups  # noqa: E402
+from pagination import ensure_keyset_indexes  # noqa: E402
+from import_generation import bump_import_generation  # noqa: E402
+
+# ==============================
+# LOAD ENV
+# ==============================
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI")
+DB_NAME = os.getenv("MONGO_DB", "marine_environment")
+
+
+# ==============================
+# HELPER FUNCTIONS
+# ==============================
+def ensure_indexes(collection):
+    """Same EAI indexes as import_dataset_to_mongodb.py"""
+    collection.create_index([("eai.score", DESCENDING)], name="idx_eai_score")
+    collection.create_index(
+        [("eai.status", ASCENDING), ("eai.score", DESCENDING)],
+        name="idx_eai_status_score"
+    )
+    ensure_keyset_indexes(collection)
+
+
+def backfill(collection, batch_size, force=False, dry_run=False):
+    """
+    Recompute the stored EAI of every document whose scoring-profile version
+    is not EAI_PROFILE_VERSION (or of all documents with force).
+    Documents are walked in _id order, one batch per bulk write.
+    """
+    stale_filter = {} if force else {"eai.version": {"$ne": EAI_PROFILE_VERSION}}
+    total_stale = collection.count_documents(stale_filter)
+    print(f"Scoring profile: {EAI_PROFILE_VERSION} | documents to recompute: {total_stale:,}")
+    if dry_run or total_stale == 0:
+        return 0
+
+    updated = 0
+    last_id = None
+    start = time.perf_counter()
+    while True:
+        query = dict(stale_filter)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        docs = list(
+            collection.find(query, {"data": 1}).sort("_id", ASCENDING).limit(batch_size)
+        )
+        if not docs:
+            break
+
+        samples = [doc.get("data", {}) for doc in docs]
+        operations = [
+            UpdateOne({"_id": doc["_id"]}, {"$set": {"eai": eai_document(eai_result)}})
+            for doc, eai_result in zip(docs, calculate_records_eai(samples))
+        ]
+        result = collection.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+        last_id = docs[-1]["_id"]
+        print(f"  Updated {updated:,}/{total_stale:,} documents")
+
+    elapsed = time.perf_counter() - start
+    print(f"Backfill complete: {updated:,} documents in {elapsed:.1f}s")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute stored EAI scores with a stale scoring profile")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Documents per bulk write")
+    parser.add_argument("--force", action="store_true", help="Recompute every document")
+    parser.add_argument("--dry-run", action="store_true", help="Only count stale documents")
+    parser.add_argument("--rollups", action="store_true", help="Rebuild the EAI rollups even if nothing changed")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    collection = client[DB_NAME]["samples"]
+    try:
+        if not args.dry_run:
+            ensure_indexes(collection)
+        updated = backfill(collection, args.batch_size, args.force, args.dry_run)
+        if not args.dry_run and (updated or args.rollups):
+            # Rollups aggregate the stored scores: recompute them too
+            buckets = rebuild_rollups(collection, collection.database[ROLLUP_COLLECTION], args.batch_size)
+            print(f"Rebuilt {buckets:,} EAI rollup buckets")
+            # Stored scores changed: invalidate the API caches
+            generation = bump_import_generation(collection.database, "backfill_eai", documents=updated)
+            print(f"Import generation: {generation}")
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
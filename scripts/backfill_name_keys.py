@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import argparse
+
+from pymongo import MongoClient
+from dotenv import load_dotenv
+
+# Query filter helpers live in the server package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+from query_filters import name_keys, ensure_name_key_indexes  # noqa: E402
+from eai_rollups import ROLLUP_COLLECTION  # noqa: E402
+from import_generation import bump_import_generation  # noqa: E402
+
+# ==============================
+# LOAD ENV
+# ==============================
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI")
+DB_NAME = os.getenv("MONGO_DB", "marine_environment")
+
+
+def backfill(collection, force=False, dry_run=False):
+    """
+    Write region_key / station_key on documents stored before the keys
+    existed (or on all documents with force). There are only a few hundred
+    (region, station) pairs, so one update_many per pair is enough.
+    """
+    missing = {} if force else {"$or": [{"region_key": {"$exists": False}}, {"station_key": {"$exists": False}}]}
+    pairs = list(collection.aggregate([
+        {"$match": missing},
+        {"$group": {"_id": {"region": "$region", "station": "$station"}, "count": {"$sum": 1}}},
+    ]))
+    total = sum(pair["count"] for pair in pairs)
+    print(f"Documents to update: {total:,} in {len(pairs):,} region/station pairs")
+    if dry_run or not pairs:
+        return 0
+
+    updated = 0
+    start = time.perf_counter()
+    for pair in pairs:
+        region, station = pair["_id"].get("region"), pair["_id"].get("station")
+        result = collection.update_many(
+            {**missing, "region": region, "station": station},
+            {"$set": name_keys(region, station)}
+        )
+        updated += result.modified_count
+    print(f"Backfill complete: {updated:,} documents in {time.perf_counter() - start:.1f}s")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add normalized region/station lookup fields to samples")
+    parser.add_argument("--force", action="store_true", help="Rewrite the keys of every document")
+    parser.add_argument("--dry-run", action="store_true", help="Only count documents without keys")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    try:
+        # The EAI rollups carry the same lookup fields
+        updated = 0
+        for name in ("samples", ROLLUP_COLLECTION):
+            print(f"[{name}]")
+            updated += backfill(db[name], args.force, args.dry_run)
+        if not args.dry_run:
+            ensure_name_key_indexes(db["samples"])
+        if updated:
+            # Filters on the keys now match more documents: invalidate the API caches
+            print(f"Import generation: {bump_import_generation(db, 'backfill_name_keys', documents=updated)}")
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import io
+import os
+import sys
+import time
+import random
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Allow importing the server modules (eai_calculator.py, ...) from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from eai_calculator import EAI_PARAMS, CSV_RESULT_HEADER, iter_csv_eai, format_eai_rows  # noqa: E402
+from parallel_eai import parse_csv_columns, chunk_bounds, SharedColumns, score_chunk  # noqa: E402
+
+
+# ==============================
+# INPUT
+# ==============================
+def synthetic_csv(n_rows, seed=0):
+    """CSV with every EAI parameter, ~10% missing and ~1% non-numeric values"""
+    rng = random.Random(seed)
+    lines = [",".join(EAI_PARAMS)]
+    for _ in range(n_rows):
+        row = []
+        for _ in EAI_PARAMS:
+            r = rng.random()
+            row.append("" if r < 0.1 else "n/a" if r < 0.11 else f"{rng.uniform(0, 40):.3f}")
+        lines.append(",".join(row))
+    return "\n".join(lines) + "\n"
+
+
+# ==============================
+# MODES
+# ==============================
+def run_serial(text, output_format):
+    """Current streaming path: chunked DictReader scoring in one process"""
+    parts = [",".join(CSV_RESULT_HEADER) + "\n"] if output_format == "csv" else []
+    total = 0
+    for chunk in iter_csv_eai(io.StringIO(text, newline="")):
+        parts.append(format_eai_rows(chunk, total + 1, output_format))
+        total += len(chunk)
+    return "".join(parts)
+
+
+def run_parallel(pool, workers, n_rows, columns, output_format):
+    """Parallel mode: shared-memory columns, one row range per worker"""
+    parts = [",".join(CSV_RESULT_HEADER) + "\n"] if output_format == "csv" else []
+    with SharedColumns(n_rows, columns) as shared:
+        futures = [
+            pool.submit(score_chunk, shared.spec(), start, end, output_format)
+            for start, end in chunk_bounds(n_rows, workers)
+        ]
+        parts.extend(future.result() for future in futures)
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CSV calculator: rows/sec vs worker count")
+    parser.add_argument("--rows", type=int, default=500000, help="Rows in the synthetic CSV")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--format", default="ndjson", choices=["ndjson", "csv"], help="Output format")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per setting (best time is kept)")
+    args = parser.parse_args()
+
+    text = synthetic_csv(args.rows)
+    print(f"{args.rows:,} rows, {len(text) / 1024 / 1024:.1f} MB, output={args.format}")
+
+    def best_of(run):
+        best, output = None, None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            output = run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
+
+    serial_time, expected = best_of(lambda: run_serial(text, args.format))
+    print(f"{'mode':>10}{'workers':>9}{'best s':>9}{'rows/sec':>12}{'speedup':>9}")
+    print(f"{'serial':>10}{1:>9}{serial_time:>9.2f}{args.rows / serial_time:>12,.0f}{1:>9.2f}")
+
+    # Parsing happens once per request; reported separately from scoring
+    start = time.perf_counter()
+    n_rows, columns = parse_csv_columns(io.StringIO(text, newline=""))
+    parse_time = time.perf_counter() - start
+    print(f"{'parse':>10}{'-':>9}{parse_time:>9.2f}{args.rows / parse_time:>12,.0f}{'':>9}")
+
+    failures = 0
+    context = multiprocessing.get_context("spawn")
+    for workers in [int(n) for n in args.workers.split(",")]:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            # Start the workers (and their imports) before timing
+            list(pool.map(abs, range(workers)))
+            elapsed, output = best_of(lambda: run_parallel(pool, workers, n_rows, columns, args.format))
+        total = parse_time + elapsed
+        print(
+            f"{'parallel':>10}{workers:>9}{total:>9.2f}{args.rows / total:>12,.0f}{serial_time / total:>9.2f}"
+        )
+        if output != expected:
+            failures += 1
+            print("  PARITY FAILED: output differs from the serial path")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
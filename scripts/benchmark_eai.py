@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import argparse
+
+import bson
+from pymongo import MongoClient, monitoring
+from dotenv import load_dotenv
+
+# Allow importing the server modules (eai_calculator.py, ...) from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from eai_calculator import calculate_records_eai  # noqa: E402
+from eai_pipeline import eai_pipeline_stages, pipeline_result  # noqa: E402
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "marine_environment")
+
+
+# ==============================
+# WIRE BYTES
+# ==============================
+class ReplyBytes(monitoring.CommandListener):
+    """Sum of the BSON size of every server reply (find / getMore / aggregate)"""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.bytes += len(bson.encode(event.reply))
+
+    def failed(self, event):
+        pass
+
+
+# ==============================
+# MODES
+# ==============================
+def run_python(collection, query, limit):
+    """Current path: whole documents, EAI computed in Python"""
+    docs = list(collection.find(query).limit(limit))
+    return [r["eai"] for r in calculate_records_eai([doc.get("data", {}) for doc in docs])]
+
+
+def run_pipeline(collection, query, limit):
+    """Aggregation mode: EAI computed in MongoDB, only EAI fields returned"""
+    stages = [{"$match": query}, {"$limit": limit}] + eai_pipeline_stages()
+    return [pipeline_result(doc)["eai"] for doc in collection.aggregate(stages)]
+
+
+MODES = {"python": run_python, "pipeline": run_pipeline}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /eai: Python scoring vs aggregation pipeline")
+    parser.add_argument("--limits", default="100,1000,5000", help="Comma-separated page sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per mode (best time is kept)")
+    parser.add_argument("--sample-type", default=None, help="Optional sample_type filter")
+    args = parser.parse_args()
+
+    listener = ReplyBytes()
+    client = MongoClient(MONGO_URI, event_listeners=[listener])
+    collection = client[DB_NAME]["samples"]
+    query = {"sample_type": args.sample_type} if args.sample_type else {}
+
+    print(f"{'limit':>7}{'mode':>10}{'best ms':>10}{'KB':>10}{'B/doc':>8}")
+    failures = 0
+    for limit in [int(n) for n in args.limits.split(",")]:
+        results = {}
+        for name, run in MODES.items():
+            best = None
+            for _ in range(args.repeat):
+                listener.bytes = 0
+                start = time.perf_counter()
+                results[name] = run(collection, query, limit)
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            n = max(1, len(results[name]))
+            print(f"{limit:>7}{name:>10}{best:>10.1f}{listener.bytes / 1024:>10.1f}{listener.bytes / n:>8.0f}")
+
+        # Same documents in the same natural order: scores must agree
+        diffs = [
+            (a, b) for a, b in zip(results["python"], results["pipeline"])
+            if (a is None) != (b is None) or (a is not None and abs(a - b) > 0.01)
+        ]
+        if diffs:
+            failures += 1
+            print(f"  PARITY FAILED on {len(diffs)} document(s), e.g. {diffs[:3]}")
+
+    client.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
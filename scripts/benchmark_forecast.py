@@ -0,0 +1,225 @@
+import os
+import sys
+import glob
+import time
+import argparse
+import warnings
+
+import numpy as np
+
+# Allow importing the server modules (inference.py, ...) from the repo root
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server")
+sys.path.insert(0, SERVER_DIR)
+
+warnings.simplefilter("ignore")
+
+import inference  # noqa: E402
+import numpy_forecast  # noqa: E402
+
+TYPE_FOLDERS = {
+    "Sediment": "prophet_models_sediment",
+    "Water_Surface": "prophet_models_water_surface",
+    "Water_Middle": "prophet_models_water_middle",
+    "Water_Bottom": "prophet_models_water_bottom",
+}
+
+
+# ==============================
+# HELPER FUNCTIONS
+# ==============================
+def list_stations(models_dir, limit=None):
+    """List (type_indicator, area, station) tuples found under the models folder"""
+    stations = []
+    for type_indicator, folder in TYPE_FOLDERS.items():
+        type_path = os.path.join(models_dir, folder)
+        if not os.path.isdir(type_path):
+            continue
+        for area in sorted(os.listdir(type_path)):
+            area_path = os.path.join(type_path, area)
+            if not os.path.isdir(area_path):
+                continue
+            for station in sorted(os.listdir(area_path)):
+                if os.path.isdir(os.path.join(area_path, station)):
+                    stations.append((type_indicator, area, station))
+    return stations[:limit] if limit else stations
+
+
+def time_call(fn, repeat):
+    """Return (best wall time in ms, last result) over `repeat` runs"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def max_abs_diff(df_a, df_b):
+    """Largest absolute difference between two forecast frames (NaN-aware)"""
+    if list(df_a.columns) != list(df_b.columns) or list(df_a["thoi_gian"]) != list(df_b["thoi_gian"]):
+        return float("inf")
+    a = df_a.drop(columns=["thoi_gian"]).to_numpy(dtype=float)
+    b = df_b.drop(columns=["thoi_gian"]).to_numpy(dtype=float)
+    if not np.array_equal(np.isnan(a), np.isnan(b)):
+        return float("inf")
+    return float(np.nanmax(np.abs(a - b))) if a.size else 0.0
+
+
+# ==============================
+# BENCHMARK: FULL PREDICT vs POINT FORECAST
+# ==============================
+def benchmark_point_forecast(stations, repeat, tolerance):
+    print(f"{'type':<14}{'area':<18}{'station':<9}{'full ms':>10}{'point ms':>10}{'speedup':>9}{'max diff':>12}")
+    totals = {"full": 0.0, "point": 0.0}
+    failures = []
+
+    for type_indicator, area, station in stations:
+        try:
+            # Warm the model cache so both modes measure prediction only
+            inference.get_forecast_df(type_indicator, area, station, point_forecast=True)
+        except Exception as e:
+            print(f"{type_indicator:<14}{area:<18}{station:<9}  skipped: {e}")
+            continue
+
+        full_ms, full_df = time_call(
+            lambda: inference.get_forecast_df(type_indicator, area, station), repeat
+        )
+        point_ms, point_df = time_call(
+            lambda: inference.get_forecast_df(type_indicator, area, station, point_forecast=True), repeat
+        )
+        diff = max_abs_diff(full_df, point_df)
+        totals["full"] += full_ms
+        totals["point"] += point_ms
+        if diff > tolerance:
+            failures.append((type_indicator, area, station, diff))
+
+        print(
+            f"{type_indicator:<14}{area:<18}{station:<9}{full_ms:>10.1f}{point_ms:>10.1f}"
+            f"{full_ms / point_ms:>8.1f}x{diff:>12.2e}"
+        )
+
+    print("=" * 82)
+    if totals["point"]:
+        print(
+            f"Total: full {totals['full']:.0f} ms | point {totals['point']:.0f} ms "
+            f"| speedup {totals['full'] / totals['point']:.1f}x"
+        )
+    if failures:
+        print(f"PARITY FAILED for {len(failures)} station(s) (tolerance {tolerance:g}):")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print(f"Parity OK (tolerance {tolerance:g})")
+    return 0
+
+
+# ==============================
+# GOLDEN PARITY: NUMPY EVALUATOR vs PROPHET
+# ==============================
+def check_numpy_parity(models_dir, tolerance):
+    """Compare numpy_forecast against Prophet for every model file under models_dir"""
+    model_paths = sorted(glob.glob(os.path.join(models_dir, "**", "prophet_model.json"), recursive=True))
+    print(f"Checking {len(model_paths)} model(s)")
+    worst = 0.0
+    failures = []
+    unreadable = []
+
+    for model_path in model_paths:
+        config_path = os.path.join(os.path.dirname(model_path), "config.json")
+        try:
+            model, config = inference.load_prophet_model(model_path, config_path)
+        except Exception as e:
+            unreadable.append((model_path, str(e)))
+            continue
+
+        future = model.make_future_dataframe(periods=numpy_forecast.FORECAST_PERIODS, freq="M", include_history=False)
+        if config.get("cap_value") is not None:
+            future["cap"] = config["cap_value"]
+            future["floor"] = config.get("floor_value", 0.0)
+        expected = inference.predict_point(model, future)
+
+        ds, yhat = numpy_forecast.forecast_batch([numpy_forecast.load_model_params(model_path, config_path)])
+        expected_yhat = expected["yhat"].to_numpy()
+        # Relative error for large values, absolute error near zero
+        error = float(np.max(np.abs(yhat[0] - expected_yhat) / np.maximum(1.0, np.abs(expected_yhat))))
+        dates_match = np.array_equal(ds[0], expected["ds"].to_numpy().astype("datetime64[s]"))
+        worst = max(worst, error)
+        if not dates_match or error > tolerance:
+            failures.append((model_path, "dates differ" if not dates_match else f"error {error:.2e}"))
+
+    print(f"Max relative error: {worst:.2e}")
+    for model_path, reason in unreadable:
+        print(f"  unreadable (skipped): {model_path}: {reason}")
+    if failures:
+        print(f"PARITY FAILED for {len(failures)} model(s) (tolerance {tolerance:g}):")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print(f"Parity OK (tolerance {tolerance:g})")
+    return 0
+
+
+def benchmark_numpy_engine(stations, repeat):
+    """Per-station latency: Prophet point forecast vs numpy evaluator (models cached)"""
+    print(f"{'type':<14}{'area':<18}{'station':<9}{'prophet ms':>12}{'numpy ms':>10}{'speedup':>9}")
+    totals = {"prophet": 0.0, "numpy": 0.0}
+    loaded = []
+    for type_indicator, area, station in stations:
+        try:
+            inference.get_forecast_df(type_indicator, area, station, point_forecast=True)
+            numpy_forecast.forecast_station(type_indicator, area, station)
+        except Exception as e:
+            print(f"{type_indicator:<14}{area:<18}{station:<9}  skipped: {e}")
+            continue
+        prophet_ms, _ = time_call(
+            lambda: inference.get_forecast_df(type_indicator, area, station, point_forecast=True), repeat
+        )
+        numpy_ms, _ = time_call(lambda: numpy_forecast.forecast_station(type_indicator, area, station), repeat)
+        totals["prophet"] += prophet_ms
+        totals["numpy"] += numpy_ms
+        loaded.append((type_indicator, area, station))
+        print(
+            f"{type_indicator:<14}{area:<18}{station:<9}{prophet_ms:>12.1f}{numpy_ms:>10.3f}"
+            f"{prophet_ms / numpy_ms:>8.0f}x"
+        )
+
+    print("=" * 72)
+    if totals["numpy"]:
+        print(f"Total: prophet {totals['prophet']:.0f} ms | numpy {totals['numpy']:.1f} ms")
+
+    # All stations in one batched evaluation
+    start = time.perf_counter()
+    numpy_forecast.forecast_stations(loaded)
+    print(f"Batched numpy forecast of {len(loaded)} station(s): {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and parity-check forecast modes")
+    parser.add_argument("--models-dir", default=os.path.join(SERVER_DIR, "..", "models"))
+    parser.add_argument("--limit", type=int, default=None, help="Only benchmark the first N stations")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per station (best time is kept)")
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    parser.add_argument(
+        "--suite",
+        choices=["point", "numpy-parity", "numpy"],
+        default="point",
+        help="point: full predict vs point forecast | numpy-parity: numpy evaluator vs Prophet "
+             "for every model | numpy: Prophet vs numpy latency",
+    )
+    args = parser.parse_args()
+
+    if args.suite == "numpy-parity":
+        return check_numpy_parity(args.models_dir, args.tolerance)
+
+    stations = list_stations(args.models_dir, args.limit)
+    print(f"Benchmarking {len(stations)} station(s) from {os.path.abspath(args.models_dir)}\n")
+    if args.suite == "numpy":
+        return benchmark_numpy_engine(stations, args.repeat)
+    return benchmark_point_forecast(stations, args.repeat, args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
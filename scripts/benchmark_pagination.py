@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import argparse
+
+from pymongo import MongoClient
+from dotenv import load_dotenv
+
+# Allow importing the server modules (pagination.py, ...) from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from pagination import keyset_sort, with_keyset, next_cursor  # noqa: E402
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "marine_environment")
+
+
+# ==============================
+# MODES
+# ==============================
+def offset_page(collection, query, sort, page, limit):
+    """skip/limit: the server walks and discards page × limit documents"""
+    return list(collection.find(query).sort(sort).skip(page * limit).limit(limit))
+
+
+def keyset_page(collection, query, sort, cursor, limit):
+    """Keyset: the index seeks straight to the key after the previous page"""
+    return list(collection.find(with_keyset(query, sort, cursor)).sort(sort).limit(limit))
+
+
+def page_cursors(collection, query, sort, pages, limit):
+    """Continuation token of every wanted page (walked once, not timed)"""
+    wanted, cursors, cursor = set(pages), {}, None
+    for page in range(max(pages) + 1):
+        if page in wanted:
+            cursors[page] = cursor
+        docs = keyset_page(collection, query, sort, cursor, limit)
+        if not docs:
+            break
+        cursor = next_cursor(docs, sort)
+    return cursors
+
+
+def best_ms(run, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        docs = run()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark page-N latency: skip/limit vs keyset pagination")
+    parser.add_argument("--limit", type=int, default=100, help="Page size")
+    parser.add_argument("--pages", default="0,10,100,500,1000", help="Comma-separated page numbers (0 = first)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per page (best time is kept)")
+    parser.add_argument("--sample-type", default=None, help="Optional sample_type filter")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    collection = client[DB_NAME]["samples"]
+    query = {"sample_type": args.sample_type} if args.sample_type else {}
+    sort = keyset_sort()
+    total = collection.count_documents(query)
+    pages = [p for p in (int(n) for n in args.pages.split(",")) if p * args.limit < total]
+    if not pages:
+        print(f"No requested page within {total:,} documents")
+        return 1
+    cursors = page_cursors(collection, query, sort, pages, args.limit)
+
+    print(f"{total:,} documents, limit={args.limit}, sort={sort}")
+    print(f"{'page':>7}{'offset ms':>12}{'keyset ms':>12}{'speedup':>9}")
+    failures = 0
+    for page in pages:
+        offset_ms, offset_docs = best_ms(lambda: offset_page(collection, query, sort, page, args.limit), args.repeat)
+        keyset_ms, keyset_docs = best_ms(
+            lambda: keyset_page(collection, query, sort, cursors[page], args.limit), args.repeat
+        )
+        print(f"{page:>7}{offset_ms:>12.1f}{keyset_ms:>12.1f}{offset_ms / max(keyset_ms, 1e-3):>9.1f}")
+        # Both modes must return the same page
+        if [d["_id"] for d in offset_docs] != [d["_id"] for d in keyset_docs]:
+            failures += 1
+            print(f"  PARITY FAILED on page {page}")
+
+    client.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+import bson
+from bson import ObjectId
+from bson.codec_options import CodecOptions, TypeDecoder, TypeRegistry
+from bson.raw_bson import RawBSONDocument
+from pymongo import MongoClient
+from dotenv import load_dotenv
+
+# Allow importing the server modules (fast_read.py, ...) from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from fast_read import decode_batch  # noqa: E402
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "marine_environment")
+
+
+class ObjectIdAsString(TypeDecoder):
+    bson_type = ObjectId
+
+    def transform_bson(self, value):
+        return str(value)
+
+
+# Alternative: convert _id inside the C decoder through a type registry
+CODEC_OPTIONS = CodecOptions(type_registry=TypeRegistry([ObjectIdAsString()]))
+RAW_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+
+# ==============================
+# SYNTHETIC INPUT
+# ==============================
+def synthetic_batches(n_docs, batch_size, seed=0):
+    """Server reply batches (concatenated BSON) of sample-like documents"""
+    rng = random.Random(seed)
+    docs = [
+        {
+            "_id": ObjectId(),
+            "sample_type": "WATER_QUALITY",
+            "water_layer": "SURFACE",
+            "region": "Mirs Bay",
+            "station": f"MS{rng.randint(1, 20)}",
+            "source_file": "MS1.csv",
+            "data": {
+                "thoi_gian": f"20{rng.randint(10, 22)}-{rng.randint(1, 12):02d}-15",
+                **{f"param_{i}": round(rng.uniform(0, 40), 3) for i in range(18)},
+            },
+            "eai": {"score": round(rng.uniform(0, 100), 2), "status": "warning", "sub_indices": {"ph": 80.0}},
+        }
+        for _ in range(n_docs)
+    ]
+    return [b"".join(bson.encode(doc) for doc in docs[i:i + batch_size]) for i in range(0, n_docs, batch_size)]
+
+
+# ==============================
+# DECODE PATHS
+# ==============================
+def decode_current(batches):
+    """Previous handlers: dict documents (what motor returns), then _id -> str one by one"""
+    samples = []
+    for batch in batches:
+        for doc in bson.decode_all(batch):
+            doc["_id"] = str(doc["_id"])
+            samples.append(doc)
+    return samples
+
+
+def decode_raw_documents(batches):
+    """RawBSONDocument per document, decoded on access with the codec"""
+    return [
+        bson.decode(doc.raw, CODEC_OPTIONS)
+        for batch in batches
+        for doc in bson.decode_all(batch, RAW_OPTIONS)
+    ]
+
+
+def decode_codec(batches):
+    """One decode_all per batch, _id converted by a TypeDecoder"""
+    docs = []
+    for batch in batches:
+        docs.extend(bson.decode_all(batch, CODEC_OPTIONS))
+    return docs
+
+
+def decode_raw_batches(batches):
+    """fast_read.read_documents: one decode_all per batch, _id converted in place"""
+    docs = []
+    for batch in batches:
+        docs.extend(decode_batch(batch))
+    return docs
+
+
+DECODERS = {
+    "current": decode_current,
+    "raw_documents": decode_raw_documents,
+    "codec": decode_codec,
+    "raw_batches": decode_raw_batches,
+}
+
+
+# ==============================
+# LIVE MONGODB
+# ==============================
+def read_current(collection, limit, batch_size):
+    """find() + to_list loop with the driver's default batching"""
+    samples = []
+    for doc in collection.find({}).limit(limit):
+        doc["_id"] = str(doc["_id"])
+        samples.append(doc)
+    return samples
+
+
+def read_fast(collection, limit, batch_size):
+    """find_raw_batches with an explicit batch size + decode_all per batch"""
+    cursor = collection.find_raw_batches({}).limit(limit).batch_size(batch_size)
+    return decode_raw_batches(cursor)
+
+
+def best_of(run, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the list-endpoint read path: dict loop vs raw BSON batches")
+    parser.add_argument("--docs", type=int, default=100000, help="Documents to read")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Cursor batch size of the fast path")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (best time is kept)")
+    parser.add_argument("--mongo", action="store_true", help="Read from the samples collection instead of synthetic BSON")
+    args = parser.parse_args()
+
+    if args.mongo:
+        client = MongoClient(MONGO_URI)
+        collection = client[DB_NAME]["samples"]
+        runs = {
+            "current": lambda: read_current(collection, args.docs, args.batch_size),
+            "raw_batches": lambda: read_fast(collection, args.docs, args.batch_size),
+        }
+    else:
+        batches = synthetic_batches(args.docs, args.batch_size)
+        print(f"{args.docs:,} synthetic documents, {sum(map(len, batches)) / 1024 / 1024:.1f} MB of BSON")
+        runs = {name: (lambda decode=decode: decode(batches)) for name, decode in DECODERS.items()}
+
+    print(f"{'mode':>14}{'best s':>9}{'docs/sec':>12}{'speedup':>9}")
+    baseline, expected, failures = None, None, 0
+    for name, run in runs.items():
+        elapsed, docs = best_of(run, args.repeat)
+        baseline = baseline or elapsed
+        expected = expected if expected is not None else docs
+        print(f"{name:>14}{elapsed:>9.2f}{len(docs) / elapsed:>12,.0f}{baseline / elapsed:>9.2f}")
+        if docs != expected:
+            failures += 1
+            print(f"  PARITY FAILED: {name} decoded different documents")
+
+    if args.mongo:
+        client.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
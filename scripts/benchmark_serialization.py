@@ -0,0 +1,104 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+# Allow importing the server modules (fast_json.py, ...) from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from main import app  # noqa: E402
+from models import EAIResponse  # noqa: E402
+from fast_json import page_response  # noqa: E402
+
+PARAMETERS = ["ph", "do", "cod", "bod5", "tss", "nh4", "no3", "po4", "coliform", "temperature"]
+
+
+def synthetic_eai_page(n_items, seed=0):
+    """/eai response fields with n_items scores (same item layout as get_eai_scores)"""
+    rng = random.Random(seed)
+    scores = []
+    for _ in range(n_items):
+        eai = round(rng.uniform(20, 100), 2)
+        status = "good" if eai >= 80 else "warning" if eai >= 50 else "bad"
+        scores.append({
+            "id": str(ObjectId()),
+            "date": f"20{rng.randint(10, 22)}-{rng.randint(1, 12):02d}-15",
+            "station": f"MS{rng.randint(1, 20)}",
+            "region": "Mirs Bay",
+            "sample_type": "WATER_QUALITY",
+            "water_layer": "SURFACE",
+            "eai": eai,
+            "status": status,
+            "status_label": status,
+            "sub_indices": {p: round(rng.uniform(0, 100), 2) for p in PARAMETERS},
+        })
+    return {
+        "total": None, "limit": n_items, "skip": 0, "average_eai": 60.0,
+        "status_distribution": {"good": 1, "warning": 1, "bad": 1, "unknown": 0},
+        "eai_scores": scores, "has_more": True, "next_cursor": None,
+    }
+
+
+# ==============================
+# MODES
+# ==============================
+def run_response_model(fields, response_field):
+    """Previous /eai: EAIResponse model, FastAPI response_model validation + serialization, json.dumps"""
+    content = asyncio.run(serialize_response(
+        field=response_field, response_content=EAIResponse(**fields), is_coroutine=True
+    ))
+    return JSONResponse(content).body
+
+
+def run_jsonable_encoder(fields, response_field):
+    """Model walked by jsonable_encoder (FastAPI's path for Pydantic v1 / untyped routes)"""
+    return JSONResponse(jsonable_encoder(EAIResponse(**fields))).body
+
+
+def run_orjson(fields, response_field):
+    """Current /eai: fast_json.page_response"""
+    return page_response(EAIResponse, **fields).body
+
+
+MODES = {"response_model": run_response_model, "jsonable_encoder": run_jsonable_encoder, "orjson": run_orjson}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /eai response serialization: response_model vs orjson")
+    parser.add_argument("--items", type=int, default=5000, help="EAI scores per page (/eai limit)")
+    parser.add_argument("--repeat", type=int, default=7, help="Runs per mode (best time is kept)")
+    args = parser.parse_args()
+
+    fields = synthetic_eai_page(args.items)
+    response_field = next(route.response_field for route in app.routes if getattr(route, "path", None) == "/eai")
+
+    print(f"{'mode':>18}{'best ms':>10}{'speedup':>9}")
+    baseline, expected, failures = None, None, 0
+    for name, run in MODES.items():
+        best, body = None, None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            body = run(fields, response_field)
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        baseline = baseline or best
+        print(f"{name:>18}{best:>10.1f}{baseline / best:>9.1f}")
+        expected = expected if expected is not None else json.loads(body)
+        if json.loads(body) != expected:
+            failures += 1
+            print(f"  PARITY FAILED: {name}")
+
+    print(f"response body: {len(body) / 1024:.0f} KB")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import argparse
+
+from pymongo import MongoClient
+from dotenv import load_dotenv
+
+# Allow importing the server modules (statistics_pipeline.py, ...) from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from query_filters import add_name_filters  # noqa: E402
+from statistics_pipeline import BREAKDOWN_FIELDS, statistics_pipeline, statistics_result  # noqa: E402
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "marine_environment")
+
+
+# ==============================
+# MODES
+# ==============================
+def run_sequential(collection, query):
+    """Previous /statistics: count_documents, then one $group per breakdown"""
+    result = {"total_samples": collection.count_documents(query)}
+    for key, field in BREAKDOWN_FIELDS.items():
+        groups = collection.aggregate([{"$match": query}, {"$group": {"_id": f"${field}", "count": {"$sum": 1}}}])
+        result[key] = {group["_id"]: group["count"] for group in groups if group["_id"]}
+    return result
+
+
+def run_facet(collection, query):
+    """Current /statistics: one $facet (uncached)"""
+    facets = list(collection.aggregate(statistics_pipeline(query), allowDiskUse=True))
+    return statistics_result(facets[0] if facets else {})
+
+
+MODES = {"sequential": run_sequential, "facet": run_facet}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /statistics: sequential queries vs single $facet")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per mode (best time is kept)")
+    parser.add_argument("--region", default=None, help="Also time a region-filtered request")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    collection = client[DB_NAME]["samples"]
+    filters = [("all samples", {})]
+    if args.region:
+        filters.append((f"region={args.region}", add_name_filters({}, args.region)))
+
+    print(f"{'filter':>24}{'mode':>12}{'best ms':>10}")
+    failures = 0
+    for name, query in filters:
+        results = {}
+        for mode, run in MODES.items():
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results[mode] = run(collection, query)
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"{name:>24}{mode:>12}{best:>10.1f}")
+
+        # The facet adds date_range; everything else must agree
+        facet = {key: value for key, value in results["facet"].items() if key != "date_range"}
+        if facet != results["sequential"]:
+            failures += 1
+            print(f"  PARITY FAILED for {name}")
+        print(f"{'':>24}{'date_range':>12}  {results['facet']['date_range']}")
+
+    client.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import os
+import sys
+import argparse
+
+from pymongo import MongoClient
+from dotenv import load_dotenv
+
+# Query filter helpers live in the server package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+from query_filters import add_name_filters  # noqa: E402
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "marine_environment")
+
+
+# ==============================
+# PLAN INSPECTION
+# ==============================
+def plan_stages(plan):
+    """Every stage name of a winning plan (classic and slot-based engine)"""
+    stages = []
+    while plan:
+        stages.append(plan.get("stage"))
+        for child in plan.get("inputStages", []):
+            stages.extend(plan_stages(child))
+        plan = plan.get("inputStage") or plan.get("queryPlan")
+    return [stage for stage in stages if stage]
+
+
+def winning_plan(explain):
+    planner = explain.get("queryPlanner") or explain["stages"][0]["$cursor"]["queryPlanner"]
+    return planner["winningPlan"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assert that region/station filters use the indexes (explain)")
+    parser.add_argument("--region", default=None, help="Region to filter on (default: first region)")
+    parser.add_argument("--station", default=None, help="Station to filter on (default: first station of the region)")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    collection = client[DB_NAME]["samples"]
+    sample = collection.find_one({"region": args.region} if args.region else {}, {"region": 1, "station": 1})
+    if sample is None:
+        print("No samples found")
+        return 1
+    region = args.region or sample["region"]
+    station = args.station or sample["station"]
+    # Filters as the endpoints send them: different case / spacing than stored
+    region_input, station_input = f"  {region.upper()} ", station.lower()
+
+    checks = [
+        # (description, filter, index expected)
+        ("exact region", add_name_filters({}, region_input), True),
+        ("exact region + station", add_name_filters({}, region_input, station_input), True),
+        ("exact type + region + station",
+         add_name_filters({"sample_type": "WATER_QUALITY"}, region_input, station_input), True),
+        ("exact station", add_name_filters({}, None, station_input), True),
+        ("prefix region", add_name_filters({}, region_input[:4], mode="prefix"), True),
+        ("prefix station", add_name_filters({}, None, station_input[:2], mode="prefix"), True),
+        ("contains region (opt-in scan)", add_name_filters({}, region_input, mode="contains"), False),
+    ]
+
+    failures = 0
+    print(f"region={region!r} station={station!r}")
+    for description, query, indexed in checks:
+        stages = plan_stages(winning_plan(collection.find(query).explain()))
+        uses_index = "IXSCAN" in stages and "COLLSCAN" not in stages
+        ok = uses_index or not indexed
+        failures += not ok
+        matched = collection.count_documents(query)
+        print(f"  {'OK  ' if ok else 'FAIL'} {description:<32} {matched:>7} docs  {' > '.join(stages)}")
+
+    # Exact filters must match the same documents as the stored names
+    expected = collection.count_documents({"region": region, "station": station})
+    found = collection.count_documents(add_name_filters({}, region_input, station_input))
+    if expected != found:
+        failures += 1
+        print(f"  FAIL exact match found {found} documents, expected {expected}")
+
+    client.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
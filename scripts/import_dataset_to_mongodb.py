@@ -1,8 +1,17 @@
 import os
+import sys
 import pandas as pd
-from pymongo import MongoClient, ASCENDING
+from pymongo import MongoClient, ASCENDING, DESCENDING
 from dotenv import load_dotenv
 
+# EAI scoring lives in the server package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+from eai_calculator import calculate_records_eai, eai_document, EAI_PROFILE_VERSION  # noqa: E402
+from eai_rollups import ROLLUP_COLLECTION, ensure_rollup_indexes, update_rollups  # noqa: E402
+from query_filters import name_keys, ensure_name_key_indexes  # noqa: E402
+from pagination import ensure_keyset_indexes  # noqa: E402
+from import_generation import bump_import_generation  # noqa: E402
+
 # ==============================
 # LOAD ENV
 # ==============================
@@ -27,6 +36,7 @@ FOLDERS_TO_PROCESS = [
 client = MongoClient(MONGO_URI)
 db = client[DB_NAME]
 collection = db["samples"]
+rollups = db[ROLLUP_COLLECTION]
 
 # ==============================
 # DROP EXISTING COLLECTION
@@ -35,6 +45,10 @@ print("Dropping existing 'samples' collection...")
 collection.drop()
 print("Collection dropped successfully!")
 
+# Rollups are rebuilt batch by batch along with the samples
+rollups.drop()
+ensure_rollup_indexes(rollups)
+
 # ==============================
 # HELPER FUNCTIONS
 # ==============================
@@ -61,6 +75,7 @@ def detect_sample_info(folder_name):
 # ==============================
 inserted_count = 0
 skipped_duplicates = 0
+rollup_writes = 0
 
 for folder in FOLDERS_TO_PROCESS:
     folder_path = os.path.join(BASE_DATA_DIR, folder)
@@ -110,23 +125,29 @@ for folder in FOLDERS_TO_PROCESS:
                 continue
 
             # ------------------------------
-            # Insert each row as document
+            # Insert each row as document (with its EAI score)
             # ------------------------------
+            samples = [row.dropna().to_dict() for _, row in df.iterrows()]
             documents = []
-            for _, row in df.iterrows():
+            for data, eai_result in zip(samples, calculate_records_eai(samples)):
                 doc = {
                     "sample_type": sample_type,
                     "water_layer": water_layer,
                     "region": region,
                     "station": station,
+                    # Canonical region / station for index lookups
+                    **name_keys(region, station),
                     "source_file": file,
-                    "data": row.dropna().to_dict()
+                    "data": data,
+                    "eai": eai_document(eai_result)
                 }
                 documents.append(doc)
 
             if documents:
                 collection.insert_many(documents)
                 inserted_count += len(documents)
+                # Add the new samples to the monthly / yearly EAI rollups
+                rollup_writes += update_rollups(rollups, documents)
                 print(f"  Inserted {len(documents)} records from {file}")
 
 # ==============================
@@ -147,8 +168,19 @@ collection.create_index(
     name="idx_type_region_station"
 )
 
-# Index for date queries (in nested data)
-collection.create_index([("data.thoi_gian", ASCENDING)], name="idx_date")
+# Indexes for the normalized region / station filters
+ensure_name_key_indexes(collection)
+
+# Index for date queries (in nested data) and keyset pagination on
+# (data.thoi_gian, _id) / (eai.score, _id)
+ensure_keyset_indexes(collection)
+
+# Indexes for EAI filtering / sorting on the stored scores
+collection.create_index([("eai.score", DESCENDING)], name="idx_eai_score")
+collection.create_index(
+    [("eai.status", ASCENDING), ("eai.score", DESCENDING)],
+    name="idx_eai_status_score"
+)
 
 print("Indexes created successfully!")
 
@@ -157,6 +189,9 @@ print("\nCurrent indexes:")
 for index in collection.list_indexes():
     print(f"  - {index['name']}: {index['key']}")
 
+# Tell the API that cached counts / statistics are stale
+generation = bump_import_generation(db, "import_dataset_to_mongodb", documents=inserted_count)
+
 # ==============================
 # SUMMARY
 # ==============================
@@ -164,5 +199,8 @@ print("\n" + "="*50)
 print("IMPORT COMPLETE!")
 print(f"  Total documents inserted: {inserted_count:,}")
 print(f"  Duplicates removed: {skipped_duplicates:,}")
+print(f"  EAI scoring profile: {EAI_PROFILE_VERSION}")
+print(f"  EAI rollups: {rollups.count_documents({}):,} buckets ({rollup_writes:,} upserts)")
 print(f"  Collection: {DB_NAME}.samples")
+print(f"  Import generation: {generation}")
 print("="*50)
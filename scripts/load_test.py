@@ -0,0 +1,149 @@
+import sys
+import json
+import time
+import argparse
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# ==============================
+# LOAD TEST: LIGHT ENDPOINT LATENCY WHILE FORECASTS RUN
+# ==============================
+# Usage (server running, e.g. uvicorn main:app --port 8000):
+#   python scripts/load_test.py --url http://localhost:8000 --forecast-concurrency 8
+#
+# Phase 1 measures light endpoints alone, phase 2 measures them again while
+# `forecast-concurrency` clients keep POSTing /prediction/forecast.
+#
+# With --compare-batch, instead compares station throughput of N sequential
+# POST /prediction/forecast calls against one POST /prediction/forecast/batch
+# for every station of --type-indicator (and --batch-area, if given).
+
+
+def request(url, body=None):
+    """Send a GET (or POST with a JSON body) and return (status, seconds)"""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=120) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = 0
+    return status, time.perf_counter() - start
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def sample_light(base_url, paths, duration):
+    """Request the light endpoints round-robin for `duration` seconds"""
+    latencies = {path: [] for path in paths}
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        for path in paths:
+            _, seconds = request(base_url + path)
+            latencies[path].append(seconds * 1000)
+    return latencies
+
+
+def run_forecasts(base_url, body, stop, results):
+    while not stop.is_set():
+        status, seconds = request(base_url + "/prediction/forecast", body)
+        results.append((status, seconds * 1000))
+
+
+def report(title, latencies):
+    print(title)
+    print(f"  {'endpoint':<28}{'n':>6}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for path, values in latencies.items():
+        print(
+            f"  {path:<28}{len(values):>6}{percentile(values, 50):>10.1f}"
+            f"{percentile(values, 99):>10.1f}{max(values, default=float('nan')):>10.1f}"
+        )
+
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=120) as resp:
+        return json.loads(resp.read())
+
+
+def compare_batch(base_url, type_indicator, area=None):
+    """Stations/sec: sequential single-station calls vs one batch call"""
+    areas = [area] if area else get_json(f"{base_url}/prediction/areas?type_indicator={type_indicator}")["areas"]
+    stations = []
+    for area_name in areas:
+        query = urllib.parse.urlencode({"type_indicator": type_indicator, "area": area_name})
+        for station in get_json(f"{base_url}/prediction/stations?{query}")["stations"]:
+            stations.append({"type_indicator": type_indicator, "area": area_name, "station": station})
+
+    start = time.perf_counter()
+    single_ok = sum(request(base_url + "/prediction/forecast", body)[0] == 200 for body in stations)
+    single_seconds = time.perf_counter() - start
+
+    batch_body = {"type_indicator": type_indicator}
+    if area:
+        batch_body["area"] = area
+    status, batch_seconds = request(base_url + "/prediction/forecast/batch", batch_body)
+
+    print(f"{len(stations)} station(s) of {type_indicator}{' / ' + area if area else ''}")
+    print(f"  single: {single_seconds:.2f}s, {single_ok} ok, {len(stations) / single_seconds:.1f} stations/s")
+    print(f"  batch:  {batch_seconds:.2f}s, status {status}, {len(stations) / batch_seconds:.1f} stations/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Light-endpoint latency under concurrent forecast load")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per phase")
+    parser.add_argument("--forecast-concurrency", type=int, default=8)
+    parser.add_argument("--light-path", action="append", default=None,
+                        help="Light endpoint to sample (repeatable)")
+    parser.add_argument("--type-indicator", default="WATER_QUALITY_SURFACE")
+    parser.add_argument("--area", default="Deep Bay")
+    parser.add_argument("--station", default="DM2")
+    parser.add_argument("--compare-batch", action="store_true",
+                        help="Compare single-station vs batch forecast throughput instead")
+    parser.add_argument("--batch-area", default=None)
+    args = parser.parse_args()
+
+    if args.compare_batch:
+        compare_batch(args.url, args.type_indicator, args.batch_area)
+        return 0
+
+    paths = args.light_path or ["/prediction/types", "/executor/stats"]
+    body = {"type_indicator": args.type_indicator, "area": args.area, "station": args.station}
+
+    report("Phase 1: light endpoints, no load", sample_light(args.url, paths, args.duration))
+
+    stop = threading.Event()
+    forecast_results = []
+    with ThreadPoolExecutor(max_workers=args.forecast_concurrency) as pool:
+        for _ in range(args.forecast_concurrency):
+            pool.submit(run_forecasts, args.url, body, stop, forecast_results)
+        time.sleep(1.0)  # let the forecast load ramp up
+        loaded = sample_light(args.url, paths, args.duration)
+        stop.set()
+
+    report(f"Phase 2: light endpoints, {args.forecast_concurrency} concurrent forecast clients", loaded)
+    statuses = {}
+    for status, _ in forecast_results:
+        statuses[status] = statuses.get(status, 0) + 1
+    forecast_ms = [ms for status, ms in forecast_results if status == 200]
+    print(
+        f"Forecasts: {len(forecast_results)} requests, statuses {statuses}, "
+        f"p50 {percentile(forecast_ms, 50):.0f} ms, p99 {percentile(forecast_ms, 99):.0f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,13 +11,23 @@ DB_NAME = os.getenv("MONGO_DB", "marine_environment")
 
 class Database:
     client: AsyncIOMotorClient = None
+    _server_version: tuple = None
     
     @classmethod
     async def connect(cls):
         """Connect to MongoDB"""
         cls.client = AsyncIOMotorClient(MONGO_URI)
+        cls._server_version = None
         print(f"Connected to MongoDB: {DB_NAME}")
     
+    @classmethod
+    async def server_version(cls) -> tuple:
+        """MongoDB server version as a tuple, e.g. (7, 0, 2), read once per connection"""
+        if cls._server_version is None:
+            info = await cls.client.server_info()
+            cls._server_version = tuple(info.get("versionArray", [0])[:3])
+        return cls._server_version
+    
     @classmethod
     async def disconnect(cls):
         """Disconnect from MongoDB"""
@@ -39,3 +49,11 @@ class Database:
 # Helper function to get collection
 def get_samples_collection():
     return Database.get_collection("samples")
+
+
+def get_rollups_collection():
+    return Database.get_collection("eai_rollups")
+
+
+def get_metadata_collection():
+    return Database.get_collection("metadata")
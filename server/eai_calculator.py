@@ -12,10 +12,26 @@ Classification:
 - 80-100: Good (Tốt) - Safe environment
 - 50-79: Warning (Cảnh cáo) - Needs monitoring  
 - <50: Bad (Xấu) - Urgent alert
+
+calculate_sample_eai scores one record. calculate_eai_batch scores columns
+of NumPy arrays (NaN = missing) in vectorized form with the same results;
+calculate_records_eai applies it to a list of records.
+
+Scores stored on sample documents (eai_document) are tagged with
+EAI_PROFILE_VERSION, a hash of the thresholds and weights, so documents
+scored with an older profile can be found and recomputed.
 """
 
+import csv
+import hashlib
+import io
+import json
 import math
-from typing import Dict, List, Optional, Tuple
+import itertools
+import threading
+from typing import Any, Dict, IO, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 # ==============================
 # PARAMETER THRESHOLDS
@@ -64,6 +80,17 @@ PARAM_WEIGHTS = {
     "zn": 0.17,
 }
 
+# Weight of parameters missing from PARAM_WEIGHTS
+DEFAULT_WEIGHT = 0.1
+
+# Scoring-profile version: changes whenever a threshold or weight changes
+EAI_PROFILE_VERSION = hashlib.sha1(json.dumps({
+    "optimal_middle": OPTIMAL_MIDDLE_PARAMS,
+    "lower_better": LOWER_BETTER_PARAMS,
+    "weights": PARAM_WEIGHTS,
+    "default_weight": DEFAULT_WEIGHT,
+}, sort_keys=True).encode()).hexdigest()[:12]
+
 
 # ==============================
 # SUB-INDEX CALCULATIONS
@@ -104,6 +131,17 @@ def calculate_qi_lower_better(value: float, max_val: float) -> float:
 # EAI CALCULATION
 # ==============================
 
+def eai_status(eai: Optional[float]) -> str:
+    """Classify an (unrounded) EAI score"""
+    if eai is None:
+        return "unknown"
+    if eai >= 80:
+        return "good"
+    elif eai >= 50:
+        return "warning"
+    return "bad"
+
+
 def calculate_eai(sub_indices: Dict[str, float], weights: Dict[str, float] = None) -> Tuple[float, str]:
     """
     Calculate EAI using Weighted Geometric Mean.
@@ -121,7 +159,7 @@ def calculate_eai(sub_indices: Dict[str, float], weights: Dict[str, float] = Non
         return None, "unknown"
     
     # Normalize weights for available parameters
-    available_weights = {k: weights.get(k, 0.1) for k in valid_indices.keys()}
+    available_weights = {k: weights.get(k, DEFAULT_WEIGHT) for k in valid_indices.keys()}
     total_weight = sum(available_weights.values())
     
     if total_weight == 0:
@@ -137,15 +175,7 @@ def calculate_eai(sub_indices: Dict[str, float], weights: Dict[str, float] = Non
     
     eai = math.exp(weighted_sum)
     
-    # Classify status
-    if eai >= 80:
-        status = "good"
-    elif eai >= 50:
-        status = "warning"
-    else:
-        status = "bad"
-    
-    return round(eai, 2), status
+    return round(eai, 2), eai_status(eai)
 
 
 def calculate_sample_eai(data: Dict) -> Dict:
@@ -188,6 +218,266 @@ def calculate_sample_eai(data: Dict) -> Dict:
     }
 
 
+# ==============================
+# BATCH (COLUMNAR) CALCULATION
+# ==============================
+
+# Parameters in the order calculate_sample_eai scores them (sums are
+# accumulated in the same order so results match bit for bit)
+EAI_PARAMS = list(OPTIMAL_MIDDLE_PARAMS) + list(LOWER_BETTER_PARAMS)
+
+# Value with Qi = 100. calculate_sample_eai clamps a NaN sub-index to 100, so
+# NaN values in records are mapped here (NaN in batch columns means missing)
+IDEAL_VALUES = {
+    **{param: (min_val + max_val) / 2 for param, (min_val, max_val) in OPTIMAL_MIDDLE_PARAMS.items()},
+    **{param: 0.0 for param in LOWER_BETTER_PARAMS},
+}
+
+
+def calculate_eai_batch(
+    columns: Dict[str, np.ndarray], weights: Dict[str, float] = None, n_rows: int = None
+) -> Dict[str, Any]:
+    """
+    Calculate EAI for many samples at once.
+    
+    Args:
+        columns: {param: float array}, one value per sample, NaN = missing.
+                 Parameters without a column are missing for every sample.
+        n_rows: number of samples (required when columns is empty)
+        
+    Returns:
+        Dictionary with
+        - eai: float array (not rounded, NaN when no parameter is available)
+        - status: array of "good" / "warning" / "bad" / "unknown"
+        - sub_indices: {param: float array (not rounded, NaN = missing)}
+    """
+    if weights is None:
+        weights = PARAM_WEIGHTS
+    n = n_rows if n_rows is not None else len(next(iter(columns.values()))) if columns else 0
+    
+    sub_indices = {}
+    for param in EAI_PARAMS:
+        if param not in columns:
+            continue
+        values = np.asarray(columns[param], dtype=float)
+        if param in OPTIMAL_MIDDLE_PARAMS:
+            min_val, max_val = OPTIMAL_MIDDLE_PARAMS[param]
+            c = (min_val + max_val) / 2
+            sigma = (max_val - min_val) / 4
+            qi = 100 * np.exp(-((values - c) ** 2) / (2 * sigma ** 2))
+        else:
+            qi = 100 * (1 - values / LOWER_BETTER_PARAMS[param])
+        sub_indices[param] = np.clip(qi, 0.0, 100.0)
+    
+    # Renormalize the weights of the available parameters per sample
+    total_weight = np.zeros(n)
+    for param, qi in sub_indices.items():
+        total_weight += np.where(np.isnan(qi), 0.0, weights.get(param, DEFAULT_WEIGHT))
+    
+    weighted_sum = np.zeros(n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for param, qi in sub_indices.items():
+            w = weights.get(param, DEFAULT_WEIGHT) / total_weight
+            weighted_sum += np.where(np.isnan(qi), 0.0, w * np.log(qi + 1))
+    
+    known = total_weight > 0
+    eai = np.where(known, np.exp(weighted_sum), np.nan)
+    status = np.where(eai >= 80, "good", np.where(eai >= 50, "warning", "bad"))
+    status = np.where(known, status, "unknown")
+    
+    return {"eai": eai, "status": status, "sub_indices": sub_indices}
+
+
+def eai_document(eai_result: Dict) -> Dict:
+    """Sub-document stored as "eai" on a sample (see scripts/backfill_eai.py)"""
+    return {
+        "score": eai_result["eai"],
+        "status": eai_result["status"],
+        "sub_indices": eai_result["sub_indices"],
+        "version": EAI_PROFILE_VERSION,
+    }
+
+
+def to_float(value: Any, ideal: float) -> float:
+    """float(value) like calculate_sample_eai, NaN if missing or not numeric"""
+    if value is None:
+        return math.nan
+    try:
+        value = float(value)
+    except (ValueError, TypeError):
+        return math.nan
+    # A NaN value scores 100 in calculate_sample_eai, unlike a missing one
+    return ideal if value != value else value
+
+
+def records_to_columns(records: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """Parameter columns (NaN = missing) from a list of sample data records"""
+    columns = {}
+    for param in EAI_PARAMS:
+        ideal = IDEAL_VALUES[param]
+        values = np.fromiter(
+            (to_float(data.get(param), ideal) for data in records), dtype=float, count=len(records)
+        )
+        if not np.isnan(values).all():
+            columns[param] = values
+    return columns
+
+
+def batch_results(batch: Dict[str, Any]) -> List[Dict]:
+    """Per-sample dicts in the calculate_sample_eai format from calculate_eai_batch output"""
+    eai = batch["eai"].tolist()
+    status = batch["status"].tolist()
+    sub_columns = [(param, qi.tolist()) for param, qi in batch["sub_indices"].items()]
+    
+    results = []
+    for i in range(len(eai)):
+        sub_indices = {}
+        for param, qi in sub_columns:
+            v = qi[i]
+            if v == v:
+                sub_indices[param] = round(v, 2) if v else None
+        results.append({
+            "eai": round(eai[i], 2) if eai[i] == eai[i] else None,
+            "status": status[i],
+            "sub_indices": sub_indices
+        })
+    return results
+
+
+def calculate_records_eai(records: Sequence[Dict]) -> List[Dict]:
+    """
+    Calculate EAI for a list of sample data records.
+    Same result as [calculate_sample_eai(data) for data in records].
+    """
+    if not records:
+        return []
+    return batch_results(calculate_eai_batch(records_to_columns(records), n_rows=len(records)))
+
+
+# Rows scored per batch when reading a CSV upload
+CSV_CHUNK_ROWS = 10000
+
+
+def _csv_record(row: Dict[str, str]) -> Dict[str, Any]:
+    """Normalize a CSV row: lowercase keys, numbers as floats, empty as None"""
+    data = {}
+    for key, value in row.items():
+        try:
+            data[key.strip().lower()] = float(value) if value else None
+        except (ValueError, TypeError):
+            data[key.strip().lower()] = value
+    return data
+
+
+def iter_csv_eai(stream: IO[str], chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[List[Dict]]:
+    """
+    Read a CSV text stream incrementally and yield the EAI results of each
+    chunk of chunk_rows records, so memory does not grow with the file size.
+    """
+    records = []
+    for row in csv.DictReader(stream):
+        records.append(_csv_record(row))
+        if len(records) >= chunk_rows:
+            yield calculate_records_eai(records)
+            records = []
+    if records:
+        yield calculate_records_eai(records)
+
+
+def score_csv_rows(rows: List[Dict[str, str]]) -> List[Dict]:
+    """EAI results of raw CSV rows (csv.DictReader dicts); picklable for the CPU pool"""
+    return calculate_records_eai([_csv_record(row) for row in rows])
+
+
+class CsvChunkReader:
+    """
+    Reads an uploaded CSV (binary file) chunk_rows raw rows at a time:
+    csv.DictReader dicts to be scored with score_csv_rows, or csv.reader
+    lists with dict_rows=False (the header comes on top of the first chunk;
+    blank lines are skipped like DictReader does, so both modes split the
+    file at the same rows). read() and detach() hold the same lock, so the text wrapper is never detached while a pool thread is
+    still reading (e.g. a read abandoned by its timeout).
+    """
+
+    def __init__(self, binary: IO[bytes], chunk_rows: int = CSV_CHUNK_ROWS, dict_rows: bool = True):
+        self._stream = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+        self._rows = csv.DictReader(self._stream) if dict_rows else filter(None, csv.reader(self._stream))
+        self.chunk_rows = chunk_rows
+        self._header_rows = 0 if dict_rows else 1
+        self._lock = threading.Lock()
+        self._detached = False
+
+    def read(self) -> List[Any]:
+        """Next chunk of rows ([] at the end of the file or once detached)"""
+        with self._lock:
+            if self._detached:
+                return []
+            rows = list(itertools.islice(self._rows, self.chunk_rows + self._header_rows))
+            self._header_rows = 0
+            return rows
+
+    def detach(self):
+        """Release the upload file (waits for a read in progress)"""
+        with self._lock:
+            if not self._detached:
+                self._detached = True
+                self._stream.detach()
+
+
+def csv_result_item(eai_result: Dict) -> Dict:
+    """Result of one CSV row as returned by the calculator endpoint"""
+    return {
+        "eai": eai_result["eai"],
+        "status": eai_result["status"],
+        "status_label": get_status_label(eai_result["status"]),
+        "sub_indices": eai_result["sub_indices"]
+    }
+
+
+# Header of the CSV output format (sub-index columns follow EAI_PARAMS)
+CSV_RESULT_HEADER = ["row", "eai", "status"] + EAI_PARAMS
+
+
+def format_eai_rows(results: Sequence[Dict], first_row: int, output_format: str) -> str:
+    """
+    NDJSON or CSV lines for consecutive results (calculate_sample_eai format),
+    numbered from first_row
+    """
+    buffer = io.StringIO()
+    if output_format == "csv":
+        writer = csv.writer(buffer, lineterminator="\n")
+        for row, eai_result in enumerate(results, first_row):
+            sub_indices = eai_result["sub_indices"]
+            writer.writerow(
+                [row, eai_result["eai"], eai_result["status"]] + [sub_indices.get(param) for param in EAI_PARAMS]
+            )
+    else:
+        for row, eai_result in enumerate(results, first_row):
+            buffer.write(json.dumps({"row": row, **csv_result_item(eai_result)}) + "\n")
+    return buffer.getvalue()
+
+
+def calculate_csv_eai(contents: bytes) -> Dict:
+    """
+    Calculate EAI for every record of an uploaded CSV file.
+    
+    Args:
+        contents: Raw CSV bytes (UTF-8, header row with parameter names)
+        
+    Returns:
+        Dictionary with total, results (one per row) and status summary
+    """
+    results = []
+    status_summary = {"good": 0, "warning": 0, "bad": 0, "unknown": 0}
+    
+    for chunk in iter_csv_eai(io.StringIO(contents.decode('utf-8'))):
+        for eai_result in chunk:
+            results.append(csv_result_item(eai_result))
+            status_summary[eai_result["status"]] += 1
+    
+    return {"total": len(results), "results": results, "summary": status_summary}
+
+
 def get_status_label(status: str) -> Dict[str, str]:
     """Get Vietnamese and English labels for status"""
     labels = {
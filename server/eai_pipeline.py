@@ -0,0 +1,216 @@
+"""
+EAI computed inside MongoDB (aggregation pipeline mode of /eai).
+
+The sub-index and weighted-geometric-mean expressions are generated from the
+threshold and weight tables in eai_calculator.py, so the server only receives
+the id, date, station fields and the raw EAI numbers instead of whole sample
+documents:
+
+- value:     $convert data.<param> to double (null if missing / not numeric;
+             NaN is mapped to the ideal value, as calculate_sample_eai scores
+             it 100)
+- sub-index: 100 × exp(-(x-c)²/(2σ²)) or 100 × (1 - x/max), clamped to 0-100
+- EAI:       exp(Σ (wi / Σw_available) · ln(Qi + 1)), null without parameters
+
+Rounding and status classification happen in Python (pipeline_result) so the
+results match calculate_sample_eai.
+
+eai_summary_pipeline aggregates the stored scores (eai.score / eai.status)
+of a whole filtered set in one $facet: count, mean, min/max, percentiles
+and status distribution. Percentiles use the $percentile accumulator on
+MongoDB 7.0+ (approximate). On older servers they are nearest ranks read
+from one sorted cursor (sorted_scores_pipeline: $sort + $limit up to the
+highest rank, score only), consumed batch by batch: the server sorts the
+scored set once (spilling to disk if needed) and the API never holds more
+than one batch, but the scores up to p90 are still sent over the wire.
+"""
+
+import math
+from typing import Any, Dict, List
+
+from eai_calculator import (
+    OPTIMAL_MIDDLE_PARAMS,
+    LOWER_BETTER_PARAMS,
+    PARAM_WEIGHTS,
+    DEFAULT_WEIGHT,
+    EAI_PARAMS,
+    IDEAL_VALUES,
+    eai_status,
+)
+
+# Fields kept from each sample besides the EAI numbers
+PROJECTED_FIELDS = ["station", "region", "sample_type", "water_layer"]
+
+SUMMARY_PERCENTILES = [10, 25, 50, 75, 90]
+
+# First server version with the $percentile accumulator
+PERCENTILE_OPERATOR_VERSION = (7, 0)
+
+SCORED = {"eai.score": {"$type": "number"}}
+
+
+def _value_expression(param: str) -> Dict[str, Any]:
+    converted = {"$convert": {"input": f"$data.{param}", "to": "double", "onError": None, "onNull": None}}
+    return {
+        "$let": {
+            "vars": {"v": converted},
+            "in": {"$cond": [{"$eq": ["$$v", float("nan")]}, IDEAL_VALUES[param], "$$v"]},
+        }
+    }
+
+
+def _clamp(expression: Dict[str, Any]) -> Dict[str, Any]:
+    return {"$max": [0.0, {"$min": [100.0, expression]}]}
+
+
+def _sub_index_expression(param: str) -> Dict[str, Any]:
+    x = f"$_eai_values.{param}"
+    if param in OPTIMAL_MIDDLE_PARAMS:
+        min_val, max_val = OPTIMAL_MIDDLE_PARAMS[param]
+        c = (min_val + max_val) / 2
+        sigma = (max_val - min_val) / 4
+        if sigma == 0:
+            qi = {"$cond": [{"$eq": [x, c]}, 100.0, 0.0]}
+        else:
+            squared = {"$pow": [{"$subtract": [x, c]}, 2]}
+            qi = {"$multiply": [100, {"$exp": {"$divide": [{"$multiply": [-1, squared]}, 2 * sigma ** 2]}}]}
+    else:
+        qi = {"$multiply": [100, {"$subtract": [1, {"$divide": [x, LOWER_BETTER_PARAMS[param]]}]}]}
+    return {"$cond": [{"$eq": [x, None]}, None, _clamp(qi)]}
+
+
+def eai_pipeline_stages(weights: Dict[str, float] = None, extra_fields: List[str] = None) -> List[Dict[str, Any]]:
+    """
+    Stages appended after $match / $sort / $skip / $limit. Output documents:
+    {_id, date, station, region, sample_type, water_layer,
+     eai_score (raw double or null), eai_sub_indices ({param: raw double or null})}
+    plus the extra_fields paths kept as they are (e.g. a pagination key).
+    """
+    if weights is None:
+        weights = PARAM_WEIGHTS
+
+    def present(param):
+        return {"$ne": [f"$eai_sub_indices.{param}", None]}
+
+    total_weight = {"$add": [
+        {"$cond": [present(param), weights.get(param, DEFAULT_WEIGHT), 0.0]} for param in EAI_PARAMS
+    ]}
+    weighted_terms = [
+        {"$cond": [
+            present(param),
+            {"$multiply": [
+                {"$divide": [weights.get(param, DEFAULT_WEIGHT), "$_eai_weight"]},
+                {"$ln": {"$add": [f"$eai_sub_indices.{param}", 1]}},
+            ]},
+            0.0,
+        ]}
+        for param in EAI_PARAMS
+    ]
+
+    return [
+        {"$project": {
+            "date": "$data.thoi_gian",
+            **{field: 1 for field in PROJECTED_FIELDS + (extra_fields or [])},
+            "_eai_values": {param: _value_expression(param) for param in EAI_PARAMS},
+        }},
+        {"$addFields": {"eai_sub_indices": {param: _sub_index_expression(param) for param in EAI_PARAMS}}},
+        {"$addFields": {"_eai_weight": total_weight}},
+        {"$addFields": {
+            "eai_score": {"$cond": [{"$gt": ["$_eai_weight", 0]}, {"$exp": {"$add": weighted_terms}}, None]},
+        }},
+        {"$project": {"_eai_values": 0, "_eai_weight": 0}},
+    ]
+
+
+def pipeline_result(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """EAI result in the calculate_sample_eai format from a pipeline output document"""
+    eai = doc.get("eai_score")
+    sub_indices = {}
+    for param in EAI_PARAMS:
+        v = (doc.get("eai_sub_indices") or {}).get(param)
+        if v is not None:
+            sub_indices[param] = round(v, 2) if v else None
+    return {
+        "eai": round(eai, 2) if eai is not None else None,
+        "status": eai_status(eai),
+        "sub_indices": sub_indices,
+    }
+
+
+def eai_summary_pipeline(query: Dict[str, Any], percentiles: List[int] = None, server_percentiles: bool = True) -> List[Dict[str, Any]]:
+    """
+    Single $facet over the stored scores of every document matching query.
+    With server_percentiles (MongoDB 7.0+) the percentiles are computed by
+    $percentile in the overall group; otherwise read them with
+    sorted_scores_pipeline and the returned "scored" count.
+    """
+    if percentiles is None:
+        percentiles = SUMMARY_PERCENTILES
+    overall = {
+        "_id": None,
+        "count": {"$sum": 1},
+        "scored": {"$sum": {"$cond": [{"$isNumber": "$eai.score"}, 1, 0]}},
+        "mean": {"$avg": "$eai.score"},
+        "min": {"$min": "$eai.score"},
+        "max": {"$max": "$eai.score"},
+    }
+    if server_percentiles:
+        # Non-numeric scores are ignored by $percentile
+        overall["percentiles"] = {
+            "$percentile": {"input": "$eai.score", "p": [p / 100 for p in percentiles], "method": "approximate"}
+        }
+
+    return [
+        {"$match": query},
+        {"$facet": {
+            "overall": [{"$group": overall}],
+            "status": [{"$group": {"_id": "$eai.status", "count": {"$sum": 1}}}],
+        }},
+    ]
+
+
+def percentile_rank(p: int, n: int) -> int:
+    """Nearest rank of percentile p among n sorted scores: round(p / 100 × (n - 1))"""
+    return int(math.floor(p / 100 * (n - 1) + 0.5))
+
+
+def sorted_scores_pipeline(query: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """The limit lowest scores matching query, in ascending order (score only)"""
+    return [
+        {"$match": {"$and": [query, SCORED]}},
+        {"$sort": {"eai.score": 1}},
+        {"$limit": limit},
+        {"$project": {"_id": 0, "score": "$eai.score"}},
+    ]
+
+
+def summary_result(facet: Dict[str, Any], percentiles: List[int] = None, values: Dict[str, float] = None) -> Dict[str, Any]:
+    """
+    Response dict from the eai_summary_pipeline output document; values
+    holds the percentiles ({"p50": ...}) when they were not computed by
+    $percentile.
+    """
+    if percentiles is None:
+        percentiles = SUMMARY_PERCENTILES
+    overall = facet["overall"][0] if facet.get("overall") else {}
+    if values is None:
+        values = dict(zip((f"p{p}" for p in percentiles), overall.get("percentiles") or []))
+
+    status_distribution = {"good": 0, "warning": 0, "bad": 0, "unknown": 0}
+    for group in facet.get("status", []):
+        # Documents without a stored score count as unknown
+        key = group["_id"] if group["_id"] in status_distribution else "unknown"
+        status_distribution[key] += group["count"]
+
+    def rounded(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        "total": overall.get("count", 0),
+        "scored": sum(n for status, n in status_distribution.items() if status != "unknown"),
+        "average_eai": rounded(overall.get("mean")),
+        "min_eai": rounded(overall.get("min")),
+        "max_eai": rounded(overall.get("max")),
+        "percentiles": {f"p{p}": rounded(values.get(f"p{p}")) for p in percentiles},
+        "status_distribution": status_distribution,
+    }
@@ -0,0 +1,172 @@
+"""
+Materialized EAI rollups (collection eai_rollups).
+
+One document per (granularity, period, sample_type, water_layer, region,
+station) with the sample count and the sums needed to merge buckets:
+
+    {"granularity": "month", "period": "2015-03", "sample_type": ...,
+     "water_layer": ..., "region": ..., "station": ..., "count": 12,
+     "scored": 11, "score_sum": 604.2, "score_min": 31.5, "score_max": 80.1,
+     "status": {"good": 1, "warning": 6, "bad": 4, "unknown": 1},
+     "region_key": ..., "station_key": ...}
+
+Periods are prefixes of data.thoi_gian ("YYYY-MM" / "YYYY"). The importer
+adds every inserted batch with $inc / $min / $max upserts, so new samples
+update the rollups incrementally; rebuild_rollups recomputes them from the
+stored sample scores (after scripts/backfill_eai.py) and swaps them in.
+
+rollup_series_pipeline merges the stored buckets per period (and optional
+dimensions) on the server, so the dashboard never scans raw samples.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+from pymongo import ASCENDING, UpdateOne
+
+from query_filters import name_keys
+
+ROLLUP_COLLECTION = "eai_rollups"
+
+# Granularity -> length of the data.thoi_gian prefix used as period
+GRANULARITIES = {"month": 7, "year": 4}
+
+ROLLUP_DIMENSIONS = ["sample_type", "water_layer", "region", "station"]
+
+# Sample fields needed to roll a document up
+ROLLUP_PROJECTION = {"data.thoi_gian": 1, "eai.score": 1, "eai.status": 1, **{d: 1 for d in ROLLUP_DIMENSIONS}}
+
+STATUSES = ["good", "warning", "bad", "unknown"]
+
+
+def ensure_rollup_indexes(rollups):
+    """Unique bucket key (upsert target) and the period scan of the endpoint"""
+    rollups.create_index(
+        [("granularity", ASCENDING)] + [(d, ASCENDING) for d in ROLLUP_DIMENSIONS] + [("period", ASCENDING)],
+        name="idx_rollup_key",
+        unique=True,
+    )
+    rollups.create_index([("granularity", ASCENDING), ("period", ASCENDING)], name="idx_rollup_period")
+
+
+class RollupAccumulator:
+    """Buckets of a batch of sample documents, merged in memory before writing"""
+
+    def __init__(self):
+        self.buckets: Dict[Tuple, Dict[str, Any]] = {}
+
+    def add(self, doc: Dict[str, Any]):
+        date = (doc.get("data") or {}).get("thoi_gian")
+        if not isinstance(date, str):
+            return
+        eai = doc.get("eai") or {}
+        score = eai.get("score")
+        status = eai.get("status") if eai.get("status") in STATUSES else "unknown"
+
+        for granularity, length in GRANULARITIES.items():
+            key = (granularity, date[:length]) + tuple(doc.get(d) for d in ROLLUP_DIMENSIONS)
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = {
+                    "count": 0, "scored": 0, "score_sum": 0.0, "score_min": None, "score_max": None,
+                    "status": dict.fromkeys(STATUSES, 0),
+                }
+            bucket["count"] += 1
+            bucket["status"][status] += 1
+            if score is not None:
+                bucket["scored"] += 1
+                bucket["score_sum"] += score
+                bucket["score_min"] = score if bucket["score_min"] is None else min(bucket["score_min"], score)
+                bucket["score_max"] = score if bucket["score_max"] is None else max(bucket["score_max"], score)
+
+    def add_many(self, docs: Iterable[Dict[str, Any]]):
+        for doc in docs:
+            self.add(doc)
+        return self
+
+    def updates(self) -> List[UpdateOne]:
+        """Upserts adding every bucket to the stored rollups"""
+        operations = []
+        for key, bucket in self.buckets.items():
+            granularity, period, *dimensions = key
+            update = {"$inc": {
+                "count": bucket["count"],
+                "scored": bucket["scored"],
+                "score_sum": bucket["score_sum"],
+                **{f"status.{s}": n for s, n in bucket["status"].items()},
+            }}
+            if bucket["scored"]:
+                update["$min"] = {"score_min": bucket["score_min"]}
+                update["$max"] = {"score_max": bucket["score_max"]}
+            key_filter = {"granularity": granularity, "period": period, **dict(zip(ROLLUP_DIMENSIONS, dimensions))}
+            # Lookup fields for the region / station filters (query_filters.py)
+            update["$setOnInsert"] = name_keys(key_filter["region"], key_filter["station"])
+            operations.append(UpdateOne(key_filter, update, upsert=True))
+        return operations
+
+
+def update_rollups(rollups, docs: Iterable[Dict[str, Any]]) -> int:
+    """Add newly inserted sample documents to the rollups, returns buckets written"""
+    operations = RollupAccumulator().add_many(docs).updates()
+    if operations:
+        rollups.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+def rebuild_rollups(samples, rollups, batch_size: int = 5000) -> int:
+    """
+    Recompute every rollup from the stored sample scores. The buckets are
+    written to a temporary collection that then replaces rollups in one
+    renameCollection, so readers never see an empty or partial set
+    (importer writes made during the rebuild are lost: run it between imports).
+    """
+    accumulator = RollupAccumulator().add_many(samples.find({}, ROLLUP_PROJECTION).batch_size(batch_size))
+    staging = rollups.database[f"{rollups.name}_rebuild"]
+    staging.drop()
+    ensure_rollup_indexes(staging)
+    operations = accumulator.updates()
+    for i in range(0, len(operations), batch_size):
+        staging.bulk_write(operations[i:i + batch_size], ordered=False)
+    staging.rename(rollups.name, dropTarget=True)
+    return len(operations)
+
+
+# ==============================
+# READ PATH
+# ==============================
+def rollup_series_pipeline(query: Dict[str, Any], group_by: List[str] = None) -> List[Dict[str, Any]]:
+    """
+    Merge the buckets matching query per period (and group_by dimensions),
+    oldest period first.
+    """
+    group_by = group_by or []
+    group_id = {"period": "$period", **{d: f"${d}" for d in group_by}}
+    return [
+        {"$match": query},
+        {"$group": {
+            "_id": group_id,
+            "count": {"$sum": "$count"},
+            "scored": {"$sum": "$scored"},
+            "score_sum": {"$sum": "$score_sum"},
+            "score_min": {"$min": "$score_min"},
+            "score_max": {"$max": "$score_max"},
+            **{s: {"$sum": f"$status.{s}"} for s in STATUSES},
+        }},
+        {"$sort": {f"_id.{key}": 1 for key in group_id}},
+    ]
+
+
+def series_point(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Response item from a rollup_series_pipeline output document"""
+    def rounded(value):
+        return round(value, 2) if value is not None else None
+
+    scored = doc.get("scored", 0)
+    return {
+        **doc["_id"],
+        "count": doc.get("count", 0),
+        "scored": scored,
+        "average_eai": rounded(doc["score_sum"] / scored) if scored else None,
+        "min_eai": rounded(doc.get("score_min")),
+        "max_eai": rounded(doc.get("score_max")),
+        "status_distribution": {s: doc.get(s, 0) for s in STATUSES},
+    }
@@ -0,0 +1,170 @@
+"""
+Execution layer for blocking work in async handlers.
+
+CPU-bound work (forecasting, CSV scoring) runs in a process pool and
+blocking I/O (file/SQLite reads) in a thread pool, so the event loop keeps
+serving light endpoints. Each pool has a bounded queue depth (extra tasks
+are rejected with ExecutorBusyError) and a per-task timeout
+(ExecutorTimeoutError).
+
+Configuration (env):
+- CPU_WORKERS: process pool size (0 = run CPU tasks in the thread pool)
+- IO_WORKERS: thread pool size
+- EXECUTOR_MAX_QUEUE: max running + waiting tasks per pool
+- EXECUTOR_TASK_TIMEOUT: seconds before a task is abandoned
+"""
+
+import os
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+IO_WORKERS = int(os.getenv("IO_WORKERS", "8"))
+EXECUTOR_MAX_QUEUE = int(os.getenv("EXECUTOR_MAX_QUEUE", "64"))
+EXECUTOR_TASK_TIMEOUT = float(os.getenv("EXECUTOR_TASK_TIMEOUT", "60"))
+
+
+class ExecutorBusyError(Exception):
+    """The pool already has EXECUTOR_MAX_QUEUE tasks running or waiting"""
+
+
+class ExecutorTimeoutError(Exception):
+    """The task did not finish within its timeout"""
+
+
+def _on_worker(hold: float, fn: Callable, args: tuple) -> tuple:
+    # Hold the worker briefly so each probe lands on a different process
+    time.sleep(hold)
+    return os.getpid(), fn(*args)
+
+
+class _Pool:
+    def __init__(self, name: str, executor: Executor, max_queue: int):
+        self.name = name
+        self.executor = executor
+        self.max_queue = max_queue
+        self.pending = 0
+        self.finished = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "max_queue": self.max_queue,
+            "finished": self.finished,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class ExecutionLayer:
+    def __init__(
+        self,
+        cpu_workers: int = CPU_WORKERS,
+        io_workers: int = IO_WORKERS,
+        max_queue: int = EXECUTOR_MAX_QUEUE,
+        timeout: float = EXECUTOR_TASK_TIMEOUT,
+    ):
+        self.cpu_workers = cpu_workers
+        self.io_workers = io_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._cpu: Optional[_Pool] = None
+        self._io: Optional[_Pool] = None
+
+    def start(self, initializer: Callable = None, initargs: tuple = ()):
+        """
+        Create the pools (called from the app lifespan). initializer(*initargs)
+        runs once in every CPU worker process before it takes tasks.
+        """
+        io_executor = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="io")
+        self._io = _Pool("io", io_executor, self.max_queue)
+        if self.cpu_workers > 0:
+            # spawn: workers do not inherit the event loop or Mongo client
+            cpu_executor = ProcessPoolExecutor(
+                max_workers=self.cpu_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+                initargs=initargs,
+            )
+            self._cpu = _Pool("cpu", cpu_executor, self.max_queue)
+        else:
+            self._cpu = self._io
+
+    def shutdown(self):
+        for pool in {id(p): p for p in (self._cpu, self._io) if p}.values():
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+        self._cpu = self._io = None
+
+    async def _run(self, pool: _Pool, fn: Callable, args: tuple, timeout: Optional[float]) -> Any:
+        if pool.pending >= pool.max_queue:
+            pool.rejected += 1
+            raise ExecutorBusyError(f"{pool.name} pool is full ({pool.max_queue} tasks)")
+
+        pool.pending += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(pool.executor, fn, *args)
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            pool.timed_out += 1
+            raise ExecutorTimeoutError(f"{pool.name} task timed out after {timeout or self.timeout:g}s")
+        finally:
+            pool.pending -= 1
+            pool.finished += 1
+
+    async def spawn_cpu_workers(self) -> int:
+        """
+        Start every CPU worker now instead of on the first requests (workers
+        are spawned on demand) and wait until their initializer has run.
+        Returns the number of distinct worker processes that answered.
+        """
+        if self._cpu is None or self._cpu is self._io:
+            return 0
+        loop = asyncio.get_running_loop()
+        answers = await asyncio.gather(
+            *(loop.run_in_executor(self._cpu.executor, _on_worker, 0.2, os.getpid, ()) for _ in range(self.cpu_workers))
+        )
+        return len(dict(answers))
+
+    async def run_cpu_workers(self, fn: Callable, *args, hold: float = 0.05, timeout: float = None) -> Dict[int, Any]:
+        """
+        Run fn (picklable) once per CPU worker process: {pid: result}. A pool
+        cannot address its workers, so cpu_workers probes each hold a worker
+        for `hold` seconds; a worker busy for longer than that may answer
+        twice and another not at all (compare len(result) with cpu_workers).
+        Without a process pool fn runs once, in this process.
+        """
+        if self._cpu is None or self._cpu is self._io:
+            return {os.getpid(): await self.run_io(fn, *args, timeout=timeout)}
+        answers = await asyncio.gather(
+            *(self._run(self._cpu, _on_worker, (hold, fn, args), timeout) for _ in range(self.cpu_workers))
+        )
+        return dict(answers)
+
+    async def run_cpu(self, fn: Callable, *args, timeout: float = None) -> Any:
+        """Run a CPU-bound function (must be picklable) in the process pool"""
+        if self._cpu is None:
+            return fn(*args)
+        return await self._run(self._cpu, fn, args, timeout)
+
+    async def run_io(self, fn: Callable, *args, timeout: float = None) -> Any:
+        """Run a blocking I/O function in the thread pool"""
+        if self._io is None:
+            return fn(*args)
+        return await self._run(self._io, fn, args, timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cpu_workers": self.cpu_workers,
+            "io_workers": self.io_workers,
+            "task_timeout": self.timeout,
+            "cpu": self._cpu.stats() if self._cpu and self._cpu is not self._io else None,
+            "io": self._io.stats() if self._io else None,
+        }
+
+
+executor = ExecutionLayer()
@@ -0,0 +1,46 @@
+"""
+orjson response path for the large list endpoints (/samples, /eai).
+
+A page of up to 5000 documents returned as a Pydantic model is validated
+against the response_model, walked by jsonable_encoder and then encoded by
+json.dumps. The handlers build plain dicts that are already JSON-ready
+(_id is a str, see fast_read.py), so page_response() encodes them directly
+with orjson and returns a Response: FastAPI skips response_model
+validation and serialization for Response objects, while the
+response_model declared on the route still documents the OpenAPI schema.
+"""
+
+from typing import Any, Dict, Type
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    """Types orjson does not encode natively (ObjectId, Decimal128, ...)"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+class ORJSONPageResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def page_response(model: Type[BaseModel], **fields) -> ORJSONPageResponse:
+    """
+    Response with model's fields (in declaration order, unset ones at their
+    default), encoded with orjson and not validated against model.
+    """
+    content: Dict[str, Any] = {
+        name: fields[name] if name in fields else field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+    }
+    return ORJSONPageResponse(content)
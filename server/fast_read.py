@@ -0,0 +1,63 @@
+"""
+Fast read path for the list endpoints.
+
+Cursors are opened with find_raw_batches / aggregate_raw_batches, so motor
+hands over each server batch as raw BSON bytes. A batch is decoded in one
+bson.decode_all call (C extension) and _id is turned into a string on the
+decoded documents in place: no per-document cursor iteration, no second
+list. A TypeDecoder codec doing the _id conversion while decoding was
+measured ~10% slower (it calls back into Python for every ObjectId), see
+scripts/benchmark_read_path.py.
+
+batch_size is set explicitly to the page size (capped at
+MONGO_READ_BATCH_SIZE) so a page normally arrives in one round trip
+instead of the default 101-document first batch plus getMores.
+"""
+
+import os
+from typing import Any, Dict, List
+
+import bson
+
+MONGO_READ_BATCH_SIZE = int(os.getenv("MONGO_READ_BATCH_SIZE", "1000"))
+
+
+def batch_size(limit: int) -> int:
+    """Cursor batch size for a page of limit documents"""
+    return max(1, min(limit, MONGO_READ_BATCH_SIZE))
+
+
+def find_raw(collection, query: Dict[str, Any], projection: Dict[str, Any] = None, sort=None, skip: int = 0, limit: int = 0):
+    """find_raw_batches cursor with the page's sort / skip / limit and batch size"""
+    cursor = collection.find_raw_batches(query, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    if skip:
+        cursor = cursor.skip(skip)
+    if limit:
+        cursor = cursor.limit(limit).batch_size(batch_size(limit))
+    return cursor
+
+
+def aggregate_raw(collection, pipeline: List[Dict[str, Any]], limit: int, **kwargs):
+    """aggregate_raw_batches cursor for a pipeline returning at most limit documents"""
+    return collection.aggregate_raw_batches(pipeline, batchSize=batch_size(limit), **kwargs)
+
+
+def decode_batch(batch: bytes) -> List[Dict[str, Any]]:
+    """Documents of one raw batch, _id as str"""
+    docs = bson.decode_all(batch)
+    for doc in docs:
+        if "_id" in doc:
+            doc["_id"] = str(doc["_id"])
+    return docs
+
+
+async def read_documents(raw_cursor, limit: int = None) -> List[Dict[str, Any]]:
+    """Documents of a raw-batch cursor (_id as str)"""
+    docs = []
+    async for batch in raw_cursor:
+        docs.extend(decode_batch(batch))
+        if limit is not None and len(docs) >= limit:
+            break
+    return docs if limit is None else docs[:limit]
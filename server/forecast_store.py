@@ -0,0 +1,339 @@
+"""
+Precomputed forecast store (SQLite).
+
+Forecasts only change when models are retrained, so they are materialized
+ahead of time and served from a single indexed SQLite file:
+
+- station_forecasts: EAI predictions per station plus the combined
+  fingerprint of all its element models
+
+A stored station is fresh while its fingerprint matches the model files on
+disk; stale or missing stations are recomputed live and written back.
+WAL mode and the tables are set up once per process; lookups reuse a
+read-only connection per thread.
+
+Usage:
+    python forecast_store.py materialize [--workers N] [--force]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from model_files import MODELS_BASE_DIR, model_fingerprint
+from model_registry import list_station_models, list_stations
+from model_pack import get_model_pack
+from forecasting import FORECAST_ENGINE, compute_forecast_rows, build_predictions
+
+FORECAST_STORE_PATH = os.getenv("FORECAST_STORE_PATH", os.path.join(MODELS_BASE_DIR, "forecast_store.sqlite"))
+FORECAST_STORE_ENABLED = os.getenv("FORECAST_STORE_ENABLED", "1") == "1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS station_forecasts (
+    type_indicator TEXT NOT NULL,
+    area TEXT NOT NULL,
+    station TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    predictions TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (type_indicator, area, station)
+);
+-- Per-element yhat rows of earlier versions, never read
+DROP TABLE IF EXISTS element_forecasts;
+"""
+
+
+# ==============================
+# FINGERPRINTS
+# ==============================
+def station_fingerprint(type_name: str, area: str, station: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Combined fingerprint of a station and the fingerprint of each element,
+    always from the files on disk (packed stations skip the folder listing).
+    """
+    pack = get_model_pack()
+    packed = pack.check_station(type_name, area, station) if pack is not None else None
+    if packed is not None:
+        elements = {element: files["fingerprint"] for element, files in packed.items()}
+    else:
+        elements = {
+            element: model_fingerprint(model_path, config_path)
+            for element, model_path, config_path in list_station_models(type_name, area, station)
+        }
+    combined = hashlib.sha1(json.dumps(elements, sort_keys=True).encode()).hexdigest()[:16]
+    return combined, elements
+
+
+# ==============================
+# STORAGE
+# ==============================
+# (path, inode) of the store files whose schema is set up in this process
+_schema_ready = set()
+_schema_lock = threading.Lock()
+_local = threading.local()
+
+
+def _inode(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_ino
+    except OSError:
+        return None
+
+
+def _ensure_schema(path: str):
+    """WAL mode + tables, once per store file and process (again if the file is replaced)"""
+    if (path, _inode(path)) in _schema_ready:
+        return
+    with _schema_lock:
+        if (path, _inode(path)) not in _schema_ready:
+            conn = sqlite3.connect(path, timeout=30)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+            finally:
+                conn.close()
+            _schema_ready.add((path, _inode(path)))
+
+
+def _connect(path: str = None) -> sqlite3.Connection:
+    """New read-write connection (writes are rare: materialize / write-back)"""
+    path = path or FORECAST_STORE_PATH
+    _ensure_schema(path)
+    return sqlite3.connect(path, timeout=30)
+
+
+def _reader(path: str = None) -> Optional[sqlite3.Connection]:
+    """
+    Read-only connection of the calling thread, reused across lookups
+    (None if the store file does not exist). Reopened if the file was
+    replaced or in a forked worker.
+    """
+    path = path or FORECAST_STORE_PATH
+    inode = _inode(path)
+    if inode is None:
+        return None
+    readers = getattr(_local, "readers", None)
+    if readers is None:
+        readers = _local.readers = {}
+    key = (os.getpid(), inode)
+    cached = readers.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    _ensure_schema(path)
+    conn = sqlite3.connect(f"file:{quote(os.path.abspath(path))}?mode=ro", uri=True, timeout=30)
+    readers[path] = (key, conn)
+    return conn
+
+
+def read_station(type_name: str, area: str, station: str, fingerprint: str, path: str = None) -> Optional[List[Dict[str, Any]]]:
+    """Stored predictions for a station if they match the fingerprint, else None"""
+    conn = _reader(path)
+    if conn is None:
+        return None
+    row = conn.execute(
+        "SELECT fingerprint, predictions FROM station_forecasts "
+        "WHERE type_indicator = ? AND area = ? AND station = ?",
+        (type_name, area, station),
+    ).fetchone()
+    if row is None or row[0] != fingerprint:
+        return None
+    return json.loads(row[1])
+
+
+def write_stations(entries: List[Dict[str, Any]], engine: str = FORECAST_ENGINE, path: str = None):
+    """
+    Upsert materialized stations. Each entry holds type_name, area, station,
+    fingerprint, predictions.
+    """
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = _connect(path)
+    try:
+        with conn:
+            for entry in entries:
+                key = (entry["type_name"], entry["area"], entry["station"])
+                conn.execute(
+                    "INSERT OR REPLACE INTO station_forecasts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    key + (entry["fingerprint"], json.dumps(entry["predictions"]), engine, created_at),
+                )
+    finally:
+        conn.close()
+
+
+def stored_fingerprints(path: str = None) -> Dict[Tuple[str, str, str], str]:
+    conn = _reader(path)
+    if conn is None:
+        return {}
+    rows = conn.execute("SELECT type_indicator, area, station, fingerprint FROM station_forecasts").fetchall()
+    return {(t, a, s): fp for t, a, s, fp in rows}
+
+
+# ==============================
+# SERVING
+# ==============================
+def compute_station(type_name: str, area: str, station: str) -> Dict[str, Any]:
+    """Run live inference for a station and return a store entry"""
+    fingerprint, _ = station_fingerprint(type_name, area, station)
+    return {
+        "type_name": type_name,
+        "area": area,
+        "station": station,
+        "fingerprint": fingerprint,
+        "predictions": build_predictions(compute_forecast_rows(type_name, area, station)),
+    }
+
+
+def lookup_station(type_name: str, area: str, station: str) -> Optional[List[Dict[str, Any]]]:
+    """Fresh stored predictions for a station, or None (I/O only, no inference)"""
+    if not FORECAST_STORE_ENABLED:
+        return None
+    fingerprint, _ = station_fingerprint(type_name, area, station)
+    try:
+        return read_station(type_name, area, station, fingerprint)
+    except sqlite3.Error as e:
+        print(f"Forecast store read failed: {e}")
+        return None
+
+
+def refresh_station(type_name: str, area: str, station: str) -> List[Dict[str, Any]]:
+    """Compute a station live and write it back to the store"""
+    if not FORECAST_STORE_ENABLED:
+        return build_predictions(compute_forecast_rows(type_name, area, station))
+    entry = compute_station(type_name, area, station)
+    try:
+        write_stations([entry])
+    except sqlite3.Error as e:
+        print(f"Forecast store write failed: {e}")
+    return entry["predictions"]
+
+
+def _error_result(error: Exception) -> Dict[str, Any]:
+    status_code = 404 if isinstance(error, FileNotFoundError) else 500
+    return {"error": str(error), "status_code": status_code}
+
+
+def lookup_stations(keys: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+    """
+    Batch version of lookup_station using one store connection.
+    Returns {key: {"predictions", "source": "store"} | {"error", "status_code"}};
+    keys that must be recomputed are left out.
+    """
+    results, fingerprints = {}, {}
+    for key in keys:
+        try:
+            fingerprints[key] = station_fingerprint(*key)[0]
+        except Exception as e:
+            results[key] = _error_result(e)
+
+    if not FORECAST_STORE_ENABLED or not fingerprints:
+        return results
+    try:
+        conn = _reader()
+        if conn is None:
+            return results
+        for key, fingerprint in fingerprints.items():
+            row = conn.execute(
+                "SELECT fingerprint, predictions FROM station_forecasts "
+                "WHERE type_indicator = ? AND area = ? AND station = ?",
+                key,
+            ).fetchone()
+            if row is not None and row[0] == fingerprint:
+                results[key] = {"predictions": json.loads(row[1]), "source": "store"}
+    except sqlite3.Error as e:
+        print(f"Forecast store read failed: {e}")
+    return results
+
+
+def refresh_stations(keys: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+    """
+    Compute many stations live in this process (sharing its model cache) and
+    write them back in one transaction. Errors are isolated per station.
+    """
+    results, entries = {}, []
+    for key in keys:
+        try:
+            entry = compute_station(*key)
+        except Exception as e:
+            results[key] = _error_result(e)
+            continue
+        entries.append(entry)
+        results[key] = {"predictions": entry["predictions"], "source": "live"}
+
+    if FORECAST_STORE_ENABLED and entries:
+        try:
+            write_stations(entries)
+        except sqlite3.Error as e:
+            print(f"Forecast store write failed: {e}")
+    return results
+
+
+def get_station_predictions(type_name: str, area: str, station: str) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Predictions for a station: from the store when fresh, otherwise computed
+    live and written back. Returns (predictions, source) with source
+    "store" or "live".
+    """
+    predictions = lookup_station(type_name, area, station)
+    if predictions is not None:
+        return predictions, "store"
+    return refresh_station(type_name, area, station), "live"
+
+
+# ==============================
+# MATERIALIZE COMMAND
+# ==============================
+def materialize(workers: int = None, force: bool = False, path: str = None) -> Dict[str, int]:
+    """Recompute stale (or all, with force) stations across a process pool"""
+    stations = list_stations()
+    stored = {} if force else stored_fingerprints(path)
+    todo = [key for key in stations if force or stored.get(key) != station_fingerprint(*key)[0]]
+    print(f"Stations: {len(stations)} | stale or missing: {len(todo)} | workers: {workers or os.cpu_count()}")
+
+    summary = {"stations": len(stations), "computed": 0, "failed": 0, "fresh": len(stations) - len(todo)}
+    entries = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(compute_station, *key): key for key in todo}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                entries.append(future.result())
+                summary["computed"] += 1
+            except Exception as e:
+                summary["failed"] += 1
+                print(f"  Failed {'/'.join(key)}: {e}")
+
+    write_stations(entries, path=path)
+    print(
+        f"Materialized {summary['computed']} station(s), {summary['failed']} failed, "
+        f"{summary['fresh']} already fresh in {time.perf_counter() - start:.1f}s -> {path or FORECAST_STORE_PATH}"
+    )
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precomputed forecast store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    materialize_parser = subparsers.add_parser("materialize", help="Materialize forecasts for every station")
+    materialize_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    materialize_parser.add_argument("--force", action="store_true", help="Recompute fresh stations too")
+    materialize_parser.add_argument("--path", default=None, help=f"Store file (default: {FORECAST_STORE_PATH})")
+    args = parser.parse_args()
+
+    if args.command == "materialize":
+        summary = materialize(args.workers, args.force, args.path)
+        return 1 if summary["failed"] and not summary["computed"] else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Forecast service used by the prediction endpoints.
+
+Chooses the forecasting engine (FORECAST_ENGINE env):
+- "numpy" (default): numpy_forecast, evaluates the saved parameters directly
+  without importing Prophet; falls back to Prophet for unsupported models
+- "prophet": inference.get_forecast_df in point-forecast mode
+"""
+
+import os
+from typing import Any, Dict, List, Tuple
+
+from eai_calculator import calculate_records_eai, get_status_label
+
+FORECAST_ENGINE = os.getenv("FORECAST_ENGINE", "numpy").lower()
+
+
+def compute_forecast_rows(type_name: str, area: str, station: str) -> List[Dict[str, Any]]:
+    """
+    12-month forecast of a station as rows:
+    [{"thoi_gian": "YYYY-MM-28", "<element>": yhat, ...}, ...]
+    Elements without a forecast for a month are omitted from that row.
+    """
+    if FORECAST_ENGINE == "numpy":
+        from numpy_forecast import forecast_station, UnsupportedModelError
+        try:
+            return forecast_station(type_name, area, station)
+        except UnsupportedModelError as e:
+            print(f"NumPy engine cannot evaluate {type_name}/{area}/{station} ({e}), using Prophet")
+
+    from inference import get_forecast_df
+    df = get_forecast_df(type_name, area, station, point_forecast=True)
+    # Drop NaN cells (elements whose horizon does not cover that month)
+    return [
+        {col: value for col, value in row.items() if col == "thoi_gian" or value == value}
+        for row in df.to_dict("records")
+    ]
+
+
+def warm_cache_limits() -> Tuple[int, int]:
+    """(max_entries, max_bytes) of the model cache warm_station fills for the engine"""
+    if FORECAST_ENGINE == "numpy":
+        from numpy_forecast import params_cache
+        return params_cache.max_entries, params_cache.max_bytes
+    # inference.model_cache uses the ModelCache defaults
+    from model_cache import MODEL_CACHE_MAX_ENTRIES, MODEL_CACHE_MAX_BYTES
+    return MODEL_CACHE_MAX_ENTRIES, MODEL_CACHE_MAX_BYTES
+
+
+def station_warm_size(type_name: str, area: str, station: str) -> Tuple[int, int]:
+    """(models, bytes) of a station, measured like ModelCache (files on disk)"""
+    from model_cache import ModelCache
+    from model_registry import list_station_models
+    models = list_station_models(type_name, area, station)
+    return len(models), sum(ModelCache.entry_size(model_path, config_path) for _, model_path, config_path in models)
+
+
+def warm_station(type_name: str, area: str, station: str):
+    """
+    Load every element model of a station into this process's caches
+    (parameters for the numpy engine, Prophet models otherwise).
+    """
+    if FORECAST_ENGINE == "numpy":
+        from numpy_forecast import load_station_params
+        load_station_params(type_name, area, station)
+        return
+
+    from inference import model_cache
+    from model_registry import list_station_models
+    for element, model_path, config_path in list_station_models(type_name, area, station):
+        model_cache.get((type_name, area, station, element), model_path, config_path)
+
+
+def model_cache_stats() -> Dict[str, Any]:
+    """Stats of this process's model caches (the Prophet one only if Prophet was loaded)"""
+    import sys
+    from numpy_forecast import get_params_cache_stats
+    stats = {"params_cache": get_params_cache_stats()}
+    if "inference" in sys.modules:
+        stats["prophet_cache"] = sys.modules["inference"].get_model_cache_stats()
+    return stats
+
+
+def build_predictions(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Calculate EAI for each forecast row"""
+    samples = [{col: value for col, value in row.items() if col != "thoi_gian"} for row in rows]
+    predictions = []
+    for row, eai_result in zip(rows, calculate_records_eai(samples)):
+        predictions.append({
+            "date": row["thoi_gian"],
+            "eai": eai_result["eai"],
+            "status": eai_result["status"],
+            "status_label": get_status_label(eai_result["status"]),
+            "sub_indices": eai_result["sub_indices"],
+            "is_prediction": True
+        })
+    return predictions
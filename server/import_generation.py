@@ -0,0 +1,73 @@
+"""
+Import generation: a counter the data scripts bump in the metadata
+collection whenever the samples change (import, EAI backfill, key backfill):
+
+    {"_id": "import", "generation": 7, "updated_at": ..., "source": "import_dataset_to_mongodb"}
+
+Caches put the generation in their keys, so entries computed before an
+import are never served after it. The server re-reads the counter at most
+every IMPORT_GENERATION_POLL seconds (one _id lookup).
+"""
+
+import os
+import time
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from pymongo import ReturnDocument
+
+METADATA_COLLECTION = "metadata"
+IMPORT_DOC_ID = "import"
+
+IMPORT_GENERATION_POLL = float(os.getenv("IMPORT_GENERATION_POLL", "5"))
+
+
+def bump_import_generation(db, source: str, **info: Any) -> int:
+    """Mark the samples as changed (sync pymongo, called by the scripts); returns the new generation"""
+    doc = db[METADATA_COLLECTION].find_one_and_update(
+        {"_id": IMPORT_DOC_ID},
+        {
+            "$inc": {"generation": 1},
+            "$set": {"updated_at": datetime.now(timezone.utc), "source": source, **info},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc["generation"]
+
+
+class ImportGeneration:
+    def __init__(self, poll_seconds: float = IMPORT_GENERATION_POLL):
+        self.poll_seconds = poll_seconds
+        self._generation = 0
+        self._checked_at = None
+        self._lock = asyncio.Lock()
+        self.reads = 0
+        self.changes = 0
+
+    async def current(self, metadata) -> int:
+        """Current generation, re-read from metadata (motor collection) when the poll interval has passed"""
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.poll_seconds:
+            return self._generation
+        async with self._lock:
+            if self._checked_at is None or time.monotonic() - self._checked_at >= self.poll_seconds:
+                doc = await metadata.find_one({"_id": IMPORT_DOC_ID}, {"generation": 1})
+                generation = (doc or {}).get("generation", 0)
+                if self._checked_at is not None and generation != self._generation:
+                    self.changes += 1
+                self._generation = generation
+                self._checked_at = time.monotonic()
+                self.reads += 1
+        return self._generation
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "generation": self._generation,
+            "poll_seconds": self.poll_seconds,
+            "reads": self.reads,
+            "changes": self.changes,
+        }
+
+
+import_generation = ImportGeneration()
@@ -1,9 +1,54 @@
-import os
 import json
 from prophet.serialize import model_from_json
 import pandas as pd
 
-def get_forecast_df(type_indicator, area, station):
+from model_cache import ModelCache
+from model_registry import list_station_models
+
+
+# ===============================
+# CACHE LRU CHO MODEL ĐÃ LOAD
+# ===============================
+def load_prophet_model(model_path, config_path):
+    """Đọc config.json và deserialize prophet_model.json → (model, config)."""
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    with open(model_path, "r", encoding="utf-8") as fin:
+        model = model_from_json(fin.read())
+    return model, config
+
+
+# Key = (type, area, station, element); tự load lại khi file model/config thay đổi
+model_cache = ModelCache(load_prophet_model)
+
+
+def get_model_cache_stats():
+    """Số liệu hit/miss/eviction của cache model (đọc lúc runtime)."""
+    return model_cache.stats()
+
+
+# ===============================
+# DỰ BÁO ĐIỂM (CHỈ YHAT)
+# ===============================
+FORECAST_PERIODS = 12
+
+
+def predict_point(model, future):
+    """
+    Tính yhat giống hệt model.predict nhưng bỏ qua bước lấy mẫu bất định
+    (yhat_lower/yhat_upper) và không dựng các cột thành phần không cần thiết.
+    """
+    df = model.setup_dataframe(future.copy())
+    df["trend"] = model.predict_trend(df)
+    seasonal_components = model.predict_seasonal_components(df)
+    yhat = (
+        df["trend"] * (1 + seasonal_components["multiplicative_terms"])
+        + seasonal_components["additive_terms"]
+    )
+    return pd.DataFrame({"ds": df["ds"], "yhat": yhat})
+
+
+def get_forecast_df(type_indicator, area, station, point_forecast=False):
     """
     Hàm dự báo 12 tháng cho tất cả các chỉ tiêu của một trạm cụ thể.
     
@@ -11,63 +56,32 @@ def get_forecast_df(type_indicator, area, station):
         type_indicator (str): 'Sediment', 'Water_Surface', 'Water_Middle', hoặc 'Water_Bottom'
         area (str): Tên khu vực (tên folder khu vực)
         station (str): Tên trạm (tên folder trạm)
+        point_forecast (bool): True → chỉ tính 12 dòng tương lai và cột yhat,
+            không lấy mẫu bất định (nhanh hơn nhiều, cùng kết quả yhat)
     
     Returns:
         pd.DataFrame: DataFrame chứa dự báo, với cột 'thoi_gian' và các cột chỉ tiêu (giá trị yhat).
     """
-    # Check Docker path first, then fallback to relative path
-    _docker_path = "/app/models"
-    _dev_path = os.path.join(os.path.dirname(__file__), "..", "models")
-    BASE_DIR = _docker_path if os.path.exists(_docker_path) else _dev_path
-    
-    # Xác định thư mục gốc dựa trên type_indicator
-    if type_indicator == 'Sediment':
-        root_folder = 'prophet_models_sediment'
-    elif type_indicator in ['Water_Surface', 'Water_Middle', 'Water_Bottom']:
-        root_folder = f"prophet_models_{type_indicator.lower()}"
-    else:
-        raise ValueError("type_indicator phải là 'Sediment', 'Water_Surface', 'Water_Middle' hoặc 'Water_Bottom'")
-    
-    # Đường dẫn đầy đủ đến folder trạm
-    FOLDER_PATH = os.path.join(BASE_DIR, root_folder, area, station)
-    
-    if not os.path.exists(FOLDER_PATH):
-        raise FileNotFoundError(f"Không tìm thấy folder trạm: {FOLDER_PATH}")
+    models = list_station_models(type_indicator, area, station)
     
     print(f" Đang xử lý: {type_indicator} | Khu vực: {area} | Trạm: {station}")
-    
-    # Tìm tất cả subfolder (các chỉ tiêu)
-    subfolders = [f for f in os.listdir(FOLDER_PATH) if os.path.isdir(os.path.join(FOLDER_PATH, f))]
-    
-    if not subfolders:
-        raise ValueError(f"Không tìm thấy chỉ tiêu nào trong {FOLDER_PATH}")
-    
-    print(f"   → Tìm thấy {len(subfolders)} chỉ tiêu: {', '.join(sorted(subfolders))}")
+    print(f"   → Tìm thấy {len(models)} chỉ tiêu: {', '.join(element for element, _, _ in models)}")
     
     forecast_dfs = []
     
-    for element in sorted(subfolders):
-        model_dir = os.path.join(FOLDER_PATH, element)
-        model_path = os.path.join(model_dir, "prophet_model.json")
-        config_path = os.path.join(model_dir, "config.json")
-        
-        if not (os.path.exists(model_path) and os.path.exists(config_path)):
-            print(f"     Bỏ qua {element.upper()}: Thiếu model hoặc config")
-            continue
-        
-        # Load config
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = json.load(f)
+    for element, model_path, config_path in models:
+        # Load model + config (qua cache LRU)
+        model, config = model_cache.get(
+            (type_indicator, area, station, element), model_path, config_path
+        )
         
         cap_value = config.get("cap_value")
         floor_value = config.get("floor_value", 0.0)
         
-        # Load model
-        with open(model_path, "r", encoding="utf-8") as fin:
-            model = model_from_json(fin.read())
-        
-        # Tạo future dataframe
-        future = model.make_future_dataframe(periods=12, freq="M")
+        # Tạo future dataframe (chế độ điểm: chỉ các tháng tương lai, không kèm lịch sử)
+        future = model.make_future_dataframe(
+            periods=FORECAST_PERIODS, freq="M", include_history=not point_forecast
+        )
         
         if cap_value is not None:
             future["cap"] = cap_value
@@ -76,10 +90,13 @@ def get_forecast_df(type_indicator, area, station):
         else:
             print(f"   → {element.upper():<12} | Linear growth")
         
-        forecast = model.predict(future)
+        if point_forecast:
+            forecast = predict_point(model, future)
+        else:
+            forecast = model.predict(future)
         
         # Lấy 12 tháng tương lai – chỉ giữ yhat
-        future_forecast = forecast.tail(12)[["ds", "yhat"]].copy()
+        future_forecast = forecast.tail(FORECAST_PERIODS)[["ds", "yhat"]].copy()
         future_forecast["element"] = element.lower()  # hoặc .upper() tùy sở thích
         forecast_dfs.append(future_forecast)
     
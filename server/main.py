@@ -1,31 +1,83 @@
 from fastapi import FastAPI, Query, HTTPException, File, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from contextlib import asynccontextmanager
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
 from pydantic import BaseModel
-import io
-import csv
+import asyncio
+import os
+import json
 
-from database import Database, get_samples_collection
+from database import Database, get_samples_collection, get_rollups_collection, get_metadata_collection
 from models import (
     SamplesListResponse,
     RegionsResponse,
     StationsResponse,
+    RegionStationsResponse,
     StatisticsResponse,
     HealthResponse,
     EAIResponse,
+    EAISummaryResponse,
     SampleType,
-    WaterLayer
+    WaterLayer,
+    EAIStatus,
+    EAISort,
+    EAIMode,
+    MatchMode,
+    PageMode,
+    CountMode,
+    SamplesMode,
+    RollupGranularity,
+    RollupDimension,
+    EAIRollupResponse
+)
+from eai_calculator import (
+    calculate_sample_eai, calculate_records_eai, calculate_csv_eai, get_status_label, EAI_PROFILE_VERSION,
+    CSV_RESULT_HEADER, CsvChunkReader, score_csv_rows, format_eai_rows, batch_results, csv_result_item
 )
-from eai_calculator import calculate_sample_eai, get_status_label
+from parallel_eai import CsvColumns, read_column_chunk, chunk_bounds, SharedColumns, score_chunk
+from eai_pipeline import (
+    eai_pipeline_stages, pipeline_result, eai_summary_pipeline, summary_result,
+    SUMMARY_PERCENTILES, PERCENTILE_OPERATOR_VERSION, percentile_rank, sorted_scores_pipeline
+)
+from eai_rollups import GRANULARITIES, rollup_series_pipeline, series_point
+from query_filters import add_name_filters
+from pagination import DATE_FIELD, InvalidCursorError, keyset_sort, with_keyset, next_cursor
+from cache import TTLCache, filter_key
+from import_generation import import_generation
+from statistics_pipeline import statistics_pipeline, statistics_result
+from metadata_cache import metadata_cache
+from projection import COMPACT_DEFAULT_FIELDS, parse_fields, projection_spec, compact_columns
+from fast_read import find_raw, aggregate_raw, read_documents, decode_batch
+from fast_json import page_response
+from forecasting import FORECAST_ENGINE, model_cache_stats
+from model_cache import ModelCache
+from forecast_store import lookup_station, refresh_station, lookup_stations, refresh_stations
+from model_registry import registry, list_stations
+from model_pack import pack_health
+from executors import executor, ExecutorBusyError, ExecutorTimeoutError
+from warmup import warmup, access_log
+from singleflight import SingleFlight
+from numpy_forecast import FORECAST_PERIODS
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Manage application lifecycle - connect/disconnect from MongoDB"""
+    """Manage application lifecycle - connect/disconnect from MongoDB, scan the model registry, verify the model pack, start/stop worker pools, warm up models"""
     await Database.connect()
+    await registry.start()
+    await pack_health.start()
+    warmup.plan()
+    executor.start(*warmup.worker_initializer())
+    warmup.start(executor.spawn_cpu_workers, executor.run_cpu_workers)
+    access_log.start()
     yield
+    await access_log.stop()
+    await warmup.stop()
+    executor.shutdown()
+    await pack_health.stop()
+    await registry.stop()
     await Database.disconnect()
 
 
@@ -46,27 +98,57 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(ExecutorBusyError)
+async def executor_busy_handler(request, exc: ExecutorBusyError):
+    return JSONResponse(status_code=503, content={"detail": f"Server busy: {exc}"})
+
+
+@app.exception_handler(ExecutorTimeoutError)
+async def executor_timeout_handler(request, exc: ExecutorTimeoutError):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
 # ==============================
 # HEALTH CHECK
 # ==============================
 @app.get("/", response_model=HealthResponse, tags=["Health"])
 async def health_check():
-    """Check API and database health"""
+    """Check API and database health, and whether the model pack matched the model files at its last verify"""
+    model_pack = pack_health.status
     try:
         await Database.client.admin.command('ping')
         return HealthResponse(
             status="healthy",
             database="connected",
-            message="Marine Environment API is running"
+            message="Marine Environment API is running",
+            model_pack=model_pack
         )
     except Exception as e:
         return HealthResponse(
             status="unhealthy",
             database="disconnected",
-            message=str(e)
+            message=str(e),
+            model_pack=model_pack
         )
 
 
+@app.get("/executor/stats", tags=["Health"])
+async def get_executor_stats():
+    """Queue depth and counters of the CPU / I/O worker pools"""
+    return executor.stats()
+
+
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """
+    Readiness probe: 503 until the model warmup has finished, with its progress.
+    A failed warmup answers 200 with status "failed" (ready: false, serving:
+    true): models that were not warmed load lazily on their first forecast.
+    """
+    stats = warmup.stats()
+    return JSONResponse(status_code=200 if stats["serving"] else 503, content=stats)
+
+
 # ==============================
 # SAMPLES ENDPOINTS
 # ==============================
@@ -76,23 +158,45 @@ async def get_samples(
     water_layer: Optional[WaterLayer] = Query(None, description="Filter by water layer"),
     region: Optional[str] = Query(None, description="Filter by region name"),
     station: Optional[str] = Query(None, description="Filter by station ID"),
+    match: MatchMode = Query(MatchMode.EXACT, description="Region / station matching: exact | prefix | contains"),
     start_date: Optional[str] = Query(None, description="Filter by start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="Filter by end date (YYYY-MM-DD)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of results to return"),
-    skip: int = Query(0, ge=0, description="Number of results to skip")
+    skip: int = Query(0, ge=0, description="Number of results to skip"),
+    paginate: PageMode = Query(PageMode.OFFSET, description="'offset': skip/limit | 'cursor': keyset pages, follow next_cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (implies paginate=cursor)"),
+    count_mode: CountMode = Query(CountMode.CACHED, description="Total: exact | cached | estimated (unfiltered only) | none"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. station,data.thoi_gian,data.ph"),
+    mode: SamplesMode = Query(SamplesMode.RECORDS, description="'records': list of documents | 'compact': column arrays")
 ):
-    """Query samples with optional filters and pagination."""
+    """
+    Query samples with optional filters and pagination.
+    
+    fields limits the returned fields (projected in MongoDB). mode=compact
+    returns columns ({field: [values]}) instead of a list of documents;
+    a whole "data" field becomes one column per parameter.
+    
+    paginate=cursor pages through the samples by date (then _id) without
+    skip: pass the next_cursor of each response to get the next page
+    (null on the last page). Deep pages cost the same as the first one.
+    
+    count_mode sets how total is computed (see _count_total); has_more
+    tells whether another page follows, whatever the count mode.
+    """
     collection = get_samples_collection()
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if mode == SamplesMode.COMPACT and selected is None:
+        selected = COMPACT_DEFAULT_FIELDS
     
     query = {}
     if sample_type:
         query["sample_type"] = sample_type.value
     if water_layer:
         query["water_layer"] = water_layer.value
-    if region:
-        query["region"] = {"$regex": region, "$options": "i"}
-    if station:
-        query["station"] = {"$regex": station, "$options": "i"}
+    add_name_filters(query, region, station, match.value)
     
     if start_date or end_date:
         date_filter = {}
@@ -103,14 +207,82 @@ async def get_samples(
         if date_filter:
             query["data.thoi_gian"] = date_filter
     
-    total = await collection.count_documents(query)
-    cursor = collection.find(query).skip(skip).limit(limit)
-    samples = []
-    async for doc in cursor:
-        doc["_id"] = str(doc["_id"])
-        samples.append(doc)
+    total = await _count_total(collection, query, count_mode)
+    page_cursor = None
+    keyset = paginate == PageMode.CURSOR or bool(cursor)
+    if keyset:
+        sort = keyset_sort()
+        # The sort key is needed for next_cursor even if not requested
+        projection = projection_spec(selected, keep=[DATE_FIELD])
+        found = find_raw(collection, _keyset_query(query, sort, cursor, skip), projection, sort=sort, limit=limit + 1)
+    else:
+        found = find_raw(collection, query, projection_spec(selected), skip=skip, limit=limit + 1)
+    # One extra document tells whether there is a next page; _id is decoded as str
+    docs = await read_documents(found, limit + 1)
+    has_more = len(docs) > limit
+    if keyset:
+        docs, page_cursor = _keyset_page(docs, limit, sort)
+    docs = docs[:limit]
+    
+    if mode == SamplesMode.COMPACT:
+        return page_response(
+            SamplesListResponse,
+            total=total, limit=limit, skip=skip, data=[], columns=compact_columns(docs, selected),
+            has_more=has_more, next_cursor=page_cursor
+        )
+    
+    return page_response(
+        SamplesListResponse,
+        total=total, limit=limit, skip=skip, data=docs, has_more=has_more, next_cursor=page_cursor
+    )
+
+
+# Totals per (import generation, filter): a new import never serves old counts
+count_cache = TTLCache(ttl=float(os.getenv("COUNT_CACHE_TTL", "300")), max_entries=4096)
+
+
+async def _count_total(collection, query: Dict[str, Any], count_mode: CountMode) -> Optional[int]:
+    """
+    Total number of documents matching query:
+    - exact: count_documents on every request
+    - cached: count_documents, cached per filter for COUNT_CACHE_TTL seconds
+      and until the next import
+    - estimated: collection metadata count (estimated_document_count) when
+      there is no filter, otherwise the cached count
+    - none: not computed (None); use has_more / next_cursor
+    """
+    if count_mode == CountMode.NONE:
+        return None
+    if count_mode == CountMode.ESTIMATED and not query:
+        return await collection.estimated_document_count()
+    if count_mode == CountMode.EXACT:
+        return await collection.count_documents(query)
     
-    return SamplesListResponse(total=total, limit=limit, skip=skip, data=samples)
+    generation = await import_generation.current(get_metadata_collection())
+    key = filter_key(collection.name, generation, query)
+    total = count_cache.get(key)
+    if total is None:
+        total = await collection.count_documents(query)
+        count_cache.set(key, total)
+    return total
+
+
+def _keyset_query(query: Dict[str, Any], sort: List, cursor: Optional[str], skip: int) -> Dict[str, Any]:
+    """query restricted to the page after cursor (400 on a bad token)"""
+    if skip:
+        raise HTTPException(status_code=400, detail="skip cannot be combined with cursor pagination")
+    try:
+        return with_keyset(query, sort, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _keyset_page(docs: List[Dict[str, Any]], limit: int, sort: List, key_path: str = None):
+    """(page, next_cursor) from limit + 1 documents; next_cursor is None on the last page"""
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, next_cursor(docs, sort, key_path)
 
 
 @app.get("/samples/{sample_id}", tags=["Samples"])
@@ -119,7 +291,7 @@ async def get_sample_by_id(sample_id: str):
     collection = get_samples_collection()
     
     try:
-        doc = await collection.find_one({"_id": ObjectId(sample_id)})
+        doc = await collection.find_one({"_id": ObjectId(sample_id)}, projection_spec(None))
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid sample ID format")
     
@@ -133,16 +305,89 @@ async def get_sample_by_id(sample_id: str):
 # ==============================
 # EAI ENDPOINT
 # ==============================
+def _sample_eai_results(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    EAI result (calculate_sample_eai format) of each document: the stored
+    score when it was computed with the current scoring profile, otherwise
+    recalculated (all stale documents of the page in one batch).
+    """
+    results = [None] * len(docs)
+    stale = []
+    for i, doc in enumerate(docs):
+        stored = doc.get("eai")
+        if isinstance(stored, dict) and stored.get("version") == EAI_PROFILE_VERSION:
+            results[i] = {"eai": stored["score"], "status": stored["status"], "sub_indices": stored["sub_indices"]}
+        else:
+            stale.append(i)
+    if stale:
+        recalculated = calculate_records_eai([docs[i].get("data", {}) for i in stale])
+        for i, eai_result in zip(stale, recalculated):
+            results[i] = eai_result
+    return results
+
+
+# Sample fields read by /eai in stored mode (source_file and the lookup keys are skipped)
+EAI_SAMPLE_PROJECTION = {field: 1 for field in ["data", "eai", "station", "region", "sample_type", "water_layer"]}
+
+
+def _build_eai_query(
+    sample_type: Optional[SampleType],
+    water_layer: Optional[WaterLayer],
+    region: Optional[str],
+    station: Optional[str],
+    match: MatchMode,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    status: Optional[EAIStatus],
+    min_eai: Optional[float],
+    max_eai: Optional[float]
+) -> Dict[str, Any]:
+    """MongoDB filter shared by /eai and /eai/summary"""
+    query = {}
+    if sample_type:
+        query["sample_type"] = sample_type.value
+    if water_layer:
+        query["water_layer"] = water_layer.value
+    add_name_filters(query, region, station, match.value)
+    if start_date or end_date:
+        date_filter = {}
+        if start_date:
+            date_filter["$gte"] = start_date
+        if end_date:
+            date_filter["$lte"] = end_date
+        if date_filter:
+            query["data.thoi_gian"] = date_filter
+    if status:
+        query["eai.status"] = status.value
+    if min_eai is not None or max_eai is not None:
+        score_filter = {}
+        if min_eai is not None:
+            score_filter["$gte"] = min_eai
+        if max_eai is not None:
+            score_filter["$lte"] = max_eai
+        query["eai.score"] = score_filter
+    return query
+
+
 @app.get("/eai", response_model=EAIResponse, tags=["EAI"])
 async def get_eai_scores(
     sample_type: Optional[SampleType] = Query(None, description="Filter by sample type"),
     water_layer: Optional[WaterLayer] = Query(None, description="Filter by water layer"),
     region: Optional[str] = Query(None, description="Filter by region name"),
     station: Optional[str] = Query(None, description="Filter by station ID"),
+    match: MatchMode = Query(MatchMode.EXACT, description="Region / station matching: exact | prefix | contains"),
     start_date: Optional[str] = Query(None, description="Filter by start date"),
     end_date: Optional[str] = Query(None, description="Filter by end date"),
+    status: Optional[EAIStatus] = Query(None, description="Filter by stored EAI status"),
+    min_eai: Optional[float] = Query(None, description="Minimum stored EAI score"),
+    max_eai: Optional[float] = Query(None, description="Maximum stored EAI score"),
+    sort: Optional[EAISort] = Query(None, description="Sort by stored EAI ('eai' ascending, '-eai' descending)"),
+    mode: EAIMode = Query(EAIMode.STORED, description="'stored': stored scores | 'pipeline': computed in MongoDB"),
     limit: int = Query(500, ge=1, le=5000, description="Number of results"),
-    skip: int = Query(0, ge=0, description="Number of results to skip")
+    skip: int = Query(0, ge=0, description="Number of results to skip"),
+    paginate: PageMode = Query(PageMode.OFFSET, description="'offset': skip/limit | 'cursor': keyset pages, follow next_cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (implies paginate=cursor)"),
+    count_mode: CountMode = Query(CountMode.CACHED, description="Total: exact | cached | estimated (unfiltered only) | none")
 ):
     """
     Calculate EAI (Environmental Alert Index) for samples.
@@ -151,42 +396,67 @@ async def get_eai_scores(
     - EAI 80-100: Good (Tốt) - Safe environment
     - EAI 50-79: Warning (Cảnh cáo) - Needs monitoring
     - EAI <50: Bad (Xấu) - Urgent alert
+    
+    Scores are stored on the documents at import (scripts/backfill_eai.py
+    recomputes them after a threshold/weight change); status, min_eai,
+    max_eai and sort use the stored scores. With mode=pipeline the scores
+    are computed by an aggregation pipeline that only returns the EAI fields.
+    
+    paginate=cursor pages by the sort (date by default, or the stored EAI)
+    then _id: pass next_cursor back to get the next page. count_mode: see
+    /samples.
     """
     collection = get_samples_collection()
+    query = _build_eai_query(
+        sample_type, water_layer, region, station, match, start_date, end_date, status, min_eai, max_eai
+    )
     
-    query = {}
-    if sample_type:
-        query["sample_type"] = sample_type.value
-    if water_layer:
-        query["water_layer"] = water_layer.value
-    if region:
-        query["region"] = {"$regex": region, "$options": "i"}
-    if station:
-        query["station"] = {"$regex": station, "$options": "i"}
-    if start_date or end_date:
-        date_filter = {}
-        if start_date:
-            date_filter["$gte"] = start_date
-        if end_date:
-            date_filter["$lte"] = end_date
-        if date_filter:
-            query["data.thoi_gian"] = date_filter
+    total = await _count_total(collection, query, count_mode)
+    sort_spec = keyset_sort("eai.score", -1 if sort == EAISort.EAI_DESC else 1) if sort else None
+    keyset = paginate == PageMode.CURSOR or bool(cursor)
+    page_cursor = None
+    if keyset:
+        sort_spec = sort_spec or keyset_sort()
+        query = _keyset_query(query, sort_spec, cursor, skip)
+    # One extra document tells whether there is a next page
+    fetch = limit + 1
     
-    total = await collection.count_documents(query)
-    cursor = collection.find(query).skip(skip).limit(limit)
+    if mode == EAIMode.PIPELINE:
+        stages = [{"$match": query}]
+        if sort_spec:
+            stages.append({"$sort": dict(sort_spec)})
+        if skip:
+            stages.append({"$skip": skip})
+        # The pipeline output renames data.thoi_gian to date; other sort keys are kept
+        sort_field = sort_spec[0][0] if sort_spec else None
+        extra_fields = [sort_field] if keyset and sort_field != DATE_FIELD else []
+        stages += [{"$limit": fetch}] + eai_pipeline_stages(extra_fields=extra_fields)
+        docs = await read_documents(aggregate_raw(collection, stages, fetch), fetch)
+        has_more = len(docs) > limit
+        if keyset:
+            docs, page_cursor = _keyset_page(docs, limit, sort_spec, "date" if sort_field == DATE_FIELD else None)
+        docs = docs[:limit]
+        dates = [doc.get("date") for doc in docs]
+        eai_results = [pipeline_result(doc) for doc in docs]
+    else:
+        found = find_raw(collection, query, EAI_SAMPLE_PROJECTION, sort=sort_spec, skip=skip, limit=fetch)
+        docs = await read_documents(found, fetch)
+        has_more = len(docs) > limit
+        if keyset:
+            docs, page_cursor = _keyset_page(docs, limit, sort_spec)
+        docs = docs[:limit]
+        dates = [doc.get("data", {}).get("thoi_gian") for doc in docs]
+        eai_results = _sample_eai_results(docs)
     
     eai_scores = []
     status_count = {"good": 0, "warning": 0, "bad": 0, "unknown": 0}
     total_eai = 0
     valid_eai_count = 0
     
-    async for doc in cursor:
-        data = doc.get("data", {})
-        eai_result = calculate_sample_eai(data)
-        
+    for doc, date, eai_result in zip(docs, dates, eai_results):
         score_item = {
-            "id": str(doc["_id"]),
-            "date": data.get("thoi_gian"),
+            "id": doc["_id"],
+            "date": date,
             "station": doc.get("station"),
             "region": doc.get("region"),
             "sample_type": doc.get("sample_type"),
@@ -206,14 +476,121 @@ async def get_eai_scores(
     
     avg_eai = round(total_eai / valid_eai_count, 2) if valid_eai_count > 0 else None
     
-    return EAIResponse(
+    return page_response(
+        EAIResponse,
         total=total,
         limit=limit,
         skip=skip,
         average_eai=avg_eai,
         status_distribution=status_count,
-        eai_scores=eai_scores
+        eai_scores=eai_scores,
+        has_more=has_more,
+        next_cursor=page_cursor
+    )
+
+
+# Summaries per filter, short-lived so new imports show up quickly
+eai_summary_cache = TTLCache(ttl=float(os.getenv("EAI_SUMMARY_TTL", "30")))
+
+
+@app.get("/eai/summary", response_model=EAISummaryResponse, tags=["EAI"])
+async def get_eai_summary(
+    sample_type: Optional[SampleType] = Query(None, description="Filter by sample type"),
+    water_layer: Optional[WaterLayer] = Query(None, description="Filter by water layer"),
+    region: Optional[str] = Query(None, description="Filter by region name"),
+    station: Optional[str] = Query(None, description="Filter by station ID"),
+    match: MatchMode = Query(MatchMode.EXACT, description="Region / station matching: exact | prefix | contains"),
+    start_date: Optional[str] = Query(None, description="Filter by start date"),
+    end_date: Optional[str] = Query(None, description="Filter by end date"),
+    status: Optional[EAIStatus] = Query(None, description="Filter by stored EAI status"),
+    min_eai: Optional[float] = Query(None, description="Minimum stored EAI score"),
+    max_eai: Optional[float] = Query(None, description="Maximum stored EAI score")
+):
+    """
+    EAI statistics over every sample matching the filters (not just one
+    page): count, mean, min/max, percentiles and status distribution of the
+    stored scores, computed in a single $facet aggregation. Cached per
+    filter for EAI_SUMMARY_TTL seconds.
+    """
+    query = _build_eai_query(
+        sample_type, water_layer, region, station, match, start_date, end_date, status, min_eai, max_eai
     )
+    key = filter_key(await import_generation.current(get_metadata_collection()), query)
+    summary = eai_summary_cache.get(key)
+    if summary is not None:
+        return {**summary, "cached": True}
+
+    collection = get_samples_collection()
+    server_percentiles = await Database.server_version() >= PERCENTILE_OPERATOR_VERSION
+    facets = await collection.aggregate(
+        eai_summary_pipeline(query, server_percentiles=server_percentiles), allowDiskUse=True
+    ).to_list(length=1)
+    facet = facets[0] if facets else {}
+    values = None
+    if not server_percentiles:
+        scored = facet["overall"][0]["scored"] if facet.get("overall") else 0
+        values = await _nearest_rank_percentiles(collection, query, scored)
+    summary = summary_result(facet, values=values)
+    eai_summary_cache.set(key, summary)
+    return summary
+
+
+async def _nearest_rank_percentiles(collection, query: Dict[str, Any], scored: int) -> Dict[str, Optional[float]]:
+    """SUMMARY_PERCENTILES of the stored scores from one sorted cursor (servers without $percentile)"""
+    if not scored:
+        return {}
+    ranks = {f"p{p}": percentile_rank(p, scored) for p in SUMMARY_PERCENTILES}
+    limit = max(ranks.values()) + 1
+    values = {}
+    position = 0
+    cursor = aggregate_raw(collection, sorted_scores_pipeline(query, limit), limit, allowDiskUse=True)
+    async for batch in cursor:
+        docs = decode_batch(batch)
+        for key, rank in ranks.items():
+            if position <= rank < position + len(docs):
+                values[key] = docs[rank - position]["score"]
+        position += len(docs)
+    return values
+
+
+@app.get("/eai/rollups", response_model=EAIRollupResponse, tags=["EAI"])
+async def get_eai_rollups(
+    granularity: RollupGranularity = Query(RollupGranularity.MONTH, description="Bucket size"),
+    group_by: List[RollupDimension] = Query([], description="Split each period by these fields"),
+    sample_type: Optional[SampleType] = Query(None, description="Filter by sample type"),
+    water_layer: Optional[WaterLayer] = Query(None, description="Filter by water layer"),
+    region: Optional[str] = Query(None, description="Filter by region name"),
+    station: Optional[str] = Query(None, description="Filter by station ID"),
+    match: MatchMode = Query(MatchMode.EXACT, description="Region / station matching: exact | prefix | contains"),
+    start_date: Optional[str] = Query(None, description="First period (date, truncated to the granularity)"),
+    end_date: Optional[str] = Query(None, description="Last period (date, truncated to the granularity)")
+):
+    """
+    Time series of EAI averages, min/max and status counts from the
+    pre-aggregated rollups maintained by the importer (no raw sample scan).
+    Periods are whole months / years: a date filter includes every bucket
+    it touches.
+    """
+    query = {"granularity": granularity.value}
+    if sample_type:
+        query["sample_type"] = sample_type.value
+    if water_layer:
+        query["water_layer"] = water_layer.value
+    add_name_filters(query, region, station, match.value)
+    if start_date or end_date:
+        length = GRANULARITIES[granularity.value]
+        period_filter = {}
+        if start_date:
+            period_filter["$gte"] = start_date[:length]
+        if end_date:
+            period_filter["$lte"] = end_date[:length]
+        query["period"] = period_filter
+    
+    dimensions = list(dict.fromkeys(d.value for d in group_by))
+    collection = get_rollups_collection()
+    docs = await collection.aggregate(rollup_series_pipeline(query, dimensions)).to_list(length=None)
+    series = [series_point(doc) for doc in docs]
+    return {"granularity": granularity.value, "group_by": dimensions, "count": len(series), "series": series}
 
 
 # ==============================
@@ -242,56 +619,196 @@ async def calculate_eai_manual(request: CalculateEAIRequest):
     }
 
 
+CSV_OUTPUT_FORMATS = {"json": "application/json", "ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def _stream_csv_eai(file: UploadFile, output_format: str, sample_type: str):
+    """Read the upload chunk by chunk (I/O pool), score each chunk (CPU pool) and yield NDJSON / CSV lines"""
+    # The upload is spooled to a temporary file: read it as a text stream
+    reader = CsvChunkReader(file.file)
+    summary = {"good": 0, "warning": 0, "bad": 0, "unknown": 0}
+    total = 0
+    
+    if output_format == "csv":
+        yield ",".join(CSV_RESULT_HEADER) + "\n"
+    try:
+        while True:
+            rows = await executor.run_io(reader.read)
+            if not rows:
+                break
+            chunk = await executor.run_cpu(score_csv_rows, rows)
+            for eai_result in chunk:
+                summary[eai_result["status"]] += 1
+            yield format_eai_rows(chunk, total + 1, output_format)
+            total += len(chunk)
+    except Exception as e:
+        # Headers are already sent: report the error in the stream itself
+        message = f"Error processing CSV at row {total + 1}: {e}"
+        yield _csv_error_line(output_format, message)
+    finally:
+        # Blocks until a read still running in the I/O pool (after a timeout) returns
+        reader.detach()
+    
+    yield _csv_summary_line(output_format, sample_type, total, summary)
+
+
+def _csv_error_line(output_format: str, message: str) -> str:
+    return f"# error: {message}\n" if output_format == "csv" else json.dumps({"error": message}) + "\n"
+
+
+def _csv_summary_line(output_format: str, sample_type: str, total: int, summary: Dict[str, int]) -> str:
+    if output_format == "csv":
+        counts = " ".join(f"{status}={count}" for status, count in summary.items())
+        return f"# summary: sample_type={sample_type} total={total} {counts}\n"
+    return json.dumps({"sample_type": sample_type, "total": total, "summary": summary}) + "\n"
+
+
+async def _read_csv_columns(file: UploadFile, columns: CsvColumns):
+    """Parse the upload into columns chunk by chunk (I/O pool)"""
+    reader = CsvChunkReader(file.file, dict_rows=False)
+    try:
+        while await executor.run_io(read_column_chunk, reader, columns):
+            pass
+    finally:
+        # Blocks until a read still running in the I/O pool (after a timeout) returns
+        reader.detach()
+
+
+def _score_chunks(shared: SharedColumns, output_format: str) -> List[asyncio.Future]:
+    """One scoring task per CPU worker, each on a contiguous row range"""
+    return [
+        asyncio.ensure_future(executor.run_cpu(score_chunk, shared.spec(), start, end, output_format))
+        for start, end in chunk_bounds(shared.n_rows, max(1, executor.cpu_workers))
+    ]
+
+
+async def _stream_parallel_csv_eai(file: UploadFile, output_format: str, sample_type: str):
+    """Parse the upload, then yield the chunks scored by the CPU pool in row order"""
+    columns = CsvColumns()
+    error = None
+    
+    if output_format == "csv":
+        yield ",".join(CSV_RESULT_HEADER) + "\n"
+    try:
+        await _read_csv_columns(file, columns)
+    except Exception as e:
+        # Same as the serial stream: the rows parsed before the error are still scored
+        error = f"Error processing CSV at row {columns.n_rows + 1}: {e}"
+    
+    shared = SharedColumns(*columns.freeze())
+    tasks = _score_chunks(shared, output_format)
+    total = 0
+    try:
+        try:
+            # Chunks are scored concurrently but sent in their original order
+            for task in tasks:
+                yield await task
+            total = shared.n_rows
+        except Exception as e:
+            error = f"Error processing CSV: {e}"
+        summary = shared.status_summary(total)
+    finally:
+        for task in tasks:
+            task.cancel()
+        shared.close()
+    
+    if error:
+        yield _csv_error_line(output_format, error)
+    yield _csv_summary_line(output_format, sample_type, total, summary)
+
+
 @app.post("/calculate-eai-csv", tags=["Calculator"])
 async def calculate_eai_from_csv(
     file: UploadFile = File(...),
-    sample_type: str = Form(...)
+    sample_type: str = Form(...),
+    output_format: str = Form("json", description="json | ndjson | csv"),
+    parallel: bool = Form(False, description="Score row chunks across the CPU pool (large files)")
 ):
-    """Calculate EAI for multiple records from a CSV file."""
+    """
+    Calculate EAI for multiple records from a CSV file.
+    
+    - json: all results in one response
+    - ndjson / csv: the upload is read and scored in chunks and each chunk
+      is streamed back as soon as it is ready (memory does not grow with the
+      file size); the last line holds the status summary
+    - parallel: the whole file is parsed (in chunks) into shared-memory
+      columns and split into one row range per CPU worker; results keep the
+      row order. Parse errors are reported like the serial path: a 400 for
+      json, in the stream for ndjson / csv
+    """
+    if output_format not in CSV_OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"output_format must be one of {', '.join(CSV_OUTPUT_FORMATS)}")
+    if parallel:
+        return await _calculate_parallel_csv_eai(file, output_format, sample_type)
+    if output_format != "json":
+        return StreamingResponse(
+            _stream_csv_eai(file, output_format, sample_type), media_type=CSV_OUTPUT_FORMATS[output_format]
+        )
+    
     try:
         contents = await file.read()
-        decoded = contents.decode('utf-8')
-        reader = csv.DictReader(io.StringIO(decoded))
-        
-        results = []
-        status_summary = {"good": 0, "warning": 0, "bad": 0, "unknown": 0}
-        
-        for row in reader:
-            data = {}
-            for key, value in row.items():
-                try:
-                    data[key.strip().lower()] = float(value) if value else None
-                except (ValueError, TypeError):
-                    data[key.strip().lower()] = value
-            
-            eai_result = calculate_sample_eai(data)
-            results.append({
-                "eai": eai_result["eai"],
-                "status": eai_result["status"],
-                "status_label": get_status_label(eai_result["status"]),
-                "sub_indices": eai_result["sub_indices"]
-            })
-            status_summary[eai_result["status"]] += 1
+        # Decoding and row-by-row scoring run in the CPU pool
+        result = await executor.run_cpu(calculate_csv_eai, contents)
         
         return {
             "sample_type": sample_type,
-            "total": len(results),
-            "results": results,
-            "summary": status_summary
+            "total": result["total"],
+            "results": result["results"],
+            "summary": result["summary"]
         }
+    except (ExecutorBusyError, ExecutorTimeoutError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error processing CSV: {str(e)}")
+
+
+async def _calculate_parallel_csv_eai(file: UploadFile, output_format: str, sample_type: str):
+    if output_format != "json":
+        # Parse errors are reported in the stream, like the serial ndjson / csv path
+        return StreamingResponse(
+            _stream_parallel_csv_eai(file, output_format, sample_type), media_type=CSV_OUTPUT_FORMATS[output_format]
+        )
+    
+    columns = CsvColumns()
+    try:
+        await _read_csv_columns(file, columns)
+    except (ExecutorBusyError, ExecutorTimeoutError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing CSV: {str(e)}")
+    
+    shared = SharedColumns(*columns.freeze())
+    tasks = _score_chunks(shared, output_format)
+    try:
+        await asyncio.gather(*tasks)
+        results = [csv_result_item(r) for r in batch_results(shared.batch())]
+        summary = shared.status_summary()
+    finally:
+        for task in tasks:
+            task.cancel()
+        shared.close()
+    
+    return {
+        "sample_type": sample_type,
+        "total": len(results),
+        "results": results,
+        "summary": summary
+    }
 
 
 # ==============================
 # REGIONS ENDPOINT
 # ==============================
+async def _metadata():
+    """Region / station metadata, reloaded when the import generation changes"""
+    await metadata_cache.refresh(get_samples_collection(), get_metadata_collection())
+    return metadata_cache
+
+
 @app.get("/regions", response_model=RegionsResponse, tags=["Metadata"])
 async def get_regions():
     """Get all unique regions in the dataset"""
-    collection = get_samples_collection()
-    regions = await collection.distinct("region")
-    regions = sorted([r for r in regions if r])
+    regions = (await _metadata()).regions()
     return RegionsResponse(regions=regions, count=len(regions))
 
 
@@ -300,85 +817,68 @@ async def get_regions():
 # ==============================
 @app.get("/stations", response_model=StationsResponse, tags=["Metadata"])
 async def get_stations(
-    region: Optional[str] = Query(None, description="Filter stations by region")
+    region: Optional[str] = Query(None, description="Filter stations by region"),
+    match: MatchMode = Query(MatchMode.EXACT, description="Region matching: exact | prefix | contains")
 ):
     """Get all unique stations, optionally filtered by region"""
-    collection = get_samples_collection()
-    
-    query = {}
-    if region:
-        query["region"] = {"$regex": region, "$options": "i"}
-    
-    pipeline = [
-        {"$match": query} if query else {"$match": {}},
-        {"$group": {"_id": "$station"}},
-        {"$sort": {"_id": 1}}
-    ]
-    
-    cursor = collection.aggregate(pipeline)
-    stations = [doc["_id"] async for doc in cursor if doc["_id"]]
+    stations = (await _metadata()).stations(region, match.value)
     return StationsResponse(stations=stations, count=len(stations))
 
 
+@app.get("/regions/stations", response_model=RegionStationsResponse, tags=["Metadata"])
+async def get_region_stations():
+    """Get the stations of every region"""
+    region_stations = (await _metadata()).region_stations()
+    return RegionStationsResponse(region_stations=region_stations, count=len(region_stations))
+
+
+@app.get("/cache-stats", tags=["Metadata"])
+async def get_cache_stats():
+    """Get the import generation and the hit/miss counters of the query caches"""
+    return {
+        "import_generation": import_generation.stats(),
+        "metadata": metadata_cache.stats(),
+        "counts": count_cache.stats(),
+        "statistics": statistics_cache.stats(),
+        "eai_summary": eai_summary_cache.stats(),
+    }
+
+
 # ==============================
 # STATISTICS ENDPOINT
 # ==============================
+# Statistics per filter; the import generation in the key drops them after an import
+statistics_cache = TTLCache(ttl=float(os.getenv("STATISTICS_CACHE_TTL", "300")))
+
+
 @app.get("/statistics", response_model=StatisticsResponse, tags=["Analytics"])
 async def get_statistics(
     region: Optional[str] = Query(None, description="Filter by region"),
-    station: Optional[str] = Query(None, description="Filter by station")
+    station: Optional[str] = Query(None, description="Filter by station"),
+    match: MatchMode = Query(MatchMode.EXACT, description="Region / station matching: exact | prefix | contains")
 ):
-    """Get aggregated statistics for the dataset"""
-    collection = get_samples_collection()
-    
-    query = {}
-    if region:
-        query["region"] = {"$regex": region, "$options": "i"}
-    if station:
-        query["station"] = {"$regex": station, "$options": "i"}
-    
-    total = await collection.count_documents(query)
+    """
+    Get aggregated statistics for the dataset: total, counts per sample
+    type / water layer / region and the date range, in one $facet
+    aggregation. Cached per filter for STATISTICS_CACHE_TTL seconds and
+    until the next import.
+    """
+    query = add_name_filters({}, region, station, match.value)
+    key = filter_key(await import_generation.current(get_metadata_collection()), query)
+    statistics = statistics_cache.get(key)
+    if statistics is not None:
+        return StatisticsResponse(**statistics, cached=True)
     
-    sample_type_pipeline = [
-        {"$match": query} if query else {"$match": {}},
-        {"$group": {"_id": "$sample_type", "count": {"$sum": 1}}}
-    ]
-    sample_types = {}
-    async for doc in collection.aggregate(sample_type_pipeline):
-        if doc["_id"]:
-            sample_types[doc["_id"]] = doc["count"]
-    
-    water_layer_pipeline = [
-        {"$match": query} if query else {"$match": {}},
-        {"$group": {"_id": "$water_layer", "count": {"$sum": 1}}}
-    ]
-    water_layers = {}
-    async for doc in collection.aggregate(water_layer_pipeline):
-        if doc["_id"]:
-            water_layers[doc["_id"]] = doc["count"]
-    
-    region_pipeline = [
-        {"$match": query} if query else {"$match": {}},
-        {"$group": {"_id": "$region", "count": {"$sum": 1}}}
-    ]
-    regions = {}
-    async for doc in collection.aggregate(region_pipeline):
-        if doc["_id"]:
-            regions[doc["_id"]] = doc["count"]
-    
-    return StatisticsResponse(
-        total_samples=total,
-        sample_types=sample_types,
-        water_layers=water_layers,
-        regions=regions
-    )
+    collection = get_samples_collection()
+    facets = await collection.aggregate(statistics_pipeline(query), allowDiskUse=True).to_list(length=1)
+    statistics = statistics_result(facets[0] if facets else {})
+    statistics_cache.set(key, statistics)
+    return StatisticsResponse(**statistics)
 
 
 # ==============================
 # PREDICTION ENDPOINTS
 # ==============================
-import os
-
 # Type indicator mapping
 TYPE_INDICATOR_MAP = {
     "SEDIMENT": "Sediment",
@@ -387,24 +887,23 @@ TYPE_INDICATOR_MAP = {
     "WATER_QUALITY_BOTTOM": "Water_Bottom"
 }
 
-# Models directory - check Docker path first, then fallback to relative path
-_docker_models_path = "/app/models"
-_dev_models_path = os.path.join(os.path.dirname(__file__), "..", "models")
-MODELS_BASE_DIR = _docker_models_path if os.path.exists(_docker_models_path) else _dev_models_path
+TYPE_LABELS = {
+    "SEDIMENT": "Sediment",
+    "WATER_QUALITY_SURFACE": "Water Quality (Surface)",
+    "WATER_QUALITY_MIDDLE": "Water Quality (Middle)",
+    "WATER_QUALITY_BOTTOM": "Water Quality (Bottom)"
+}
 
 
 @app.get("/prediction/types", tags=["Prediction"])
 async def get_prediction_types():
     """Get available prediction types based on existing model folders"""
-    types = []
-    if os.path.exists(os.path.join(MODELS_BASE_DIR, "prophet_models_sediment")):
-        types.append({"id": "SEDIMENT", "label": "Sediment"})
-    if os.path.exists(os.path.join(MODELS_BASE_DIR, "prophet_models_water_surface")):
-        types.append({"id": "WATER_QUALITY_SURFACE", "label": "Water Quality (Surface)"})
-    if os.path.exists(os.path.join(MODELS_BASE_DIR, "prophet_models_water_middle")):
-        types.append({"id": "WATER_QUALITY_MIDDLE", "label": "Water Quality (Middle)"})
-    if os.path.exists(os.path.join(MODELS_BASE_DIR, "prophet_models_water_bottom")):
-        types.append({"id": "WATER_QUALITY_BOTTOM", "label": "Water Quality (Bottom)"})
+    available = set(registry.types())
+    types = [
+        {"id": type_id, "label": TYPE_LABELS[type_id]}
+        for type_id, type_name in TYPE_INDICATOR_MAP.items()
+        if type_name in available
+    ]
     return {"types": types}
 
 
@@ -414,18 +913,7 @@ async def get_prediction_areas(type_indicator: str = Query(..., description="Pre
     type_name = TYPE_INDICATOR_MAP.get(type_indicator)
     if not type_name:
         raise HTTPException(status_code=400, detail="Invalid type_indicator")
-    
-    if type_name == "Sediment":
-        folder = "prophet_models_sediment"
-    else:
-        folder = f"prophet_models_{type_name.lower()}"
-    
-    folder_path = os.path.join(MODELS_BASE_DIR, folder)
-    if not os.path.exists(folder_path):
-        return {"areas": []}
-    
-    areas = [f for f in os.listdir(folder_path) if os.path.isdir(os.path.join(folder_path, f))]
-    return {"areas": sorted(areas)}
+    return {"areas": registry.areas(type_name)}
 
 
 @app.get("/prediction/stations", tags=["Prediction"])
@@ -437,18 +925,40 @@ async def get_prediction_stations(
     type_name = TYPE_INDICATOR_MAP.get(type_indicator)
     if not type_name:
         raise HTTPException(status_code=400, detail="Invalid type_indicator")
-    
-    if type_name == "Sediment":
-        folder = "prophet_models_sediment"
-    else:
-        folder = f"prophet_models_{type_name.lower()}"
-    
-    folder_path = os.path.join(MODELS_BASE_DIR, folder, area)
-    if not os.path.exists(folder_path):
-        return {"stations": []}
-    
-    stations = [f for f in os.listdir(folder_path) if os.path.isdir(os.path.join(folder_path, f))]
-    return {"stations": sorted(stations)}
+    return {"stations": registry.stations(type_name, area)}
+
+
+@app.get("/prediction/models", tags=["Prediction"])
+async def get_prediction_models(
+    type_indicator: str = Query(..., description="Prediction type"),
+    area: str = Query(..., description="Area name"),
+    station: str = Query(..., description="Station ID")
+):
+    """Get the element models of a station with their config metadata"""
+    type_name = TYPE_INDICATOR_MAP.get(type_indicator)
+    if not type_name:
+        raise HTTPException(status_code=400, detail="Invalid type_indicator")
+    elements = registry.elements(type_name, area, station)
+    if elements is None:
+        raise HTTPException(status_code=404, detail="Station not found")
+    models = [
+        {
+            "element": element,
+            "growth": meta["growth"],
+            "cap_value": meta["cap_value"],
+            "floor_value": meta["floor_value"],
+            "trained_at": meta["trained_at"],
+            "n_observations": meta["n_observations"],
+        }
+        for element, meta in elements.items()
+    ]
+    return {"type_indicator": type_indicator, "area": area, "station": station, "models": models}
+
+
+@app.get("/prediction/registry-stats", tags=["Prediction"])
+async def get_prediction_registry_stats():
+    """Get the size and scan count of the in-memory model registry"""
+    return registry.stats()
 
 
 @app.get("/prediction/historical", tags=["Prediction"])
@@ -456,26 +966,28 @@ async def get_historical_eai(
     region: str = Query(..., description="Region name"),
     station: str = Query(..., description="Station ID"),
     sample_type: Optional[str] = Query(None, description="Sample type filter"),
-    water_layer: Optional[str] = Query(None, description="Water layer filter")
+    water_layer: Optional[str] = Query(None, description="Water layer filter"),
+    match: MatchMode = Query(MatchMode.EXACT, description="Region / station matching: exact | prefix | contains")
 ):
-    """Get historical EAI data for a station to display in chart"""
+    """
+    Get historical EAI data for a station to display in chart.
+    Region and station match exactly by default ("MS1" no longer returns
+    MS10 / MS11 samples); match=contains restores the old substring search.
+    """
     collection = get_samples_collection()
     
-    query = {
-        "region": {"$regex": region, "$options": "i"},
-        "station": {"$regex": station, "$options": "i"}
-    }
+    query = add_name_filters({}, region, station, match.value)
     if sample_type:
         query["sample_type"] = sample_type
     if water_layer:
         query["water_layer"] = water_layer
     
-    cursor = collection.find(query).sort("data.thoi_gian", 1).limit(500)
+    found = find_raw(collection, query, {"data": 1, "eai": 1}, sort=[(DATE_FIELD, 1)], limit=500)
+    docs = await read_documents(found, 500)
     
     historical_data = []
-    async for doc in cursor:
+    for doc, eai_result in zip(docs, _sample_eai_results(docs)):
         data = doc.get("data", {})
-        eai_result = calculate_sample_eai(data)
         if eai_result["eai"] is not None:
             historical_data.append({
                 "date": data.get("thoi_gian"),
@@ -487,58 +999,180 @@ async def get_historical_eai(
     return {"historical": historical_data}
 
 
+@app.get("/prediction/cache-stats", tags=["Prediction"])
+async def get_prediction_cache_stats():
+    """
+    Get hit/miss/eviction counters of the model caches and forecast coalescing.
+
+    Forecasts run in the CPU worker processes, each with its own caches:
+    the caches are summed over the workers that answered ("workers"), and
+    listed per process id under "processes".
+    """
+    processes = await executor.run_cpu_workers(model_cache_stats)
+    stats = {
+        "engine": FORECAST_ENGINE,
+        "workers": {"cpu_workers": executor.cpu_workers, "reporting": len(processes)},
+        "params_cache": ModelCache.merge_stats([p["params_cache"] for p in processes.values()]),
+    }
+    prophet_caches = [p["prophet_cache"] for p in processes.values() if "prophet_cache" in p]
+    if prophet_caches:
+        stats["prophet_cache"] = ModelCache.merge_stats(prophet_caches)
+    stats["processes"] = {str(pid): process_stats for pid, process_stats in sorted(processes.items())}
+    stats["coalescing"] = forecast_flights.stats()
+    return stats
+
+
 class PredictionRequest(BaseModel):
     type_indicator: str
     area: str
     station: str
 
 
+# Concurrent requests for the same station forecast share one computation
+forecast_flights = SingleFlight()
+
+
+async def _station_forecast(type_name: str, area: str, station: str):
+    """(predictions, source): from the store (I/O pool) or computed live (CPU pool)"""
+    predictions = await executor.run_io(lookup_station, type_name, area, station)
+    if predictions is not None:
+        return predictions, "store"
+    return await executor.run_cpu(refresh_station, type_name, area, station), "live"
+
+
 @app.post("/prediction/forecast", tags=["Prediction"])
 async def generate_forecast(request: PredictionRequest):
     """Generate 12-month EAI forecast using Prophet models"""
     try:
-        # Import inference module
-        from inference import get_forecast_df
-        
         # Map type indicator
         type_name = TYPE_INDICATOR_MAP.get(request.type_indicator)
         if not type_name:
             raise HTTPException(status_code=400, detail="Invalid type_indicator")
         
-        # Get forecast dataframe
-        df = get_forecast_df(type_name, request.area, request.station)
-        
-        # Convert to dict and calculate EAI for each row
-        predictions = []
-        for _, row in df.iterrows():
-            # Convert row to dict for EAI calculation
-            data = {col: row[col] for col in df.columns if col != 'thoi_gian' and row[col] is not None}
-            
-            # Calculate EAI from predicted parameters
-            eai_result = calculate_sample_eai(data)
-            
-            predictions.append({
-                "date": row["thoi_gian"],
-                "eai": eai_result["eai"],
-                "status": eai_result["status"],
-                "status_label": get_status_label(eai_result["status"]),
-                "sub_indices": eai_result["sub_indices"],
-                "is_prediction": True
-            })
+        # Serve from the precomputed store; stale or missing stations are
+        # computed live, once for all concurrent requests of the same station
+        predictions, source = await forecast_flights.do(
+            (type_name, request.area, request.station, FORECAST_PERIODS),
+            lambda: _station_forecast(type_name, request.area, request.station)
+        )
+        # Counted for the warmup plan only once the station proved to exist
+        access_log.record(type_name, request.area, request.station)
         
         return {
             "type_indicator": request.type_indicator,
             "area": request.area,
             "station": request.station,
+            "source": source,
             "predictions": predictions
         }
     
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except (ExecutorBusyError, ExecutorTimeoutError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 
+class BatchPredictionRequest(BaseModel):
+    stations: Optional[List[PredictionRequest]] = None
+    type_indicator: Optional[str] = None
+    area: Optional[str] = None
+    stream: bool = False
+
+
+def _split_chunks(items: list, n_chunks: int) -> List[list]:
+    """Split items round-robin into at most n_chunks non-empty chunks"""
+    n_chunks = max(1, min(n_chunks, len(items)))
+    return [items[i::n_chunks] for i in range(n_chunks)]
+
+
+@app.post("/prediction/forecast/batch", tags=["Prediction"])
+async def generate_forecast_batch(request: BatchPredictionRequest):
+    """
+    Generate 12-month EAI forecasts for many stations in one request.
+    
+    - stations: explicit list of {type_indicator, area, station}
+    - or type_indicator (+ optional area): every station of that type / area
+    
+    Stations missing from the forecast store are computed in parallel chunks
+    on the CPU pool. Errors are reported per station. With stream=true the
+    results are returned as NDJSON lines as soon as each chunk is ready.
+    """
+    # Resolve the requested stations as (type_indicator, type_name, area, station)
+    requested = []
+    if request.stations:
+        for item in request.stations:
+            requested.append((item.type_indicator, TYPE_INDICATOR_MAP.get(item.type_indicator), item.area, item.station))
+    elif request.type_indicator:
+        type_name = TYPE_INDICATOR_MAP.get(request.type_indicator)
+        if not type_name:
+            raise HTTPException(status_code=400, detail="Invalid type_indicator")
+        requested = [
+            (request.type_indicator, t, a, s)
+            for t, a, s in await executor.run_io(list_stations, type_name, request.area)
+        ]
+    else:
+        raise HTTPException(status_code=400, detail="Provide stations or type_indicator (and optionally area)")
+    
+    type_ids = {}
+    results = []
+    valid_keys = []
+    for type_id, type_name, area, station in requested:
+        if not type_name:
+            results.append({"type_indicator": type_id, "area": area, "station": station,
+                            "error": "Invalid type_indicator", "status_code": 400})
+            continue
+        type_ids[(type_name, area, station)] = type_id
+        valid_keys.append((type_name, area, station))
+    
+    def to_items(station_results):
+        if request.stations:
+            # Explicitly requested stations count for the warmup plan once forecast
+            for key, result in station_results.items():
+                if "error" not in result:
+                    access_log.record(*key)
+        return [
+            {"type_indicator": type_ids[key], "area": key[1], "station": key[2], **result}
+            for key, result in station_results.items()
+        ]
+    
+    # Fresh stations come straight from the store; the rest are recomputed
+    stored = await executor.run_io(lookup_stations, valid_keys)
+    results.extend(to_items(stored))
+    missing = [key for key in dict.fromkeys(valid_keys) if key not in stored]
+    
+    async def compute_chunk(chunk):
+        try:
+            return to_items(await executor.run_cpu(refresh_stations, chunk))
+        except (ExecutorBusyError, ExecutorTimeoutError) as e:
+            status_code = 503 if isinstance(e, ExecutorBusyError) else 504
+            return to_items({key: {"error": str(e), "status_code": status_code} for key in chunk})
+    
+    tasks = [compute_chunk(chunk) for chunk in _split_chunks(missing, executor.cpu_workers)]
+    
+    if request.stream:
+        async def stream_results():
+            for item in results:
+                yield json.dumps(item) + "\n"
+            for next_chunk in asyncio.as_completed(tasks):
+                for item in await next_chunk:
+                    yield json.dumps(item) + "\n"
+        
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+    
+    for chunk_items in await asyncio.gather(*tasks):
+        results.extend(chunk_items)
+    
+    failed = sum(1 for item in results if "error" in item)
+    return {
+        "total": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results
+    }
+
+
 # ==============================
 # RUN SERVER
 # ==============================
@@ -0,0 +1,89 @@
+"""
+In-process cache of the region / station metadata behind /regions,
+/stations and /regions/stations.
+
+The sets only change when the data scripts rewrite the samples, so they are
+loaded with one $group over (region, station) and kept until the import
+generation (import_generation.py) changes. The reload happens lazily on
+the first request that sees a new generation; concurrent requests wait for
+the same reload.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from import_generation import import_generation
+from query_filters import normalize_name
+
+
+class MetadataCache:
+    def __init__(self):
+        self._generation: Optional[int] = None
+        self._regions: List[str] = []
+        self._stations: List[str] = []
+        self._region_stations: Dict[str, List[str]] = {}
+        self._lock = asyncio.Lock()
+        self.loads = 0
+        self.hits = 0
+
+    async def _load(self, samples):
+        pairs = await samples.aggregate([
+            {"$group": {"_id": {"region": "$region", "station": "$station"}}},
+        ]).to_list(length=None)
+        region_stations: Dict[str, set] = {}
+        stations = set()
+        for pair in pairs:
+            region, station = pair["_id"].get("region"), pair["_id"].get("station")
+            if station:
+                stations.add(station)
+            if region:
+                members = region_stations.setdefault(region, set())
+                if station:
+                    members.add(station)
+        self._regions = sorted(region_stations)
+        self._stations = sorted(stations)
+        self._region_stations = {region: sorted(region_stations[region]) for region in self._regions}
+
+    async def refresh(self, samples, metadata):
+        """Reload if the import generation changed since the last load"""
+        generation = await import_generation.current(metadata)
+        if generation == self._generation:
+            self.hits += 1
+            return
+        async with self._lock:
+            if generation != self._generation:
+                await self._load(samples)
+                self._generation = generation
+                self.loads += 1
+
+    def regions(self) -> List[str]:
+        return self._regions
+
+    def region_stations(self) -> Dict[str, List[str]]:
+        return self._region_stations
+
+    def stations(self, region: str = None, mode: str = "exact") -> List[str]:
+        """Stations of the regions matching region (same match modes as query_filters)"""
+        if not region:
+            return self._stations
+        key = normalize_name(region)
+        if mode == "exact":
+            regions = [r for r in self._regions if normalize_name(r) == key]
+        elif mode == "prefix":
+            regions = [r for r in self._regions if normalize_name(r).startswith(key)]
+        else:
+            needle = region.strip().casefold()
+            regions = [r for r in self._regions if needle in r.casefold()]
+        return sorted({station for r in regions for station in self._region_stations[r]})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "generation": self._generation,
+            "regions": len(self._regions),
+            "stations": len(self._stations),
+            "loads": self.loads,
+            "hits": self.hits,
+        }
+
+
+metadata_cache = MetadataCache()
@@ -0,0 +1,133 @@
+"""
+Bounded, memory-budgeted LRU cache for models loaded from disk.
+
+Keys are (type, area, station, element). Each lookup re-stats the model and
+config files; if their mtime/size changed (the model was retrained) the stale
+entry is dropped and the model is loaded again. The memory budget is
+estimated from the on-disk size of the two files.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+MODEL_CACHE_MAX_ENTRIES = int(os.getenv("MODEL_CACHE_MAX_ENTRIES", "256"))
+MODEL_CACHE_MAX_BYTES = int(os.getenv("MODEL_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+
+class ModelCache:
+    def __init__(
+        self,
+        loader: Callable[[str, str], Any],
+        max_entries: int = MODEL_CACHE_MAX_ENTRIES,
+        max_bytes: int = MODEL_CACHE_MAX_BYTES,
+    ):
+        """
+        Args:
+            loader: loader(model_path, config_path) -> cached value
+            max_entries: maximum number of cached models
+            max_bytes: memory budget (sum of on-disk file sizes)
+        """
+        self.loader = loader
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _signature(model_path: str, config_path: str) -> Tuple[tuple, int]:
+        model_stat = os.stat(model_path)
+        config_stat = os.stat(config_path)
+        signature = (model_stat.st_mtime_ns, model_stat.st_size, config_stat.st_mtime_ns, config_stat.st_size)
+        return signature, model_stat.st_size + config_stat.st_size
+
+    @classmethod
+    def entry_size(cls, model_path: str, config_path: str) -> int:
+        """Bytes a model is charged against max_bytes (its two files on disk)"""
+        return cls._signature(model_path, config_path)[1]
+
+    def get(self, key: Hashable, model_path: str, config_path: str) -> Any:
+        """Return the cached value for key, loading it if missing or stale"""
+        signature, size = self._signature(model_path, config_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry["signature"] == signature:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry["value"]
+                # Files changed on disk -> drop the stale entry
+                self._remove(key)
+                self.invalidations += 1
+            self.misses += 1
+
+        # Load outside the lock so other keys are not blocked
+        value = self.loader(model_path, config_path)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {"value": value, "signature": signature, "size": size}
+            self.current_bytes += size
+            self._evict()
+        return value
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry["size"]
+
+    def _evict(self):
+        # Always keep the entry that was just inserted (end of the OrderedDict)
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes
+        ):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+    @staticmethod
+    def merge_stats(stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Totals of stats() from several processes (one cache each): counters
+        and sizes are summed, max_entries / max_bytes stay per process.
+        """
+        merged = {key: sum(s[key] for s in stats) for key in ("entries", "bytes", "hits", "misses")}
+        lookups = merged["hits"] + merged["misses"]
+        return {
+            "entries": merged["entries"],
+            "max_entries": max((s["max_entries"] for s in stats), default=0),
+            "bytes": merged["bytes"],
+            "max_bytes": max((s["max_bytes"] for s in stats), default=0),
+            "hits": merged["hits"],
+            "misses": merged["misses"],
+            "evictions": sum(s["evictions"] for s in stats),
+            "invalidations": sum(s["invalidations"] for s in stats),
+            "hit_rate": round(merged["hits"] / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,90 @@
+"""
+Model folder layout helpers (no Prophet import).
+
+models/
+  prophet_models_<type>/<area>/<station>/<element>/{prophet_model.json, config.json}
+"""
+
+import os
+import hashlib
+from typing import List, Tuple
+
+# Check Docker path first, then fallback to relative path
+_docker_models_path = "/app/models"
+_dev_models_path = os.path.join(os.path.dirname(__file__), "..", "models")
+MODELS_BASE_DIR = _docker_models_path if os.path.exists(_docker_models_path) else _dev_models_path
+
+MODEL_FILE = "prophet_model.json"
+CONFIG_FILE = "config.json"
+
+VALID_TYPE_INDICATORS = ["Sediment", "Water_Surface", "Water_Middle", "Water_Bottom"]
+
+
+def get_type_folder(type_indicator: str) -> str:
+    """Map 'Sediment' / 'Water_Surface' / ... to its prophet_models_* folder name"""
+    if type_indicator == "Sediment":
+        return "prophet_models_sediment"
+    if type_indicator in VALID_TYPE_INDICATORS:
+        return f"prophet_models_{type_indicator.lower()}"
+    raise ValueError("type_indicator phải là 'Sediment', 'Water_Surface', 'Water_Middle' hoặc 'Water_Bottom'")
+
+
+def get_station_dir(type_indicator: str, area: str, station: str, base_dir: str = None) -> str:
+    """Full path of a station folder; raises FileNotFoundError if missing"""
+    station_dir = os.path.join(base_dir or MODELS_BASE_DIR, get_type_folder(type_indicator), area, station)
+    if not os.path.exists(station_dir):
+        raise FileNotFoundError(f"Không tìm thấy folder trạm: {station_dir}")
+    return station_dir
+
+
+def list_station_models(type_indicator: str, area: str, station: str, base_dir: str = None) -> List[Tuple[str, str, str]]:
+    """
+    List the element models of a station as (element, model_path, config_path),
+    sorted by element. Elements missing either file are skipped.
+    """
+    station_dir = get_station_dir(type_indicator, area, station, base_dir)
+    elements = [f for f in os.listdir(station_dir) if os.path.isdir(os.path.join(station_dir, f))]
+    if not elements:
+        raise ValueError(f"Không tìm thấy chỉ tiêu nào trong {station_dir}")
+
+    models = []
+    for element in sorted(elements):
+        model_path = os.path.join(station_dir, element, MODEL_FILE)
+        config_path = os.path.join(station_dir, element, CONFIG_FILE)
+        if not (os.path.exists(model_path) and os.path.exists(config_path)):
+            print(f"     Bỏ qua {element.upper()}: Thiếu model hoặc config")
+            continue
+        models.append((element, model_path, config_path))
+    return models
+
+
+def list_stations(type_indicator: str = None, area: str = None, base_dir: str = None) -> List[Tuple[str, str, str]]:
+    """
+    Every (type_indicator, area, station) folder under the models directory,
+    optionally restricted to one type and/or area.
+    """
+    base_dir = base_dir or MODELS_BASE_DIR
+    stations = []
+    for type_name in VALID_TYPE_INDICATORS:
+        if type_indicator and type_name != type_indicator:
+            continue
+        type_dir = os.path.join(base_dir, get_type_folder(type_name))
+        if not os.path.isdir(type_dir):
+            continue
+        for area_name in sorted(os.listdir(type_dir)):
+            area_dir = os.path.join(type_dir, area_name)
+            if (area and area_name != area) or not os.path.isdir(area_dir):
+                continue
+            for station in sorted(os.listdir(area_dir)):
+                if os.path.isdir(os.path.join(area_dir, station)):
+                    stations.append((type_name, area_name, station))
+    return stations
+
+
+def model_fingerprint(model_path: str, config_path: str) -> str:
+    """Fingerprint of one element model from the size/mtime of its files"""
+    parts = []
+    for path in (model_path, config_path):
+        stat = os.stat(path)
+        parts.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
@@ -0,0 +1,331 @@
+"""
+Single binary model pack, read through mmap.
+
+Compiles the whole models/ tree (one prophet_model.json + config.json per
+element) into one file so workers do not list/open/parse ~2600 small JSON
+files. The fitted parameter arrays are stored as little-endian float64 and
+exposed as zero-copy NumPy views over a read-only mmap, so every uvicorn
+worker that opens the pack shares the same page-cache pages.
+
+Layout:
+    [0:24]    magic b"EAIPACK1", header length (uint64), data offset (uint64)
+    [24:...]  JSON header: index type -> area -> station -> element with the
+              scalar parameters, config.json fields, the model fingerprint and
+              (offset, length) of each array in the data section
+    [data:]   float64 arrays (data offset aligned to 64 bytes)
+
+Usage:
+    python model_pack.py build [--output PATH]
+
+Every lookup compares the packed fingerprint of each element with its files
+on disk (check_station, two stat calls per element): retrained elements are
+loaded from their JSON files, and the pack is reported stale (stats()) until
+it is rebuilt. GET / shows the result of the last full verify(), run at
+startup and then every MODEL_PACK_VERIFY_SECONDS in a background thread. Stations not in the pack (or with unreadable
+models, or whose element folders changed) are loaded from the JSON files.
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import asyncio
+import argparse
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from model_files import (
+    MODELS_BASE_DIR, MODEL_FILE, CONFIG_FILE, get_station_dir, list_station_models, list_stations, model_fingerprint
+)
+
+MODEL_PACK_PATH = os.getenv("MODEL_PACK_PATH", os.path.join(MODELS_BASE_DIR, "models.pack"))
+MODEL_PACK_VERIFY_SECONDS = float(os.getenv("MODEL_PACK_VERIFY_SECONDS", "300"))
+
+MAGIC = b"EAIPACK1"
+PREAMBLE = struct.Struct("<8sQQ")
+DATA_ALIGNMENT = 64
+ARRAY_FIELDS = ("delta", "changepoints_t", "gamma", "beta")
+SCALAR_FIELDS = ("growth", "start", "t_scale", "y_scale", "floor", "cap", "k", "m", "trained_at", "seasonalities")
+
+
+# ==============================
+# BUILD
+# ==============================
+def build_pack(output_path: str = None, base_dir: str = None) -> Dict[str, Any]:
+    """Compile every model under base_dir into one pack file"""
+    from numpy_forecast import load_model_params
+
+    output_path = output_path or MODEL_PACK_PATH
+    index, skipped = {}, []
+    chunks, offset = [], 0
+
+    for type_name, area, station in list_stations(base_dir=base_dir):
+        try:
+            station_entries = {}
+            station_chunks = []
+            station_offset = offset
+            for element, model_path, config_path in list_station_models(type_name, area, station, base_dir):
+                params = load_model_params(model_path, config_path)
+                with open(config_path, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+                entry = {field: params[field] for field in SCALAR_FIELDS}
+                entry["last_date"] = str(params["last_date"])
+                entry["fingerprint"] = model_fingerprint(model_path, config_path)
+                entry["config"] = config
+                entry["arrays"] = {}
+                for field in ARRAY_FIELDS:
+                    values = np.ascontiguousarray(params[field], dtype="<f8")
+                    entry["arrays"][field] = [station_offset, len(values)]
+                    station_chunks.append(values)
+                    station_offset += len(values)
+                station_entries[element] = entry
+        except Exception as e:
+            # Keep the whole station out so it falls back to the JSON files
+            skipped.append({"station": f"{type_name}/{area}/{station}", "error": str(e)})
+            continue
+        index.setdefault(type_name, {}).setdefault(area, {})[station] = station_entries
+        chunks.extend(station_chunks)
+        offset = station_offset
+
+    header = json.dumps({
+        "version": 1,
+        "built_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "index": index,
+        "skipped": skipped,
+    }).encode("utf-8")
+    data_offset = PREAMBLE.size + len(header)
+    data_offset += -data_offset % DATA_ALIGNMENT
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, len(header), data_offset))
+        f.write(header)
+        f.write(b"\0" * (data_offset - PREAMBLE.size - len(header)))
+        for values in chunks:
+            f.write(values.tobytes())
+    # Atomic swap so running workers never see a half-written pack
+    os.replace(tmp_path, output_path)
+
+    n_models = sum(len(s) for areas in index.values() for stations in areas.values() for s in stations.values())
+    return {"path": output_path, "models": n_models, "floats": offset, "bytes": os.path.getsize(output_path), "skipped": skipped}
+
+
+# ==============================
+# READ (MMAP)
+# ==============================
+class ModelPack:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_len, data_offset = PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a model pack")
+        header = json.loads(self._mmap[PREAMBLE.size:PREAMBLE.size + header_len])
+        self.index = header["index"]
+        self.built_at = header.get("built_at")
+        # Zero-copy view over the whole data section
+        self._data = np.frombuffer(self._mmap, dtype="<f8", offset=data_offset)
+        self._stations = {}
+        # "type/area/station" -> elements whose files no longer match the pack
+        self._stale: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def _entries(self, type_name: str, area: str, station: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        return self.index.get(type_name, {}).get(area, {}).get(station)
+
+    def station_models(self, type_name: str, area: str, station: str) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+        """[(element, params), ...] like numpy_forecast.load_station_params, or None if not packed"""
+        key = (type_name, area, station)
+        cached = self._stations.get(key)
+        if cached is not None:
+            return cached
+
+        entries = self._entries(type_name, area, station)
+        if entries is None:
+            return None
+        models = []
+        for element in sorted(entries):
+            entry = entries[element]
+            params = {field: entry[field] for field in SCALAR_FIELDS}
+            params["last_date"] = np.datetime64(entry["last_date"], "s")
+            for field, (offset, length) in entry["arrays"].items():
+                params[field] = self._data[offset:offset + length]
+            models.append((element, params))
+
+        with self._lock:
+            self._stations[key] = models
+        return models
+
+    def check_station(self, type_name: str, area: str, station: str, base_dir: str = None) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Packed elements of a station compared with their files on disk:
+        {element: {"model_path", "config_path", "fingerprint" (on disk),
+        "fresh" (matches the pack), "config" (packed config.json)}}.
+
+        None if the station is not packed, or if elements were added or
+        removed since the build (the whole station then comes from the JSON
+        files). Raises FileNotFoundError if the station folder is gone.
+        """
+        entries = self._entries(type_name, area, station)
+        if entries is None:
+            return None
+        station_key = f"{type_name}/{area}/{station}"
+        station_dir = get_station_dir(type_name, area, station, base_dir)
+
+        elements, stale = {}, []
+        for element in sorted(entries):
+            model_path = os.path.join(station_dir, element, MODEL_FILE)
+            config_path = os.path.join(station_dir, element, CONFIG_FILE)
+            try:
+                fingerprint = model_fingerprint(model_path, config_path)
+            except OSError:
+                # Element removed since the build
+                self._set_stale(station_key, sorted(entries))
+                return None
+            fresh = fingerprint == entries[element]["fingerprint"]
+            if not fresh:
+                stale.append(element)
+            elements[element] = {
+                "model_path": model_path,
+                "config_path": config_path,
+                "fingerprint": fingerprint,
+                "fresh": fresh,
+                "config": entries[element]["config"],
+            }
+
+        with os.scandir(station_dir) as it:
+            added = [
+                entry.name for entry in it
+                if entry.is_dir() and entry.name not in entries
+                and os.path.exists(os.path.join(entry.path, MODEL_FILE))
+                and os.path.exists(os.path.join(entry.path, CONFIG_FILE))
+            ]
+        if added:
+            self._set_stale(station_key, sorted(added))
+            return None
+
+        self._set_stale(station_key, stale)
+        return elements
+
+    def _set_stale(self, station_key: str, elements: List[str]):
+        with self._lock:
+            if elements:
+                self._stale[station_key] = elements
+            else:
+                self._stale.pop(station_key, None)
+
+    def verify(self, base_dir: str = None):
+        """Check every packed station against the files on disk (updates stats())"""
+        for type_name, areas in self.index.items():
+            for area, stations in areas.items():
+                for station in stations:
+                    try:
+                        self.check_station(type_name, area, station, base_dir)
+                    except OSError:
+                        self._set_stale(f"{type_name}/{area}/{station}", sorted(stations[station]))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stale = {station: list(elements) for station, elements in sorted(self._stale.items())}
+        return {
+            "path": self.path,
+            "built_at": self.built_at,
+            "stations": sum(len(stations) for areas in self.index.values() for stations in areas.values()),
+            "status": "stale" if stale else "fresh",
+            "stale_models": sum(len(elements) for elements in stale.values()),
+            "stale": stale,
+        }
+
+
+_pack: Optional[ModelPack] = None
+_pack_lock = threading.Lock()
+
+
+def get_model_pack() -> Optional[ModelPack]:
+    """The process-wide pack, reopened when the file is replaced; None if absent"""
+    global _pack
+    try:
+        mtime_ns = os.stat(MODEL_PACK_PATH).st_mtime_ns
+    except OSError:
+        _pack = None
+        return None
+    if _pack is None or _pack.mtime_ns != mtime_ns:
+        with _pack_lock:
+            if _pack is None or _pack.mtime_ns != mtime_ns:
+                try:
+                    _pack = ModelPack(MODEL_PACK_PATH)
+                except (OSError, ValueError) as e:
+                    print(f"Cannot open model pack {MODEL_PACK_PATH}: {e}")
+                    _pack = None
+    return _pack
+
+
+class PackHealth:
+    """
+    Pack stats after the last full verify() (None without a pack), so the
+    health check answers from memory instead of stat-ing every packed model.
+    """
+
+    def __init__(self):
+        self.status: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def check(self):
+        pack = get_model_pack()
+        if pack is None:
+            self.status = None
+            return
+        pack.verify()
+        self.status = dict(pack.stats(), checked_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(MODEL_PACK_VERIFY_SECONDS)
+            try:
+                await asyncio.to_thread(self.check)
+            except Exception as e:
+                print(f"Model pack verify failed: {e}")
+
+    async def start(self):
+        """First verify + periodic re-verify (called from the app lifespan)"""
+        try:
+            await asyncio.to_thread(self.check)
+        except Exception as e:
+            print(f"Model pack verify failed: {e}")
+        if MODEL_PACK_VERIFY_SECONDS > 0:
+            self._task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+pack_health = PackHealth()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the models/ tree into one mmap-able pack")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Build the model pack")
+    build_parser.add_argument("--output", default=None, help=f"Pack file (default: {MODEL_PACK_PATH})")
+    build_parser.add_argument("--models-dir", default=None, help=f"Models folder (default: {MODELS_BASE_DIR})")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        summary = build_pack(args.output, args.models_dir)
+        print(f"Packed {summary['models']} model(s) into {summary['path']} ({summary['bytes'] / 1024:.0f} KB)")
+        for skipped in summary["skipped"]:
+            print(f"  Skipped {skipped['station']}: {skipped['error']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+In-memory registry of the models/ tree.
+
+The tree is scanned once at startup into an index
+type -> area -> station -> element -> metadata (growth, cap, trained_at,
+n_observations, file paths), so the prediction endpoints answer from memory
+instead of calling os.listdir / os.path.exists on every request.
+
+A background task polls directory and config.json mtimes every
+REGISTRY_POLL_SECONDS and rescans when something changed. Lookups that miss
+the registry (e.g. a station added since the last poll) fall back to the disk.
+"""
+
+import os
+import json
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import model_files
+from model_files import CONFIG_FILE, MODEL_FILE, VALID_TYPE_INDICATORS, get_type_folder
+
+REGISTRY_POLL_SECONDS = float(os.getenv("REGISTRY_POLL_SECONDS", "30"))
+
+
+class ModelRegistry:
+    def __init__(self, base_dir: str = None):
+        self.base_dir = base_dir or model_files.MODELS_BASE_DIR
+        self.index: Dict[str, Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]] = {}
+        self.loaded = False
+        self.scans = 0
+        self._signature = None
+        self._areas: Dict[str, List[str]] = {}
+        self._stations: Dict[Tuple[str, str], List[str]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------
+    # Scanning
+    # ------------------------------
+    def _tree_signature(self) -> tuple:
+        """
+        mtimes of the type / area / station / element directories and of the
+        model files (cheap change detection). The models/ root itself is left
+        out: the forecast store, model pack and access log live there and
+        change it on every write.
+        """
+        entries = []
+        for type_name in VALID_TYPE_INDICATORS:
+            type_dir = os.path.join(self.base_dir, get_type_folder(type_name))
+            if not os.path.isdir(type_dir):
+                entries.append((type_dir, None))
+                continue
+            for root, dirs, files in os.walk(type_dir):
+                entries.append((root, os.stat(root).st_mtime_ns))
+                for name in (MODEL_FILE, CONFIG_FILE):
+                    if name in files:
+                        stat = os.stat(os.path.join(root, name))
+                        entries.append((name, stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+    @staticmethod
+    def _element_metadata(element_dir: str) -> Optional[Dict[str, Any]]:
+        model_path = os.path.join(element_dir, MODEL_FILE)
+        config_path = os.path.join(element_dir, CONFIG_FILE)
+        if not (os.path.exists(model_path) and os.path.exists(config_path)):
+            return None
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            config = {}
+        cap_value = config.get("cap_value")
+        return {
+            "growth": "logistic" if cap_value is not None else "linear",
+            "cap_value": cap_value,
+            "floor_value": config.get("floor_value", 0.0),
+            "trained_at": config.get("trained_at"),
+            "n_observations": config.get("n_observations"),
+            "model_path": model_path,
+            "config_path": config_path,
+        }
+
+    def scan(self):
+        """Rebuild the whole index from disk"""
+        signature = self._tree_signature()
+        index = {}
+        for type_name in VALID_TYPE_INDICATORS:
+            type_dir = os.path.join(self.base_dir, get_type_folder(type_name))
+            if not os.path.isdir(type_dir):
+                continue
+            index[type_name] = {}
+            for area in sorted(os.listdir(type_dir)):
+                area_dir = os.path.join(type_dir, area)
+                if not os.path.isdir(area_dir):
+                    continue
+                index[type_name][area] = {}
+                for station in sorted(os.listdir(area_dir)):
+                    station_dir = os.path.join(area_dir, station)
+                    if not os.path.isdir(station_dir):
+                        continue
+                    elements = {}
+                    for element in sorted(os.listdir(station_dir)):
+                        element_dir = os.path.join(station_dir, element)
+                        if os.path.isdir(element_dir):
+                            metadata = self._element_metadata(element_dir)
+                            if metadata is not None:
+                                elements[element] = metadata
+                    index[type_name][area][station] = elements
+
+        areas = {type_name: sorted(area_map) for type_name, area_map in index.items()}
+        stations = {
+            (type_name, area): sorted(station_map)
+            for type_name, area_map in index.items()
+            for area, station_map in area_map.items()
+        }
+        with self._lock:
+            self.index, self._areas, self._stations = index, areas, stations
+            self._signature = signature
+            self.loaded = True
+            self.scans += 1
+
+    def refresh_if_changed(self) -> bool:
+        """Rescan if any directory or config.json changed since the last scan"""
+        if self.loaded and self._tree_signature() == self._signature:
+            return False
+        self.scan()
+        return True
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(REGISTRY_POLL_SECONDS)
+            try:
+                if await asyncio.to_thread(self.refresh_if_changed):
+                    print(f"Model registry rescanned ({self.scans} scans)")
+            except Exception as e:
+                print(f"Model registry refresh failed: {e}")
+
+    async def start(self):
+        """Initial scan + background mtime polling (called from the app lifespan)"""
+        await asyncio.to_thread(self.scan)
+        if REGISTRY_POLL_SECONDS > 0:
+            self._task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    # ------------------------------
+    # Lookups (O(1) dict access)
+    # ------------------------------
+    def types(self) -> List[str]:
+        return [t for t in VALID_TYPE_INDICATORS if t in self.index]
+
+    def areas(self, type_name: str) -> List[str]:
+        return self._areas.get(type_name, [])
+
+    def stations(self, type_name: str, area: str) -> List[str]:
+        return self._stations.get((type_name, area), [])
+
+    def elements(self, type_name: str, area: str, station: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        return self.index.get(type_name, {}).get(area, {}).get(station)
+
+    def all_stations(self, type_name: str = None, area: str = None) -> List[Tuple[str, str, str]]:
+        return [
+            (t, a, s)
+            for (t, a), station_names in self._stations.items()
+            if (not type_name or t == type_name) and (not area or a == area)
+            for s in station_names
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "scans": self.scans,
+            "types": len(self.index),
+            "stations": sum(len(s) for s in self._stations.values()),
+            "models": sum(
+                len(elements)
+                for area_map in self.index.values()
+                for station_map in area_map.values()
+                for elements in station_map.values()
+            ),
+        }
+
+
+registry = ModelRegistry()
+
+
+def list_station_models(type_indicator: str, area: str, station: str) -> List[Tuple[str, str, str]]:
+    """
+    Same as model_files.list_station_models, answered from the registry when
+    it is loaded and knows the station, otherwise from the disk.
+    """
+    elements = registry.elements(type_indicator, area, station) if registry.loaded else None
+    if not elements:
+        return model_files.list_station_models(type_indicator, area, station)
+    return [(element, meta["model_path"], meta["config_path"]) for element, meta in elements.items()]
+
+
+def list_stations(type_indicator: str = None, area: str = None) -> List[Tuple[str, str, str]]:
+    """Same as model_files.list_stations, from the registry when loaded"""
+    if registry.loaded:
+        return registry.all_stations(type_indicator, area)
+    return model_files.list_stations(type_indicator, area)
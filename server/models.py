@@ -14,6 +14,58 @@ class WaterLayer(str, Enum):
     BOTTOM = "BOTTOM"
 
 
+class EAIStatus(str, Enum):
+    GOOD = "good"
+    WARNING = "warning"
+    BAD = "bad"
+    UNKNOWN = "unknown"
+
+
+class EAISort(str, Enum):
+    EAI_ASC = "eai"
+    EAI_DESC = "-eai"
+
+
+class EAIMode(str, Enum):
+    STORED = "stored"
+    PIPELINE = "pipeline"
+
+
+class PageMode(str, Enum):
+    OFFSET = "offset"
+    CURSOR = "cursor"
+
+
+class SamplesMode(str, Enum):
+    RECORDS = "records"
+    COMPACT = "compact"
+
+
+class CountMode(str, Enum):
+    EXACT = "exact"
+    CACHED = "cached"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+class MatchMode(str, Enum):
+    EXACT = "exact"
+    PREFIX = "prefix"
+    CONTAINS = "contains"
+
+
+class RollupGranularity(str, Enum):
+    MONTH = "month"
+    YEAR = "year"
+
+
+class RollupDimension(str, Enum):
+    SAMPLE_TYPE = "sample_type"
+    WATER_LAYER = "water_layer"
+    REGION = "region"
+    STATION = "station"
+
+
 class SampleBase(BaseModel):
     sample_type: Optional[str] = None
     water_layer: Optional[str] = None
@@ -31,10 +83,13 @@ class SampleResponse(SampleBase):
 
 
 class SamplesListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None
     limit: int
     skip: int
     data: List[Dict[str, Any]]
+    columns: Optional[Dict[str, List[Any]]] = None
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
 
 class RegionsResponse(BaseModel):
@@ -47,18 +102,25 @@ class StationsResponse(BaseModel):
     count: int
 
 
+class RegionStationsResponse(BaseModel):
+    region_stations: Dict[str, List[str]]
+    count: int
+
+
 class StatisticsResponse(BaseModel):
     total_samples: int
     sample_types: Dict[str, int]
     water_layers: Dict[str, int]
     regions: Dict[str, int]
     date_range: Optional[Dict[str, str]] = None
+    cached: bool = False
 
 
 class HealthResponse(BaseModel):
     status: str
     database: str
     message: str
+    model_pack: Optional[Dict[str, Any]] = None
 
 
 # ==============================
@@ -77,9 +139,29 @@ class EAIScoreItem(BaseModel):
 
 
 class EAIResponse(BaseModel):
-    total: int
+    total: Optional[int] = None
     limit: int
     skip: int
     average_eai: Optional[float] = None
     status_distribution: Dict[str, int]
     eai_scores: List[Dict[str, Any]]
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+
+
+class EAISummaryResponse(BaseModel):
+    total: int
+    scored: int
+    average_eai: Optional[float] = None
+    min_eai: Optional[float] = None
+    max_eai: Optional[float] = None
+    percentiles: Dict[str, Optional[float]]
+    status_distribution: Dict[str, int]
+    cached: bool = False
+
+
+class EAIRollupResponse(BaseModel):
+    granularity: str
+    group_by: List[str]
+    count: int
+    series: List[Dict[str, Any]]
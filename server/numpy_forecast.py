@@ -0,0 +1,354 @@
+"""
+Pure-NumPy evaluator for the saved Prophet models (no pandas / Prophet / Stan).
+
+A fitted model only needs its point estimates to produce yhat:
+
+- Trend: linear or logistic piecewise growth over the changepoints
+  (k, m, delta, changepoints_t), with cap/floor taken from config.json
+- Seasonality: Fourier series (sin/cos pairs up to fourier_order) times beta,
+  additive (scaled by y_scale) or multiplicative
+
+  yhat = trend * (1 + multiplicative_terms) + additive_terms
+
+The horizon is the next FORECAST_PERIODS month-ends after the last training
+date, i.e. the same rows as model.make_future_dataframe(periods=12, freq="M").
+Models of many elements / stations are padded to a common shape and evaluated
+together in one set of array operations.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from model_cache import ModelCache
+from model_registry import list_station_models
+from model_pack import get_model_pack
+
+FORECAST_PERIODS = 12
+
+SECONDS_PER_DAY = 3600 * 24.0
+
+
+class UnsupportedModelError(ValueError):
+    """The model uses a Prophet feature this evaluator does not implement"""
+
+
+# ==============================
+# LOADING FITTED PARAMETERS
+# ==============================
+def _last_history_date(history_dates: str) -> np.datetime64:
+    """history_dates is a pandas Series serialized as JSON (orient='split')"""
+    dates = json.loads(history_dates)["data"]
+    return max(np.datetime64(d.rstrip("Z"), "s") for d in dates)
+
+
+def _trend_offsets(growth: str, k: float, m: float, delta: np.ndarray, changepoints: np.ndarray) -> np.ndarray:
+    """
+    Offset change (gamma) at each changepoint. Constant for a fitted model,
+    so it is computed once at load time (same recursion as Prophet).
+    """
+    if growth == "linear":
+        return -changepoints * delta
+    # Logistic: offsets keep the curve continuous at each changepoint
+    k_cum = np.concatenate(([k], np.cumsum(delta) + k))
+    gammas = np.zeros(len(changepoints))
+    for i, t_s in enumerate(changepoints):
+        gammas[i] = (t_s - m - np.sum(gammas)) * (1 - k_cum[i] / k_cum[i + 1])
+    return gammas
+
+
+def parse_model_params(model_json: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract everything needed to compute yhat from a prophet_model.json dict
+    and its config.json dict.
+    """
+    growth = model_json["growth"]
+    if growth not in ("linear", "logistic"):
+        raise UnsupportedModelError(f"growth '{growth}' is not supported")
+    if model_json.get("holidays") is not None or model_json.get("country_holidays"):
+        raise UnsupportedModelError("holidays are not supported")
+    if model_json["extra_regressors"][1]:
+        raise UnsupportedModelError("extra regressors are not supported")
+    if model_json.get("mcmc_samples", 0):
+        raise UnsupportedModelError("MCMC-fitted models are not supported")
+
+    params = model_json["params"]
+    names, seasonalities = model_json["seasonalities"]
+    blocks = []
+    for name in names:
+        props = seasonalities[name]
+        if props.get("condition_name"):
+            raise UnsupportedModelError("conditional seasonalities are not supported")
+        blocks.append({
+            "name": name,
+            "period": float(props["period"]),
+            "fourier_order": int(props["fourier_order"]),
+            "multiplicative": props["mode"] == "multiplicative",
+        })
+
+    beta = np.asarray(params["beta"][0], dtype=np.float64)
+    if beta.size != sum(2 * b["fourier_order"] for b in blocks):
+        raise UnsupportedModelError("beta does not match the seasonality features")
+
+    if model_json["logistic_floor"]:
+        floor = float(config.get("floor_value", 0.0))
+    elif model_json.get("scaling") == "minmax":
+        floor = float(model_json["y_min"])
+    else:
+        floor = 0.0
+
+    cap = None
+    if growth == "logistic":
+        if config.get("cap_value") is None:
+            raise UnsupportedModelError("logistic model without cap_value in config.json")
+        cap = float(config["cap_value"])
+
+    k = float(params["k"][0][0])
+    m = float(params["m"][0][0])
+    delta = np.asarray(params["delta"][0], dtype=np.float64)
+    changepoints = np.asarray(model_json["changepoints_t"], dtype=np.float64)
+
+    return {
+        "growth": growth,
+        "start": float(model_json["start"]),
+        "t_scale": float(model_json["t_scale"]),
+        "y_scale": float(model_json["y_scale"]),
+        "floor": floor,
+        "cap": cap,
+        "k": k,
+        "m": m,
+        "delta": delta,
+        "changepoints_t": changepoints,
+        "gamma": _trend_offsets(growth, k, m, delta, changepoints),
+        "beta": beta,
+        "seasonalities": blocks,
+        "last_date": _last_history_date(model_json["history_dates"]),
+        "trained_at": config.get("trained_at"),
+    }
+
+
+def load_model_params(model_path: str, config_path: str) -> Dict[str, Any]:
+    """Read prophet_model.json + config.json and return the fitted parameters"""
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    with open(model_path, "r", encoding="utf-8") as f:
+        model_json = json.load(f)
+    return parse_model_params(model_json, config)
+
+
+# Key = (type, area, station, element); reloaded when the files change on disk.
+# Parsed parameters are small, so by default the whole model tree fits.
+params_cache = ModelCache(load_model_params, max_entries=int(os.getenv("PARAMS_CACHE_MAX_ENTRIES", "4096")))
+
+
+def get_params_cache_stats() -> Dict[str, Any]:
+    return params_cache.stats()
+
+
+# ==============================
+# VECTORIZED EVALUATION
+# ==============================
+def horizon_dates(last_dates: np.ndarray, periods: int = FORECAST_PERIODS) -> np.ndarray:
+    """
+    Next `periods` month-ends strictly after each last date, keeping the
+    time of day (same as pandas date_range(freq="M") in make_future_dataframe).
+    Returns datetime64[s] of shape (n_models, periods).
+    """
+    last = np.asarray(last_dates, dtype="datetime64[s]")
+    day = last.astype("datetime64[D]")
+    time_of_day = last - day.astype("datetime64[s]")
+    month = day.astype("datetime64[M]")
+    first_month_end = ((month + 1).astype("datetime64[D]") - 1).astype("datetime64[s]") + time_of_day
+    offset = np.where(first_month_end > last, 0, 1)
+    months = month[:, None] + (offset[:, None] + np.arange(periods))
+    month_ends = (months + 1).astype("datetime64[D]") - 1
+    return month_ends.astype("datetime64[s]") + time_of_day[:, None]
+
+
+def _pad(arrays: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack 1-D arrays of different lengths into (n, max_len) plus a validity mask"""
+    width = max((len(a) for a in arrays), default=0)
+    out = np.zeros((len(arrays), width))
+    mask = np.zeros((len(arrays), width), dtype=bool)
+    for i, a in enumerate(arrays):
+        out[i, :len(a)] = a
+        mask[i, :len(a)] = True
+    return out, mask
+
+
+def _piecewise_trend(t: np.ndarray, models: List[Dict[str, Any]]) -> np.ndarray:
+    """Scaled trend (before * y_scale + floor) for every model, shape like t"""
+    k = np.array([p["k"] for p in models])
+    m = np.array([p["m"] for p in models])
+    delta, _ = _pad([p["delta"] for p in models])
+    gamma, _ = _pad([p["gamma"] for p in models])
+    changepoints, valid = _pad([p["changepoints_t"] for p in models])
+    logistic = np.array([p["growth"] == "logistic" for p in models])
+
+    # (n_models, periods, n_changepoints): changepoint s is active at t
+    active = (t[:, :, None] >= changepoints[:, None, :]) & valid[:, None, :]
+    k_t = k[:, None] + np.einsum("nhc,nc->nh", active, delta)
+    m_t = m[:, None] + np.einsum("nhc,nc->nh", active, gamma)
+
+    trend = k_t * t + m_t
+    if logistic.any():
+        cap = np.array([(p["cap"] - p["floor"]) / p["y_scale"] if p["cap"] is not None else np.nan for p in models])
+        trend = np.where(logistic[:, None], cap[:, None] / (1 + np.exp(-k_t * (t - m_t))), trend)
+    return trend
+
+
+def _seasonal_terms(days: np.ndarray, models: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (additive_terms, multiplicative_terms) for every model, shape like days"""
+    additive = np.zeros_like(days)
+    multiplicative = np.zeros_like(days)
+    names = sorted({b["name"] for p in models for b in p["seasonalities"]})
+
+    for name in names:
+        # Gather this seasonality's block for every model (zeros where absent)
+        n_models = len(models)
+        period = np.ones(n_models)
+        is_multiplicative = np.zeros(n_models, dtype=bool)
+        block_betas = []
+        for i, p in enumerate(models):
+            offset = 0
+            beta = np.zeros(0)
+            for block in p["seasonalities"]:
+                width = 2 * block["fourier_order"]
+                if block["name"] == name:
+                    beta = p["beta"][offset:offset + width]
+                    period[i] = block["period"]
+                    is_multiplicative[i] = block["multiplicative"]
+                offset += width
+            block_betas.append(beta)
+        beta, _ = _pad(block_betas)
+        if beta.shape[1] == 0:
+            continue
+
+        # Features ordered [sin(1), cos(1), sin(2), cos(2), ...] like Prophet
+        orders = np.arange(1, beta.shape[1] // 2 + 1)
+        angle = (2.0 * orders * np.pi)[None, None, :] * days[:, :, None] / period[:, None, None]
+        features = np.empty(angle.shape[:2] + (2 * len(orders),))
+        features[:, :, 0::2] = np.sin(angle)
+        features[:, :, 1::2] = np.cos(angle)
+        component = np.einsum("nhf,nf->nh", features, beta)
+
+        multiplicative += np.where(is_multiplicative[:, None], component, 0.0)
+        additive += np.where(is_multiplicative[:, None], 0.0, component)
+
+    return additive, multiplicative
+
+
+def forecast_batch(models: List[Dict[str, Any]], periods: int = FORECAST_PERIODS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate many models at once.
+
+    Args:
+        models: parameter dicts from parse_model_params / load_model_params
+        periods: number of future month-ends
+
+    Returns:
+        (ds, yhat): datetime64[s] and float arrays of shape (n_models, periods)
+    """
+    if not models:
+        return np.empty((0, periods), dtype="datetime64[s]"), np.empty((0, periods))
+
+    ds = horizon_dates(np.array([p["last_date"] for p in models]), periods)
+    seconds = ds.astype(np.int64).astype(np.float64)
+
+    start = np.array([p["start"] for p in models])
+    t_scale = np.array([p["t_scale"] for p in models])
+    y_scale = np.array([p["y_scale"] for p in models])
+    floor = np.array([p["floor"] for p in models])
+
+    t = (seconds - start[:, None]) / t_scale[:, None]
+    trend = _piecewise_trend(t, models) * y_scale[:, None] + floor[:, None]
+
+    additive, multiplicative = _seasonal_terms(seconds / SECONDS_PER_DAY, models)
+    yhat = trend * (1 + multiplicative) + additive * y_scale[:, None]
+    return ds, yhat
+
+
+# ==============================
+# STATION-LEVEL FORECASTS
+# ==============================
+def _to_rows(ds: np.ndarray, yhat: np.ndarray, elements: List[str]) -> List[Dict[str, Any]]:
+    """
+    Pivot per-element forecasts into one row per month (thoi_gian = day 28),
+    like get_forecast_df. Elements without a value for a month are omitted.
+    """
+    months = ds.astype("datetime64[M]")
+    by_month = {}
+    for element, element_months, element_yhat in zip(elements, months.tolist(), yhat.tolist()):
+        for month, value in zip(element_months, element_yhat):
+            by_month.setdefault(month, {})[element] = value
+
+    rows = []
+    for month in sorted(by_month):
+        row = {"thoi_gian": month.strftime("%Y-%m-28")}
+        row.update(sorted(by_month[month].items()))
+        rows.append(row)
+    return rows
+
+
+def load_station_params(type_indicator: str, area: str, station: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    [(element, params), ...] for a station: zero-copy from the model pack for
+    elements whose files still match it, otherwise from the JSON files via
+    the parameter cache (retrained elements, stations not in the pack).
+    """
+    pack = get_model_pack()
+    elements = pack.check_station(type_indicator, area, station) if pack is not None else None
+    if elements is not None:
+        packed = dict(pack.station_models(type_indicator, area, station))
+        return [
+            (element, packed[element] if files["fresh"] else params_cache.get(
+                (type_indicator, area, station, element), files["model_path"], files["config_path"]
+            ))
+            for element, files in elements.items()
+        ]
+    return [
+        (element, params_cache.get((type_indicator, area, station, element), model_path, config_path))
+        for element, model_path, config_path in list_station_models(type_indicator, area, station)
+    ]
+
+
+def forecast_stations(stations: Sequence[Tuple[str, str, str]], periods: int = FORECAST_PERIODS) -> Dict[Tuple[str, str, str], List[Dict[str, Any]]]:
+    """
+    Forecast every element of many stations in a single batched evaluation.
+
+    Args:
+        stations: (type_indicator, area, station) tuples
+
+    Returns:
+        {(type_indicator, area, station): rows}, rows as in forecast_station
+    """
+    owners, elements, models = [], [], []
+    for key in stations:
+        station_models = load_station_params(*key)
+        if not station_models:
+            raise ValueError("Không có dự báo nào được tạo thành công!")
+        for element, params in station_models:
+            owners.append(key)
+            elements.append(element.lower())
+            models.append(params)
+
+    ds, yhat = forecast_batch(models, periods)
+
+    results = {}
+    for key in dict.fromkeys(stations):
+        index = [i for i, owner in enumerate(owners) if owner == key]
+        results[key] = _to_rows(ds[index], yhat[index], [elements[i] for i in index])
+    return results
+
+
+def forecast_station(type_indicator: str, area: str, station: str, periods: int = FORECAST_PERIODS) -> List[Dict[str, Any]]:
+    """
+    12-month forecast for every element of a station.
+
+    Returns:
+        [{"thoi_gian": "YYYY-MM-28", "<element>": yhat, ...}, ...] sorted by date
+    """
+    key = (type_indicator, area, station)
+    return forecast_stations([key], periods)[key]
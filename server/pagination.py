@@ -0,0 +1,109 @@
+"""
+Keyset (cursor) pagination for /samples and /eai.
+
+Instead of .skip(n), each page continues after the sort key of the last
+document of the previous page, so page N costs the same as page 1:
+
+    sort [("data.thoi_gian", 1), ("_id", 1)], last = ("2015-03-02", id)
+    next page: thoi_gian > "2015-03-02" OR (thoi_gian = "2015-03-02" AND _id > id)
+
+The key is returned to the client as an opaque token (next_cursor). It also
+records the sort it was made for, so a token cannot be replayed with a
+different order. Documents without the sort field sort as null: first in
+ascending order, last in descending order, which the filters account for.
+
+The sort is always (field, _id) with the same direction on both, so one
+compound index serves both directions (idx_date_id, idx_eai_score_id).
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING
+
+DATE_FIELD = "data.thoi_gian"
+
+SortSpec = List[Tuple[str, int]]
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def keyset_sort(field: str = DATE_FIELD, direction: int = ASCENDING) -> SortSpec:
+    """(field, _id) in one direction: the only shape keyset pagination supports"""
+    return [(field, direction), ("_id", direction)]
+
+
+def ensure_keyset_indexes(collection):
+    """Compound indexes matching the keyset sorts of /samples and /eai"""
+    collection.create_index([(DATE_FIELD, ASCENDING), ("_id", ASCENDING)], name="idx_date_id")
+    collection.create_index([("eai.score", ASCENDING), ("_id", ASCENDING)], name="idx_eai_score_id")
+
+
+def _signature(sort: SortSpec) -> str:
+    return ",".join(("-" if direction < 0 else "") + field for field, direction in sort)
+
+
+def field_value(doc: Dict[str, Any], path: str) -> Any:
+    """Value of a dotted path in a document (None if missing)"""
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def encode_cursor(sort: SortSpec, value: Any, last_id: ObjectId) -> str:
+    """Opaque continuation token for the page after (value, last_id)"""
+    payload = json.dumps({"s": _signature(sort), "v": value, "id": str(last_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort: SortSpec) -> Tuple[Any, ObjectId]:
+    """(value, last_id) from a token made by encode_cursor for the same sort"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        if payload["s"] != _signature(sort):
+            raise InvalidCursorError("Cursor was created for a different sort order")
+        return payload["v"], ObjectId(payload["id"])
+    except InvalidCursorError:
+        raise
+    except (ValueError, KeyError, TypeError, binascii.Error, InvalidId):
+        raise InvalidCursorError("Invalid cursor")
+
+
+def keyset_filter(sort: SortSpec, value: Any, last_id: ObjectId) -> Dict[str, Any]:
+    """Filter selecting the documents after (value, last_id) in sort order"""
+    (field, direction), _ = sort
+    after = "$gt" if direction > 0 else "$lt"
+    same_value_after = {field: value, "_id": {after: last_id}}
+    if value is None:
+        if direction > 0:
+            # Nulls come first: the rest of the nulls, then every value
+            return {"$or": [same_value_after, {field: {"$ne": None}}]}
+        # Nulls come last: only the rest of the nulls
+        return same_value_after
+    clauses = [{field: {after: value}}, same_value_after]
+    if direction < 0:
+        # Comparisons never match null: the nulls after the last value
+        clauses.append({field: None})
+    return {"$or": clauses}
+
+
+def with_keyset(query: Dict[str, Any], sort: SortSpec, cursor: str = None) -> Dict[str, Any]:
+    """query restricted to the page after cursor (query itself if no cursor)"""
+    if not cursor:
+        return query
+    after = keyset_filter(sort, *decode_cursor(cursor, sort))
+    return {"$and": [query, after]} if query else after
+
+
+def next_cursor(docs: List[Dict[str, Any]], sort: SortSpec, key_path: str = None) -> str:
+    """Token after the last document (key_path: where the sort value sits in the output)"""
+    last = docs[-1]
+    return encode_cursor(sort, field_value(last, key_path or sort[0][0]), last["_id"])
@@ -0,0 +1,219 @@
+"""
+Parallel scoring of very large calculator uploads.
+
+The CSV is parsed once into float columns (one per EAI parameter, NaN =
+missing) stored in a SharedMemory block. Contiguous row ranges are scored by
+process-pool workers that attach to the block instead of receiving a copy of
+the data. Each worker writes eai / status / sub-indices for its rows into a
+second shared block and formats its rows as NDJSON or CSV text. The parent
+joins the chunks in row order, so results come back in the original order.
+
+Unlike the streaming path this holds the parsed columns of the whole file
+(~100 bytes per row), trading memory for throughput on multi-million-row
+archives.
+"""
+
+import csv
+import math
+import itertools
+import threading
+from array import array
+from multiprocessing import shared_memory
+from typing import Any, Dict, IO, List, Tuple
+
+import numpy as np
+
+from eai_calculator import (
+    CSV_CHUNK_ROWS,
+    CsvChunkReader,
+    EAI_PARAMS,
+    IDEAL_VALUES,
+    to_float,
+    calculate_eai_batch,
+    batch_results,
+    format_eai_rows,
+)
+
+STATUSES = ["good", "warning", "bad", "unknown"]
+
+
+# ==============================
+# PARSING
+# ==============================
+class CsvColumns:
+    """
+    Float columns ({param: values}, NaN = missing) built from csv.reader rows
+    added chunk by chunk (the first row is the header), with the same header
+    and value rules as calculate_csv_eai. A chunk is added whole or not at
+    all; freeze() waits for an add in progress and ignores later ones.
+    """
+
+    def __init__(self):
+        self.header = None
+        self.n_rows = 0
+        self._used: List[Tuple[str, int]] = []
+        self._values: Dict[str, array] = {}
+        self._frozen = False
+        self._lock = threading.Lock()
+
+    def add_rows(self, rows: List[List[str]]):
+        with self._lock:
+            if self._frozen or not rows:
+                return
+            if self.header is None:
+                self.header, rows = rows[0], rows[1:]
+                # Same normalization as the per-row parser: the last duplicate column wins
+                positions = {key.strip().lower(): i for i, key in enumerate(self.header)}
+                self._used = [(param, positions[param]) for param in EAI_PARAMS if param in positions]
+                self._values = {param: array("d") for param, _ in self._used}
+
+            values = {param: array("d") for param, _ in self._used}
+            n_rows = self.n_rows
+            for row in rows:
+                if not row:
+                    continue
+                if len(row) > len(self.header):
+                    raise ValueError(f"Row {n_rows + 1} has more fields than the header")
+                for param, i in self._used:
+                    values[param].append(to_float(row[i], IDEAL_VALUES[param]) if i < len(row) else math.nan)
+                n_rows += 1
+            for param, column in values.items():
+                self._values[param].extend(column)
+            self.n_rows = n_rows
+
+    def freeze(self) -> Tuple[int, Dict[str, np.ndarray]]:
+        """(number of rows, columns) of the rows added so far"""
+        with self._lock:
+            self._frozen = True
+            return self.n_rows, {param: np.frombuffer(column, dtype=float) for param, column in self._values.items()}
+
+
+def read_column_chunk(reader: CsvChunkReader, columns: CsvColumns) -> int:
+    """Read the next chunk of reader (dict_rows=False) into columns; 0 at the end of the file"""
+    rows = reader.read()
+    columns.add_rows(rows)
+    return len(rows)
+
+
+def parse_csv_columns(stream: IO[str], chunk_rows: int = CSV_CHUNK_ROWS) -> Tuple[int, Dict[str, np.ndarray]]:
+    """
+    Parse a whole CSV text stream into {param: float array} (NaN = missing).
+    Returns (number of rows, columns).
+    """
+    columns = CsvColumns()
+    reader = csv.reader(stream)
+    while True:
+        rows = list(itertools.islice(reader, chunk_rows))
+        if not rows:
+            return columns.freeze()
+        columns.add_rows(rows)
+
+
+def chunk_bounds(n_rows: int, n_chunks: int) -> List[Tuple[int, int]]:
+    """Contiguous (start, end) row ranges of roughly equal size"""
+    n_chunks = max(1, min(n_chunks, n_rows))
+    edges = np.linspace(0, n_rows, n_chunks + 1).astype(int)
+    return [(int(start), int(end)) for start, end in zip(edges[:-1], edges[1:]) if end > start]
+
+
+# ==============================
+# SHARED MEMORY
+# ==============================
+class SharedColumns:
+    """
+    Input columns and output arrays in shared memory. Use as a context
+    manager in the parent; workers attach through spec().
+    """
+
+    def __init__(self, n_rows: int, columns: Dict[str, np.ndarray]):
+        self.n_rows = n_rows
+        self.params = list(columns)
+        n_params = max(1, len(self.params))
+        size = max(1, n_rows) * 8
+        self._input = shared_memory.SharedMemory(create=True, size=size * n_params)
+        # Output: eai (float64), sub-indices (float64 per param), status (int8)
+        self._output = shared_memory.SharedMemory(create=True, size=size * (1 + n_params) + max(1, n_rows))
+        inputs = _input_view(self._input, len(self.params), n_rows)
+        for i, param in enumerate(self.params):
+            inputs[i] = columns[param]
+        del inputs
+
+    def spec(self) -> Dict[str, Any]:
+        return {
+            "input": self._input.name,
+            "output": self._output.name,
+            "n_rows": self.n_rows,
+            "params": self.params,
+        }
+
+    def batch(self) -> Dict[str, Any]:
+        """Scores of every row in the calculate_eai_batch format (copies)"""
+        eai, sub, status = _output_views(self._output, len(self.params), self.n_rows)
+        batch = {
+            "eai": eai.copy(),
+            "status": np.array(STATUSES)[status],
+            "sub_indices": {param: sub[i].copy() for i, param in enumerate(self.params)},
+        }
+        del eai, sub, status
+        return batch
+
+    def status_summary(self, end: int = None) -> Dict[str, int]:
+        """Status counts of rows [0, end) (all rows by default)"""
+        _, _, status = _output_views(self._output, len(self.params), self.n_rows)
+        counts = np.bincount(status[:end], minlength=len(STATUSES))
+        del status
+        return {name: int(count) for name, count in zip(STATUSES, counts)}
+
+    def close(self):
+        for block in (self._input, self._output):
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _input_view(block: shared_memory.SharedMemory, n_params: int, n_rows: int) -> np.ndarray:
+    return np.ndarray((n_params, n_rows), dtype=float, buffer=block.buf)
+
+
+def _output_views(block: shared_memory.SharedMemory, n_params: int, n_rows: int):
+    eai = np.ndarray((n_rows,), dtype=float, buffer=block.buf)
+    sub = np.ndarray((n_params, n_rows), dtype=float, buffer=block.buf, offset=n_rows * 8)
+    status = np.ndarray((n_rows,), dtype=np.int8, buffer=block.buf, offset=n_rows * 8 * (1 + n_params))
+    return eai, sub, status
+
+
+# ==============================
+# WORKER
+# ==============================
+def score_chunk(spec: Dict[str, Any], start: int, end: int, output_format: str = None) -> str:
+    """
+    Score rows [start, end) of the shared columns, write the results to the
+    shared output block and return them as NDJSON / CSV text (empty string
+    for other formats). Runs in a process-pool worker.
+    """
+    n_rows, params = spec["n_rows"], spec["params"]
+    input_block = shared_memory.SharedMemory(name=spec["input"])
+    output_block = shared_memory.SharedMemory(name=spec["output"])
+    try:
+        inputs = _input_view(input_block, len(params), n_rows)
+        batch = calculate_eai_batch(
+            {param: inputs[i, start:end] for i, param in enumerate(params)}, n_rows=end - start
+        )
+        eai, sub, status = _output_views(output_block, len(params), n_rows)
+        eai[start:end] = batch["eai"]
+        for i, param in enumerate(params):
+            sub[i, start:end] = batch["sub_indices"][param]
+        for code, name in enumerate(STATUSES):
+            status[start:end][batch["status"] == name] = code
+        text = format_eai_rows(batch_results(batch), start + 1, output_format) if output_format in ("ndjson", "csv") else ""
+        # Views must be released before the blocks are closed
+        del inputs, eai, sub, status
+    finally:
+        input_block.close()
+        output_block.close()
+    return text
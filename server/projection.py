@@ -0,0 +1,75 @@
+"""
+Field selection for /samples.
+
+fields is a comma-separated list of top-level fields (station, data, ...)
+or data / eai sub-fields (data.thoi_gian, data.ph, eai.score). It becomes a
+MongoDB projection, so unrequested fields are never sent by the server,
+decoded or re-encoded. _id is always returned.
+
+Compact mode returns the page column by column instead of one dict per
+document:
+
+    {"_id": [...], "station": [...], "data.thoi_gian": [...], "data.ph": [...]}
+
+A whole "data" field is expanded to one column per parameter found on
+the page (null where a document has no value).
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from pagination import field_value
+
+SAMPLE_FIELDS = ["sample_type", "water_layer", "region", "station", "source_file", "data", "eai"]
+
+# Fields of the compact mode when none are requested
+COMPACT_DEFAULT_FIELDS = ["sample_type", "water_layer", "region", "station", "data"]
+
+# Sample date inside data (first column of an expanded data field)
+DATE_KEY = "thoi_gian"
+
+# Internal lookup fields (query_filters.py), hidden from full documents
+HIDDEN_FIELDS = {"region_key": 0, "station_key": 0}
+
+_FIELD_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)?$")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validated, de-duplicated field list (None = every field)"""
+    if not fields:
+        return None
+    parsed = []
+    for field in (f.strip() for f in fields.split(",")):
+        if not field:
+            continue
+        if not _FIELD_PATTERN.match(field) or field.split(".")[0] not in SAMPLE_FIELDS:
+            raise ValueError(f"Unknown field: {field}")
+        if "." in field and field.split(".")[0] not in ("data", "eai"):
+            raise ValueError(f"Only data and eai have sub-fields: {field}")
+        if field not in parsed:
+            parsed.append(field)
+    # A whole sub-document covers its sub-fields (MongoDB rejects both in one projection)
+    return [f for f in parsed if "." not in f or f.split(".")[0] not in parsed] or None
+
+
+def projection_spec(fields: Optional[List[str]], keep: List[str] = ()) -> Dict[str, int]:
+    """MongoDB projection for fields (plus keep, e.g. the pagination key)"""
+    if fields is None:
+        return dict(HIDDEN_FIELDS)
+    wanted = list(fields) + [f for f in keep if f not in fields and f.split(".")[0] not in fields]
+    return {field: 1 for field in wanted}
+
+
+def compact_columns(docs: List[Dict[str, Any]], fields: Optional[List[str]]) -> Dict[str, List[Any]]:
+    """Column-oriented page: {field path: [value per document]}, _id first"""
+    columns = {"_id": [str(doc["_id"]) for doc in docs]}
+    for field in fields or COMPACT_DEFAULT_FIELDS:
+        if field == "data":
+            keys = {key for doc in docs for key in (doc.get("data") or {})}
+            # Date first, then the parameters alphabetically
+            ordered = ([DATE_KEY] if DATE_KEY in keys else []) + sorted(keys - {DATE_KEY})
+            for key in ordered:
+                columns[f"data.{key}"] = [(doc.get("data") or {}).get(key) for doc in docs]
+        else:
+            columns[field] = [field_value(doc, field) for doc in docs]
+    return columns
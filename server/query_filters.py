@@ -0,0 +1,83 @@
+"""
+Region / station filters that can use the indexes.
+
+Samples (and EAI rollups) carry canonical lookup fields written at ingest:
+
+    region_key  = normalize_name(region)     e.g. "  Mirs  Bay" -> "mirs bay"
+    station_key = normalize_name(station)
+
+Match modes:
+
+- exact (default): equality on the *_key field (index point lookup)
+- prefix:          anchored case-sensitive regex on the *_key field, which
+                   MongoDB turns into an index range scan
+- contains:        case-insensitive substring on the original field (the old
+                   behavior, always a full scan); explicit opt-in
+
+The endpoints filtering by region / station (/samples, /eai, /eai/summary,
+/eai/rollups, /stations, /statistics, /prediction/historical) take a
+`match` query parameter. The default changed from the old substring search
+to exact: a client that relied on partial names ("Mirs" for "Mirs Bay",
+"MS1" also returning MS10) must now pass match=prefix or match=contains.
+
+scripts/backfill_name_keys.py adds the key fields to existing documents and
+scripts/check_query_plans.py verifies the plans with explain().
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+from pymongo import ASCENDING
+
+# Original field -> canonical lookup field
+NAME_KEY_FIELDS = {"region": "region_key", "station": "station_key"}
+
+MATCH_MODES = ("exact", "prefix", "contains")
+
+
+def normalize_name(value: Any) -> Optional[str]:
+    """Canonical form of a region / station name: trimmed, single spaces, casefolded"""
+    if value is None:
+        return None
+    return " ".join(str(value).split()).casefold()
+
+
+def name_keys(region: Any, station: Any) -> Dict[str, Optional[str]]:
+    """Lookup fields stored next to region / station"""
+    return {"region_key": normalize_name(region), "station_key": normalize_name(station)}
+
+
+def ensure_name_key_indexes(collection):
+    """Indexes used by the exact / prefix filters on the samples collection"""
+    # idx_region_station_key also serves region-only filters
+    collection.create_index([("station_key", ASCENDING)], name="idx_station_key")
+    collection.create_index(
+        [("sample_type", ASCENDING), ("region_key", ASCENDING), ("station_key", ASCENDING)],
+        name="idx_type_region_station_key"
+    )
+    collection.create_index(
+        [("region_key", ASCENDING), ("station_key", ASCENDING)],
+        name="idx_region_station_key"
+    )
+
+
+def name_filter(field: str, value: str, mode: str = "exact") -> Dict[str, Any]:
+    """Filter on region / station for one match mode"""
+    if mode == "exact":
+        return {NAME_KEY_FIELDS[field]: normalize_name(value)}
+    if mode == "prefix":
+        return {NAME_KEY_FIELDS[field]: {"$regex": "^" + re.escape(normalize_name(value))}}
+    if mode == "contains":
+        return {field: {"$regex": re.escape(value.strip()), "$options": "i"}}
+    raise ValueError(f"Unknown match mode: {mode}")
+
+
+def add_name_filters(
+    query: Dict[str, Any], region: Optional[str] = None, station: Optional[str] = None, mode: str = "exact"
+) -> Dict[str, Any]:
+    """Add the region / station filters to query (in place) and return it"""
+    if region:
+        query.update(name_filter("region", region, mode))
+    if station:
+        query.update(name_filter("station", station, mode))
+    return query
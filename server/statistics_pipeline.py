@@ -0,0 +1,48 @@
+"""
+/statistics in one aggregation.
+
+A single $facet over the filtered samples computes the total, the counts
+per sample_type / water_layer / region and the data.thoi_gian date range,
+so the filtered set is read once instead of once per breakdown. Only the
+fields the facets need are kept before the $facet.
+"""
+
+from typing import Any, Dict, List
+
+from pagination import DATE_FIELD
+
+# Response key -> grouped field
+BREAKDOWN_FIELDS = {"sample_types": "sample_type", "water_layers": "water_layer", "regions": "region"}
+
+
+def statistics_pipeline(query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"$match": query},
+        {"$project": {"_id": 0, DATE_FIELD: 1, **{field: 1 for field in BREAKDOWN_FIELDS.values()}}},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            **{
+                key: [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+                for key, field in BREAKDOWN_FIELDS.items()
+            },
+            "date_range": [
+                # Dates are ISO strings; missing / null dates are ignored
+                {"$match": {DATE_FIELD: {"$type": "string"}}},
+                {"$group": {"_id": None, "start": {"$min": f"${DATE_FIELD}"}, "end": {"$max": f"${DATE_FIELD}"}}},
+            ],
+        }},
+    ]
+
+
+def statistics_result(facet: Dict[str, Any]) -> Dict[str, Any]:
+    """StatisticsResponse fields from the statistics_pipeline output document"""
+    total = facet.get("total") or [{}]
+    date_range = facet.get("date_range") or []
+    result = {"total_samples": total[0].get("count", 0)}
+    for key in BREAKDOWN_FIELDS:
+        # Empty / missing values are left out, as before
+        result[key] = {group["_id"]: group["count"] for group in facet.get(key, []) if group["_id"]}
+    result["date_range"] = (
+        {"start": date_range[0]["start"], "end": date_range[0]["end"]} if date_range else None
+    )
+    return result
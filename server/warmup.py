@@ -0,0 +1,305 @@
+"""
+Startup model warmup.
+
+Models are loaded lazily, so after a restart the first forecast for each
+station pays for reading and parsing its files. At startup a background task
+preloads stations in this order:
+
+1. WARMUP_PRIORITY: comma-separated "Type/Area/Station" entries. A shorter
+   prefix such as "Water_Surface/Victoria Harbour" selects every station
+   under it.
+2. Recorded access frequency: successful forecast requests are counted per
+   station and merged into WARMUP_ACCESS_LOG periodically and at shutdown.
+3. Every other station, in registry order.
+
+The plan is cut where the stations' models no longer fit in WARMUP_MAX_MB or
+in the engine's model cache (its entry and byte limits), with sizes measured
+as ModelCache charges them (model + config files on disk), so every planned
+model stays cached. The plan is loaded by the processes that compute the
+forecasts: every CPU worker through the process pool initializer, or this
+process when there are no CPU workers. Each worker's loaded / failed counts
+are collected once the workers are up (per pid in /ready).
+
+/ready returns 503 with the progress until the warmup finishes. The warmup
+is best-effort: a station that fails to load is counted in "failed", and if
+the whole warmup fails the status is "failed" (ready: false) with the
+error, but /ready answers 200 anyway ("serving": true). Models that were
+not warmed, whether failed or beyond the budget, are loaded lazily by the
+first forecast that needs them.
+"""
+
+import os
+import json
+import fcntl
+import asyncio
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from model_files import MODELS_BASE_DIR
+from model_registry import registry
+from forecasting import warm_cache_limits, station_warm_size, warm_station
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+WARMUP_MAX_BYTES = int(os.getenv("WARMUP_MAX_MB", "256")) * 1024 * 1024
+WARMUP_PRIORITY = [p.strip().strip("/") for p in os.getenv("WARMUP_PRIORITY", "").split(",") if p.strip()]
+WARMUP_ACCESS_LOG = os.getenv("WARMUP_ACCESS_LOG", os.path.join(MODELS_BASE_DIR, "access_counts.json"))
+WARMUP_ACCESS_FLUSH_SECONDS = float(os.getenv("WARMUP_ACCESS_FLUSH_SECONDS", "60"))
+
+StationKey = Tuple[str, str, str]
+
+
+# ==============================
+# ACCESS FREQUENCY
+# ==============================
+class AccessLog:
+    """
+    Forecast requests per station, persisted as {"Type/Area/Station": count}.
+
+    New requests are flushed every WARMUP_ACCESS_FLUSH_SECONDS and at
+    shutdown by merging them into the file (read, add, atomic rename, under
+    an exclusive lock), so a crash loses at most one interval and several
+    workers sharing the file add up instead of overwriting each other.
+    """
+
+    def __init__(self, path: str = WARMUP_ACCESS_LOG, flush_seconds: float = WARMUP_ACCESS_FLUSH_SECONDS):
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self.counts = Counter()
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _read(self) -> Counter:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                counts = json.load(f)
+        except (OSError, ValueError):
+            return Counter()
+        return Counter({tuple(name.split("/")): n for name, n in counts.items() if name.count("/") == 2})
+
+    def load(self):
+        counts = self._read()
+        with self._lock:
+            self.counts = counts + self._pending
+
+    def flush(self):
+        """Merge the requests recorded since the last flush into the file"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return
+        try:
+            with open(self.path + ".lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                merged = self._read() + pending
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"/".join(key): n for key, n in merged.most_common()}, f, ensure_ascii=False, indent=1)
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Cannot save access log {self.path}: {e}")
+            with self._lock:
+                self._pending.update(pending)
+            return
+        # Counts of the other workers become visible to the next plan
+        with self._lock:
+            self.counts = merged + self._pending
+
+    def record(self, type_name: str, area: str, station: str):
+        with self._lock:
+            self.counts[(type_name, area, station)] += 1
+            self._pending[(type_name, area, station)] += 1
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await asyncio.to_thread(self.flush)
+
+    def start(self):
+        """Start the periodic flush (called from the app lifespan)"""
+        if self.flush_seconds > 0:
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+
+access_log = AccessLog()
+
+
+# ==============================
+# PLAN + LOAD
+# ==============================
+def plan_stations(
+    stations: List[StationKey], priority: List[str], counts: Dict[StationKey, int]
+) -> List[StationKey]:
+    """Order stations by priority prefix, then access count, then original order"""
+    def rank(item: Tuple[int, StationKey]):
+        position, key = item
+        name = "/".join(key)
+        matches = [i for i, prefix in enumerate(priority) if name == prefix or name.startswith(prefix + "/")]
+        return (matches[0] if matches else len(priority), -counts.get(key, 0), position)
+
+    return [key for _, key in sorted(enumerate(stations), key=rank)]
+
+
+def budget_plan(keys: List[StationKey], max_bytes: int, max_entries: int) -> Tuple[List[StationKey], int]:
+    """Longest prefix of keys whose models fit in max_bytes / max_entries, and its size"""
+    planned, size, models = [], 0, 0
+    for key in keys:
+        try:
+            n_models, n_bytes = station_warm_size(*key)
+        except Exception as e:
+            print(f"Warmup skipped {'/'.join(key)}: {e}")
+            continue
+        if size + n_bytes > max_bytes or models + n_models > max_entries:
+            break
+        planned.append(key)
+        size += n_bytes
+        models += n_models
+    return planned, size
+
+
+# Result of the last warm_stations call in this process (read back from the CPU workers)
+_warmed: Optional[Dict[str, int]] = None
+
+
+def warm_stations(keys: List[StationKey], on_station: Callable[[int, int], None] = None) -> Dict[str, int]:
+    """Load stations into this process's model caches. Also used as the CPU pool initializer."""
+    global _warmed
+    loaded, failed = 0, 0
+    for key in keys:
+        try:
+            warm_station(*key)
+            loaded += 1
+        except Exception as e:
+            failed += 1
+            print(f"Warmup skipped {'/'.join(key)}: {e}")
+        if on_station:
+            on_station(loaded, failed)
+    _warmed = {"stations": loaded, "failed": failed}
+    return _warmed
+
+
+def warmed_stations() -> Optional[Dict[str, int]]:
+    """{"stations", "failed"} of this process's warmup (None if it did not run here)"""
+    return _warmed
+
+
+# ==============================
+# BACKGROUND TASK
+# ==============================
+class Warmup:
+    def __init__(self, enabled: bool = WARMUP_ENABLED, max_bytes: int = WARMUP_MAX_BYTES, priority: List[str] = None):
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.priority = WARMUP_PRIORITY if priority is None else priority
+        self.keys: List[StationKey] = []
+        self.planned_bytes = 0
+        self.status = "pending" if enabled else "disabled"
+        self.stations = 0
+        self.failed = 0
+        self.workers = 0
+        self.worker_results: Dict[str, Optional[Dict[str, int]]] = {}
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "disabled")
+
+    @property
+    def serving(self) -> bool:
+        # A failed warmup only means colder caches: serve traffic anyway
+        return self.ready or self.status == "failed"
+
+    def plan(self) -> List[StationKey]:
+        """Order the registry's stations and cut the plan to the budget (registry must be loaded)"""
+        if not self.enabled:
+            self.keys = []
+            return self.keys
+        access_log.load()
+        ordered = plan_stations(registry.all_stations(), self.priority, access_log.counts)
+        max_entries, cache_bytes = warm_cache_limits()
+        self.keys, self.planned_bytes = budget_plan(ordered, min(self.max_bytes, cache_bytes), max_entries)
+        return self.keys
+
+    def worker_initializer(self) -> Tuple[Optional[Callable], tuple]:
+        """(initializer, initargs) for ExecutionLayer.start"""
+        if not self.enabled:
+            return None, ()
+        return warm_stations, (self.keys,)
+
+    def _progress(self, loaded: int, failed: int):
+        self.stations, self.failed = loaded, failed
+
+    async def run(self, spawn_workers: Callable = None, run_on_workers: Callable = None):
+        self.status = "running"
+        self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            if spawn_workers is not None:
+                # Returns once every worker has run warm_stations (its initializer)
+                self.workers = await spawn_workers()
+            if self.workers:
+                # Forecasts are computed in the workers: collect what each one loaded
+                results = await run_on_workers(warmed_stations)
+                self.worker_results = {str(pid): result for pid, result in sorted(results.items())}
+                counts = [result for result in results.values() if result is not None]
+                if not counts:
+                    raise RuntimeError("no CPU worker reported a warmup")
+                # The stations every reporting worker has loaded
+                self.stations = min(result["stations"] for result in counts)
+                self.failed = max(result["failed"] for result in counts)
+            else:
+                await asyncio.to_thread(warm_stations, self.keys, self._progress)
+            self.status = "ready"
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            print(f"Warmup failed, serving with cold caches: {e}")
+        self.finished_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(
+            f"Warmup {self.status}: {self.stations} station(s), {self.failed} failed, "
+            f"{self.planned_bytes / 1024:.0f} KB, {self.workers} worker(s)"
+        )
+
+    def start(self, spawn_workers: Callable = None, run_on_workers: Callable = None):
+        """
+        Start the warmup in the background (called from the app lifespan).
+        spawn_workers() starts the CPU workers and returns their number;
+        run_on_workers(fn) returns {pid: fn()} from each of them.
+        """
+        if self.enabled:
+            self._task = asyncio.create_task(self.run(spawn_workers, run_on_workers))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "serving": self.serving,
+            "status": self.status,
+            "planned": len(self.keys),
+            "stations": self.stations,
+            "failed": self.failed,
+            "bytes": self.planned_bytes,
+            "max_bytes": self.max_bytes,
+            "workers": self.workers,
+            "worker_results": self.worker_results,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+warmup = Warmup()